@@ -2,17 +2,20 @@
 # -*- coding: utf-8 -*-
 """
 项目统一入口，支持 CLI 和 Server 两种模式：
-  - CLI 模式：python main.py --query "研究主题" [--output_dir ./my_reports] [--output_options txt pdf]
+  - CLI 模式：python main.py --query "研究主题" [--output_dir ./my_reports] [--output_options txt pdf] [--resume]
   - Server 模式：python main.py --serve
 """
 import argparse # 命令行参数解析
 import asyncio # 异步IO
+import hashlib # 由查询参数派生稳定的会话ID
 import logging # 日志
 import os # 系统操作
+import sys # 命令行参数快速通道
+from pathlib import Path # 路径处理
 from typing import List, Dict, Any, Optional # 修复：导入 Optional
 
 from src.utils.logging import init_logger # 自定义日志初始化
-from src.graph.builder import run_langgraph # LangGraph流程运行函数
+from src.utils.event_loop import install_uvloop, uvicorn_loop_name # uvloop 事件循环
 # 移除 server app 的直接导入，因为 uvicorn 会自己找
 # from src.server.app import app as fastapi_app
 from src.config.loader import load_yaml_config # YAML配置加载
@@ -20,7 +23,18 @@ from src.config.loader import load_yaml_config # YAML配置加载
 
 logger = logging.getLogger(__name__) # 获取日志记录器
 
-async def run_cli_workflow(topic: str, output_dir_cli: Optional[str], output_options_cli: Optional[List[str]]):
+# 项目根目录与 conf.yaml 路径，仅在模块加载时计算一次
+_PROJECT_ROOT = Path(__file__).resolve().parent
+_CONF_YAML = _PROJECT_ROOT / "conf.yaml"
+
+# 支持的输出格式，argparse 校验与 conf.yaml 缺省值共用同一份常量
+_OUTPUT_CHOICES = ("txt", "md", "pdf", "ppt", "audio")
+
+# 在任何 asyncio.run 之前安装 uvloop（非 Windows 且已安装时生效）
+UVLOOP_ENABLED = install_uvloop()
+
+async def run_cli_workflow(topic: str, output_dir_cli: Optional[str], output_options_cli: Optional[List[str]],
+                           resume: bool = False):
     """
     CLI 模式：直接调用 LangGraph 流程，等待结束后输出结果。
     简化注释：运行CLI模式工作流
@@ -29,15 +43,13 @@ async def run_cli_workflow(topic: str, output_dir_cli: Optional[str], output_opt
 
     # 加载 conf.yaml 获取默认输出配置
     # 简化注释：加载配置
-    project_root = os.path.dirname(os.path.abspath(__file__)) # 获取项目根目录
-    conf_yaml_path = os.path.join(project_root, "conf.yaml") # 构造配置文件路径
-    config = load_yaml_config(conf_yaml_path) # 加载YAML配置
+    config = load_yaml_config(str(_CONF_YAML)) # 加载YAML配置（按 mtime 缓存）
 
     # 优先使用命令行参数，否则使用配置文件或默认值
     # 简化注释：确定输出配置
     final_output_dir = output_dir_cli or config.get("OUTPUT_DIR", "outputs")
     # 修复：从配置文件读取 OUTPUT_OPTIONS
-    default_options = config.get("OUTPUT_OPTIONS", ["md", "txt", "pdf", "ppt", "audio"])
+    default_options = config.get("OUTPUT_OPTIONS", list(_OUTPUT_CHOICES))
     final_output_options = output_options_cli or default_options
 
     # 准备初始状态
@@ -50,14 +62,23 @@ async def run_cli_workflow(topic: str, output_dir_cli: Optional[str], output_opt
         "report_paths": {}, # Reporter会填充
         "audio_path": ""    # Voice Agent会填充
     }
-    logger.debug(f"传递给run_langgraph的初始状态: {initial_state}") # 日志：初始状态
+    logger.debug("传递给arun_langgraph的初始状态: %r", initial_state) # 日志：初始状态（非 DEBUG 时跳过 repr）
+
+    # 默认每次执行使用随机会话ID（由 arun_langgraph 生成）；指定 --resume 时，
+    # 相同主题与输出配置派生相同会话ID，以便复用已有会话状态与 LangGraph 检查点
+    # 简化注释：确定会话ID
+    session_id = None
+    if resume:
+        session_key = f"{topic}|{final_output_dir}|{','.join(sorted(final_output_options))}"
+        session_id = "cli-" + hashlib.sha1(session_key.encode("utf-8")).hexdigest()[:16]
 
     # 异步执行 LangGraph 流程
     # 简化注释：执行LangGraph
-    # run_langgraph 本身可能是同步的，所以用 run_in_executor
-    loop = asyncio.get_event_loop() # 获取事件循环
+    # 图中含协程节点，直接在当前事件循环上 await arun_langgraph（ainvoke），无需线程池
+    # 延迟导入：LangGraph 及各 Agent 依赖较重，--serve / --help 时无需加载
+    from src.graph.builder import arun_langgraph # LangGraph流程运行函数
     # 修复：传递正确的初始状态字典
-    completed_plan = await loop.run_in_executor(None, run_langgraph, initial_state) # 异步执行
+    completed_plan = await arun_langgraph(initial_state, session_id=session_id) # 异步执行
 
     if completed_plan is None:
         logger.error("CLI模式：LangGraph 流程执行失败。") # 日志：流程失败
@@ -81,12 +102,47 @@ async def run_cli_workflow(topic: str, output_dir_cli: Optional[str], output_opt
     else:
         logger.info("  未生成音频文件。") # 日志：无音频
 
+def serve(host: str, port: int):
+    """
+    Server 模式：通过 uvicorn 启动 FastAPI 服务。
+    简化注释：启动服务器
+    """
+    try:
+        import uvicorn # 动态导入uvicorn
+        logger.info(f"服务器模式：启动 FastAPI 服务于 http://{host}:{port}") # 日志：启动服务
+        # 注意：确保 uvicorn.run 的第一个参数是 "module_path:app_instance_name"
+        # 此处指向 src.server.app 模块中的 app 实例
+        uvicorn.run("src.server.app:app", host=host, port=port, reload=True,
+                    loop=uvicorn_loop_name(UVLOOP_ENABLED)) # 运行uvicorn
+    except ImportError:
+        logger.error("启动服务器失败：uvicorn 未安装。请运行 `pip install uvicorn[standard]`。") # uvicorn未安装错误
+    except Exception as e:
+        logger.error(f"启动服务器时发生未知错误: {e}", exc_info=True) # 其他启动错误
+
+def _try_fast_path(argv: List[str]) -> bool:
+    """
+    常见调用的快速通道，跳过 argparse 的构建与解析：
+      - python main.py --serve
+      - python main.py --query "主题" / -q "主题"
+    其余参数组合返回 False，交给 argparse 处理（含校验与帮助信息）。
+    简化注释：快速参数分派
+    """
+    if argv == ["--serve"]:
+        serve("0.0.0.0", 8000)
+        return True
+    if len(argv) == 2 and argv[0] in ("--query", "-q") and not argv[1].startswith("-"):
+        asyncio.run(run_cli_workflow(argv[1], None, None))
+        return True
+    return False
+
 def main():
     """
     主函数，解析命令行参数并根据模式执行相应操作。
     简化注释：主函数
     """
-    init_logger("INFO") # 初始化日志，级别INFO
+    init_logger(os.getenv("LOG_LEVEL", "INFO")) # 初始化日志，默认级别INFO
+    if _try_fast_path(sys.argv[1:]):
+        return
     parser = argparse.ArgumentParser(
         description="DeeepFlow LangGraph 项目入口。", # 程序描述
         formatter_class=argparse.RawTextHelpFormatter # 保留换行符的帮助信息格式
@@ -102,9 +158,13 @@ def main():
     )
     parser.add_argument(
         "--output_options", nargs='+',
-        choices=["txt", "md", "pdf", "ppt", "audio"],
+        choices=_OUTPUT_CHOICES,
         help="指定输出文件的格式 (CLI模式)，可多选。例如：--output_options txt pdf audio。默认为 conf.yaml 或全部。" # 输出格式参数
     )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="复用相同主题与输出配置的上一次会话 (CLI模式)，启用检查点时可跳过已完成的执行。默认每次新建会话。" # 恢复会话参数
+    )
     # Server模式参数
     parser.add_argument(
         "--serve", action="store_true",
@@ -124,21 +184,12 @@ def main():
     if args.serve:
         # Server 模式：启动 FastAPI
         # 简化注释：启动服务器
-        try:
-            import uvicorn # 动态导入uvicorn
-            logger.info(f"服务器模式：启动 FastAPI 服务于 http://{args.host}:{args.port}") # 日志：启动服务
-            # 注意：确保 uvicorn.run 的第一个参数是 "module_path:app_instance_name"
-            # 此处指向 src.server.app 模块中的 app 实例
-            uvicorn.run("src.server.app:app", host=args.host, port=args.port, reload=True) # 运行uvicorn
-        except ImportError:
-            logger.error("启动服务器失败：uvicorn 未安装。请运行 `pip install uvicorn[standard]`。") # uvicorn未安装错误
-        except Exception as e:
-            logger.error(f"启动服务器时发生未知错误: {e}", exc_info=True) # 其他启动错误
+        serve(args.host, args.port)
 
     elif args.query:
         # CLI 模式：执行 LangGraph
         # 简化注释：运行CLI
-        asyncio.run(run_cli_workflow(args.query, args.output_dir, args.output_options)) # 异步运行CLI工作流
+        asyncio.run(run_cli_workflow(args.query, args.output_dir, args.output_options, args.resume)) # 异步运行CLI工作流
     else:
         # 如果没有指定模式，打印帮助信息
         # 简化注释：无参数帮助
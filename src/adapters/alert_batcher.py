@@ -0,0 +1,136 @@
+# 文件路径：src/adapters/alert_batcher.py
+# -*- coding: utf-8 -*-
+"""
+告警批量发送器：在异步代码路径（FastAPI 服务、监控循环）中代替直接调用各告警适配器。
+- 告警先进入 asyncio.Queue，后台任务按时间窗口（默认 500ms）汇总；
+- 同一主题的多条告警合并为一封邮件 / 一次 Webhook 请求，同一窗口内的多封邮件共用一个 SMTP 会话；
+- 实际发送（SMTP、HTTP）在线程池中执行，不阻塞事件循环。
+"""
+
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.config.settings import ALERT_PROVIDER
+from src.adapters.local_alert_adapter import LocalAlertAdapter
+from src.adapters.cloud_alert_adapter import CloudAlertAdapter
+
+logger = logging.getLogger(__name__)
+
+# 队列元素：(主题, 正文, 钉钉短消息)
+_AlertItem = Tuple[str, str, Optional[str]]
+
+
+def send_alert(subject: str, content: str, dingtalk_msg: Optional[str] = None):
+    """
+    按 ALERT_PROVIDER 同步发送一条告警：
+    - local：邮件 + 钉钉（钉钉使用 dingtalk_msg，未提供时使用主题）；
+    - cloud：云端 Webhook。
+    """
+    if ALERT_PROVIDER == "local":
+        LocalAlertAdapter.notify(subject, content)
+        from src.adapters.dingtalk_adapter import send_dingbot_text
+        send_dingbot_text(dingtalk_msg or subject)
+    else:
+        CloudAlertAdapter.notify(subject, content)
+
+
+def send_alerts(items: List[_AlertItem]):
+    """
+    批量版本的 send_alert：local 模式下整批邮件通过 LocalAlertAdapter.notify_batch
+    在同一个 SMTP 会话中发送；钉钉与云端 Webhook 仍逐条发送（复用连接池）。
+    """
+    if ALERT_PROVIDER == "local":
+        LocalAlertAdapter.notify_batch([(subject, content) for subject, content, _ in items])
+        from src.adapters.dingtalk_adapter import send_dingbot_text
+        for subject, _, dingtalk_msg in items:
+            send_dingbot_text(dingtalk_msg or subject)
+    else:
+        for subject, content, _ in items:
+            CloudAlertAdapter.notify(subject, content)
+
+
+class AlertBatcher:
+    """
+    告警去抖与合并：
+    - notify(subject, content, dingtalk_msg)：非阻塞入队，首次调用时在当前事件循环上启动后台任务；
+    - 后台任务每个窗口最多取 max_batch 条告警，按主题合并后整批交给 send_many 回调发送
+      （未指定时在创建实例时取模块级 send_alerts）。
+    """
+
+    def __init__(self, send_many: Optional[Callable[[List[_AlertItem]], None]] = None,
+                 flush_ms: int = 500, max_batch: int = 32):
+        self._send_many = send_many or send_alerts
+        self._flush_seconds = flush_ms / 1000
+        self._max_batch = max_batch
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def notify(self, subject: str, content: str, dingtalk_msg: Optional[str] = None):
+        """将告警放入队列，由后台任务批量发送。必须在事件循环中调用。"""
+        self._queue.put_nowait((subject, content, dingtalk_msg))
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._flusher())
+
+    async def _flusher(self):
+        """后台任务：阻塞等待第一条告警，随后在时间窗口内尽量多收集，再统一发送。"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[_AlertItem] = [await self._queue.get()]
+            deadline = loop.time() + self._flush_seconds
+            while len(batch) < self._max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._send_batch(batch)
+
+    async def _send_batch(self, batch: List[_AlertItem]):
+        """按主题合并告警正文，每个主题只发送一次；整批在一次线程池调用中发送。"""
+        grouped: Dict[str, Tuple[List[str], List[str]]] = {}
+        for subject, content, dingtalk_msg in batch:
+            contents, short_msgs = grouped.setdefault(subject, ([], []))
+            contents.append(content)
+            if dingtalk_msg:
+                short_msgs.append(dingtalk_msg)
+
+        merged: List[_AlertItem] = []
+        for subject, (contents, short_msgs) in grouped.items():
+            if len(contents) > 1:
+                logger.info(f"[AlertBatcher] 合并 {len(contents)} 条同主题告警: {subject}")
+            merged.append((subject, "\n\n".join(contents), "\n".join(short_msgs) if short_msgs else None))
+        try:
+            await asyncio.to_thread(self._send_many, merged)
+        except Exception as e:
+            logger.error(f"[AlertBatcher] 告警批量发送失败 → 共 {len(merged)} 个主题, 异常: {e}", exc_info=True)
+
+
+# 每个事件循环一个批量发送器（asyncio.Queue 与后台任务均绑定在创建时的事件循环上）
+_batcher: Optional[AlertBatcher] = None
+_batcher_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_alert_batcher() -> AlertBatcher:
+    """返回当前事件循环对应的 AlertBatcher 单例。必须在事件循环中调用。"""
+    global _batcher, _batcher_loop
+    loop = asyncio.get_running_loop()
+    if _batcher is None or _batcher_loop is not loop:
+        _batcher = AlertBatcher()
+        _batcher_loop = loop
+    return _batcher
+
+
+def submit_alert(subject: str, content: str, dingtalk_msg: Optional[str] = None):
+    """
+    统一告警入口：在事件循环中交给 AlertBatcher 异步合并发送；
+    在同步上下文（无运行中的事件循环）中直接同步发送。
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        send_alert(subject, content, dingtalk_msg)
+        return
+    get_alert_batcher().notify(subject, content, dingtalk_msg)
@@ -8,10 +8,26 @@
 import os
 import requests
 import logging
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # C/Rust 实现的 JSON 编码器，直接输出 UTF-8 bytes
+except ImportError:
+    orjson = None
+    import json
 
 logger = logging.getLogger(__name__)
 
+# 模块级共享 Session：复用 TCP/TLS 连接，告警风暴时免去每次请求的握手开销；
+# 仅对连接失败与 429 限流做少量指数退避重试：POST 非幂等，5xx 与读超时时服务端可能已处理请求，重试会产生重复告警。
+# 钉钉适配器同样复用该 Session
+_retry = Retry(total=2, connect=2, read=0, other=0, status=2, backoff_factor=0.2,
+               status_forcelist=(429,), allowed_methods=frozenset(("POST",)))
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_retry))
+HTTP_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_retry))
+
 class CloudAlertAdapter:
     """
     云端告警实现类：
@@ -37,13 +53,18 @@ class CloudAlertAdapter:
             "msgtype": "text",
             "text": {"content": f"{subject}\n{content}"}
         }
-        headers = {"Content-Type": "application/json;charset=utf-8"}
+
+        if orjson is not None:
+            body = orjson.dumps(payload)
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
 
         try:
-            response = requests.post(webhook, data=json.dumps(payload), headers=headers, timeout=5)
+            response = HTTP_SESSION.post(webhook, data=body, headers=headers, timeout=5)
             response.raise_for_status()  # 若状态码非 2xx，将抛出 HTTPError
             logger.info(f"[CloudAlertAdapter] 云端告警发送成功 → 主题: {subject}，Webhook: {webhook}")
         except requests.exceptions.RequestException as e:
             logger.error(f"[CloudAlertAdapter] 云端告警请求失败 → 主题: {subject}, 异常: {e}", exc_info=True)
         except Exception as e:
-            logger.error(f"[CloudAlertAdapter] 云端告警未知异常 → 主题: {subject}, 异常: {e}", exc_info=True)
\ No newline at end of file
+            logger.error(f"[CloudAlertAdapter] 云端告警未知异常 → 主题: {subject}, 异常: {e}", exc_info=True)
@@ -1,54 +1,92 @@
 # 文件路径：src/adapters/dingtalk_adapter.py
 # -*- coding: utf-8 -*-
 """
-钉钉告警适配器：封装 dingtalkchatbot 库调用，支持文本消息发送与 @ 特定成员或 @ 所有人。
-若 DingtalkChatbot 库未安装或 DINGTALK_WEBHOOK 未配置，则回退到控制台打印警告。
+钉钉告警适配器：直接调用钉钉自定义机器人 Webhook，支持文本消息发送与 @ 特定成员或 @ 所有人。
+- 复用云端告警适配器的 requests.Session 连接池；
+- 加签模式下签名 URL 按分钟窗口缓存，避免每条消息都重新计算 HMAC。
+若 DINGTALK_WEBHOOK 未配置，则回退到控制台打印警告。
 """
 
+import base64
+import hashlib
+import hmac
 import logging
-from typing import List, Optional
-
-try:
-    from dingtalkchatbot.chatbot import DingtalkChatbot
-except ImportError:
-    DingtalkChatbot = None  # 若库未安装，则放弃初始化
+import threading
+import time
+import urllib.parse
+from typing import List, Optional, Tuple
 
+from src.adapters.cloud_alert_adapter import HTTP_SESSION
 from src.config.settings import DINGTALK_WEBHOOK, DINGTALK_SECRET
 
 logger = logging.getLogger(__name__)
 
+# 签名 URL 的复用窗口（毫秒）。钉钉要求 timestamp 与服务器时间相差不超过 1 小时，按分钟刷新足够安全
+_SIGN_REUSE_MS = 55_000
+
+
+class _DingtalkRobot:
+    """
+    钉钉自定义机器人的最小实现，接口与 DingtalkChatbot.send_text 保持一致。
+    """
+
+    def __init__(self, webhook: str, secret: str = ""):
+        self.webhook = webhook
+        self._secret = secret.encode("utf-8") if secret else b""
+        self._signed_url_cache: Tuple[int, str] = (0, webhook)
+        self._lock = threading.Lock()
+
+    def _signed_url(self) -> str:
+        """返回带 timestamp/sign 参数的 Webhook 地址；未配置加签时直接返回原地址。"""
+        if not self._secret:
+            return self.webhook
+        ts = round(time.time() * 1000)
+        with self._lock:
+            cached_ts, cached_url = self._signed_url_cache
+            if ts - cached_ts < _SIGN_REUSE_MS:
+                return cached_url
+            string_to_sign = f"{ts}\n".encode("utf-8") + self._secret
+            digest = hmac.new(self._secret, string_to_sign, digestmod=hashlib.sha256).digest()
+            sign = urllib.parse.quote_plus(base64.b64encode(digest))
+            url = f"{self.webhook}&timestamp={ts}&sign={sign}"
+            self._signed_url_cache = (ts, url)
+            return url
+
+    def send_text(self, msg: str, at_mobiles: Optional[List[str]] = None, is_at_all: bool = False) -> dict:
+        """发送文本消息；钉钉返回 errcode 非 0 时抛出 RuntimeError。"""
+        payload = {
+            "msgtype": "text",
+            "text": {"content": msg},
+            "at": {"atMobiles": at_mobiles or [], "isAtAll": is_at_all},
+        }
+        response = HTTP_SESSION.post(self._signed_url(), json=payload, timeout=5)
+        response.raise_for_status()
+        result = response.json()
+        if result.get("errcode", 0) != 0:
+            raise RuntimeError(f"钉钉接口返回错误: {result}")
+        return result
+
+
 # 全局钉钉机器人对象，首次调用时初始化
-_bot: Optional[DingtalkChatbot] = None
+_bot: Optional[_DingtalkRobot] = None
 _initialized = False
 
-def _get_dingtalk_bot() -> Optional[DingtalkChatbot]:
+def _get_dingtalk_bot() -> Optional[_DingtalkRobot]:
     """
-    内部函数：初始化并返回 DingtalkChatbot 实例
-    - 若 DingtalkChatbot 库未安装或 DINGTALK_WEBHOOK 为空，则返回 None
-    - 加签模式：自动计算 timestamp + 签名参数
+    内部函数：初始化并返回钉钉机器人实例
+    - 若 DINGTALK_WEBHOOK 为空，则返回 None
+    - 加签模式：签名参数在发送时按分钟窗口计算并缓存
     """
     global _bot, _initialized
     if not _initialized:
         _initialized = True
-        if DingtalkChatbot is None:
-            logger.error("钉钉告警库 dingtalkchatbot 未安装，无法发送钉钉消息。")
-            return None
-
         if not DINGTALK_WEBHOOK:
             logger.warning("未配置 DINGTALK_WEBHOOK，钉钉告警功能不可用。")
             return None
 
-        try:
-            if DINGTALK_SECRET:
-                # 加签模式
-                _bot = DingtalkChatbot(DINGTALK_WEBHOOK, secret=DINGTALK_SECRET)
-            else:
-                # 无加签
-                _bot = DingtalkChatbot(DINGTALK_WEBHOOK)
-            logger.info("钉钉告警机器人已初始化。")
-        except Exception as e:
-            logger.error(f"钉钉机器人初始化失败：{e}", exc_info=True)
-            _bot = None
+        # 加签模式传入 secret；无加签时 secret 为空字符串
+        _bot = _DingtalkRobot(DINGTALK_WEBHOOK, secret=DINGTALK_SECRET)
+        logger.info("钉钉告警机器人已初始化。")
 
     return _bot
 
@@ -73,4 +111,4 @@ def send_dingbot_text(content: str, at_mobiles: Optional[List[str]] = None, is_a
         logger.info(f"[DingTalk 告警] 消息发送成功: {content}")
     except Exception as e:
         logger.error(f"[DingTalk 告警] 消息发送失败: {e}", exc_info=True)
-        print(f"[DingTalk 告警失败回退] {content}")
\ No newline at end of file
+        print(f"[DingTalk 告警失败回退] {content}")
@@ -5,21 +5,139 @@
 —— 通过 SMTP 发送邮件告警；若 SMTP 未配置或收件人列表为空，则在控制台打印 Warning 日志。
 """
 
+import atexit
 import smtplib
 import logging
-from email.mime.text import MIMEText
-from typing import List
+import threading
+import time
+import email.policy
+from email.headerregistry import BaseHeader
+from email.message import EmailMessage
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 # 修复：从 settings 导入 ALERT_EMAIL_LIST
 from src.config.settings import SMTP_SERVER, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, ALERT_EMAIL_LIST
 
 logger = logging.getLogger(__name__)
 
+# 复用的 SMTP 连接：省去每封告警邮件的 EHLO/STARTTLS/LOGIN 握手；
+# 空闲超过 _SMTP_MAX_IDLE_SECONDS、NOOP 探测失败或单连接已发送 _SMTP_MAX_MESSAGES_PER_CONN 封时重新建立连接
+_SMTP_MAX_IDLE_SECONDS = 60
+_SMTP_MAX_MESSAGES_PER_CONN = 10000
+_SMTP_TIMEOUT_SECONDS = 30
+_smtp_lock = threading.Lock()
+_smtp_conn: Optional[smtplib.SMTP] = None
+_smtp_last_use = 0.0
+_smtp_sent_count = 0
+
+
+def _close_smtp_conn():
+    """关闭并丢弃当前缓存的 SMTP 连接（调用方需持有 _smtp_lock）。"""
+    global _smtp_conn
+    if _smtp_conn is not None:
+        try:
+            _smtp_conn.quit()
+        except Exception:
+            pass
+        _smtp_conn = None
+
+
+def _ensure_smtp_conn() -> smtplib.SMTP:
+    """返回可用的 SMTP 连接，必要时重新连接并登录（调用方需持有 _smtp_lock）。"""
+    global _smtp_conn, _smtp_sent_count
+    if _smtp_conn is not None:
+        if (time.monotonic() - _smtp_last_use > _SMTP_MAX_IDLE_SECONDS
+                or _smtp_sent_count >= _SMTP_MAX_MESSAGES_PER_CONN):
+            _close_smtp_conn()
+        else:
+            try:
+                if _smtp_conn.noop()[0] != 250:
+                    _close_smtp_conn()
+            except (smtplib.SMTPException, OSError):
+                _close_smtp_conn()
+
+    if _smtp_conn is None:
+        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=_SMTP_TIMEOUT_SECONDS)
+        server.ehlo()
+        # 如果 SMTP 支持 STARTTLS，则启用加密
+        if server.has_extn("STARTTLS"):
+            server.starttls()
+            server.ehlo()
+        server.login(SMTP_USER, SMTP_PASSWORD)
+        _smtp_conn = server
+        _smtp_sent_count = 0
+    return _smtp_conn
+
+
+def _close_smtp_conn_at_exit():
+    """进程退出时礼貌地发送 QUIT，关闭复用的 SMTP 连接。"""
+    with _smtp_lock:
+        _close_smtp_conn()
+
+
+atexit.register(_close_smtp_conn_at_exit)
+
+
+@lru_cache(maxsize=32)
+def _address_headers(to_addrs: Tuple[str, ...]) -> Tuple[BaseHeader, BaseHeader]:
+    """按收件人列表缓存解析后的 From/To 头对象，地址头只解析一次。"""
+    factory = email.policy.default.header_factory
+    return factory("From", SMTP_USER), factory("To", ", ".join(to_addrs))
+
+
+def _build_message(subject: str, content: str, to_addrs: List[str]) -> EmailMessage:
+    """构造纯文本告警邮件：From/To 使用缓存的头对象，只需解析 Subject 与正文。"""
+    from_header, to_header = _address_headers(tuple(to_addrs))
+    msg = EmailMessage()
+    # 带 name 属性的头对象由 policy 原样存储，不会重新解析
+    msg["From"] = from_header
+    msg["To"] = to_header
+    msg["Subject"] = subject
+    msg.set_content(content, charset="utf-8")
+    return msg
+
+
+def _record_send():
+    """记录复用连接的最近使用时间与已发送数量（调用方需持有 _smtp_lock）。"""
+    global _smtp_last_use, _smtp_sent_count
+    _smtp_last_use = time.monotonic()
+    _smtp_sent_count += 1
+
+
+def _send_on_shared_conn(msg: EmailMessage, to_addrs: List[str]):
+    """在复用连接上发送一封邮件，连接被服务端断开时重连重试一次（调用方需持有 _smtp_lock）。"""
+    try:
+        _ensure_smtp_conn().send_message(msg, SMTP_USER, to_addrs)
+    except (smtplib.SMTPServerDisconnected, OSError):
+        # 服务端在 NOOP 之后断开连接，重连后重试一次
+        _close_smtp_conn()
+        _ensure_smtp_conn().send_message(msg, SMTP_USER, to_addrs)
+    _record_send()
+
+
+def _smtp_ready(to_addrs: List[str], subject: str) -> bool:
+    """检查 SMTP 配置与收件人是否完整，不完整时记录 Warning 日志。"""
+    if SMTP_SERVER and SMTP_PORT and SMTP_USER and SMTP_PASSWORD and to_addrs:
+        return True
+    # 修改日志信息，明确指出是配置不完整或收件人列表为空
+    if not to_addrs:
+        logger.warning(
+            f"[LocalAlertAdapter][告警跳过] 邮件收件人列表 (ALERT_EMAIL_LIST) 为空。主题: {subject}"
+        )
+    else:
+        logger.warning(
+            f"[LocalAlertAdapter][告警跳过] SMTP 邮件配置不完整。主题: {subject}"
+        )
+    return False
+
+
 class LocalAlertAdapter:
     """
     本地告警实现类：
     - send_email(subject, content, to_addrs): 使用 SMTP 发送纯文本邮件
     - notify(subject, content): 统一调用入口，使用预定义收件人列表发送告警邮件
+    - notify_batch(items): 在同一个 SMTP 会话中连续发送多封告警邮件
     """
 
     @staticmethod
@@ -33,35 +151,16 @@ class LocalAlertAdapter:
         若 SMTP_USER/SMTP_PASSWORD/SMTP_SERVER 未配置或 to_addrs 为空，则仅记录 Warning 日志，跳过发送。
         """
         # 检查 SMTP 及收件人是否配置完整
-        if SMTP_SERVER and SMTP_PORT and SMTP_USER and SMTP_PASSWORD and to_addrs:
-            msg = MIMEText(content, "plain", "utf-8")
-            msg["Subject"] = subject
-            msg["From"] = SMTP_USER
-            msg["To"] = ", ".join(to_addrs)
-
-            try:
-                with smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=10) as server:
-                    server.ehlo()
-                    # 如果 SMTP 支持 STARTTLS，则启用加密
-                    if server.has_extn("STARTTLS"):
-                        server.starttls()
-                        server.ehlo()
-                    server.login(SMTP_USER, SMTP_PASSWORD)
-                    server.sendmail(SMTP_USER, to_addrs, msg.as_string())
-                logger.info(f"[LocalAlertAdapter] 邮件告警已发送 → 主题: {subject}, 收件人: {to_addrs}")
-            except Exception as e:
-                logger.error(f"[LocalAlertAdapter] 发送邮件告警失败 → 主题: {subject}, 异常: {e}", exc_info=True)
-        else:
-            # 修改日志信息，明确指出是配置不完整或收件人列表为空
-            if not to_addrs:
-                logger.warning(
-                    f"[LocalAlertAdapter][告警跳过] 邮件收件人列表 (ALERT_EMAIL_LIST) 为空。主题: {subject}"
-                )
-            else:
-                logger.warning(
-                    f"[LocalAlertAdapter][告警跳过] SMTP 邮件配置不完整。主题: {subject}"
-                )
+        if not _smtp_ready(to_addrs, subject):
+            return
 
+        msg = _build_message(subject, content, to_addrs)
+        try:
+            with _smtp_lock:
+                _send_on_shared_conn(msg, to_addrs)
+            logger.info(f"[LocalAlertAdapter] 邮件告警已发送 → 主题: {subject}, 收件人: {to_addrs}")
+        except Exception as e:
+            logger.error(f"[LocalAlertAdapter] 发送邮件告警失败 → 主题: {subject}, 异常: {e}", exc_info=True)
 
     @staticmethod
     def notify(subject: str, content: str):
@@ -72,4 +171,43 @@ class LocalAlertAdapter:
         # 从 settings 中读取收件人列表
         to_addrs = ALERT_EMAIL_LIST
         logger.info(f"[LocalAlertAdapter] 准备发送邮件告警 → 主题: {subject}, 目标收件人: {to_addrs}")
-        LocalAlertAdapter.send_email(subject, content, to_addrs)
\ No newline at end of file
+        LocalAlertAdapter.send_email(subject, content, to_addrs)
+
+    @staticmethod
+    def notify_batch(items: List[Tuple[str, str]]):
+        """
+        批量发送告警邮件：整批只获取一次连接锁，多封邮件共用同一 SMTP 会话，
+        连接只在批次开始（或出错重连）时做一次 NOOP 探测；每封邮件成功后服务端已回到初始事务状态，无需 RSET。
+        失败数达到批量的 1/3 时放弃剩余邮件，避免持续冲击故障的邮件服务。
+        参数：
+          items: [(subject, content), ...]
+        """
+        if not items:
+            return
+        to_addrs = ALERT_EMAIL_LIST
+        if not _smtp_ready(to_addrs, items[0][0]):
+            return
+
+        max_failures = max(1, len(items) // 3)
+        failures = 0
+        sent = 0
+        with _smtp_lock:
+            server = None
+            for subject, content in items:
+                msg = _build_message(subject, content, to_addrs)
+                try:
+                    if server is None:
+                        server = _ensure_smtp_conn()
+                    server.send_message(msg, SMTP_USER, to_addrs)
+                    _record_send()
+                    sent += 1
+                except Exception as e:
+                    failures += 1
+                    logger.error(f"[LocalAlertAdapter] 批量告警发送失败 → 主题: {subject}, 异常: {e}", exc_info=True)
+                    # 丢弃可能处于异常状态的连接，下一封邮件重新建立
+                    _close_smtp_conn()
+                    server = None
+                    if failures >= max_failures:
+                        logger.error(f"[LocalAlertAdapter] 批量告警失败数达到 {failures}/{len(items)}，放弃剩余邮件。")
+                        break
+        logger.info(f"[LocalAlertAdapter] 批量邮件告警完成 → 成功 {sent}/{len(items)} 封, 收件人: {to_addrs}")
@@ -4,17 +4,20 @@
 Coder Agent: 根据 state.research_results 生成代码并执行，写入 state.code_results。
 """
 
-import redis
 import time
-import json
+from hashlib import blake2b
+
+import orjson  # redis publish 可直接使用其输出的 bytes
 from typing import Dict, Any # Ensure Dict, Any are imported
 
-from src.config.settings import REDIS_HOST, REDIS_PORT, REDIS_DB
 # Make sure cache functions are imported if used
 from src.utils.cache import get_cached, cache_result
+from src.utils.event_bus import SessionEventBus
+from src.utils.redis_client import get_client as _get_redis
 
 
-_pubsub = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, decode_responses=True)
+# 发布客户端共用 src.utils.redis_client 的连接池
+_pubsub = _get_redis()
 
 def coder_agent(state: Dict[str, Any]) -> Dict[str, Any]:
     session_id = state.get("_session_id", "")
@@ -22,14 +25,11 @@ def coder_agent(state: Dict[str, Any]) -> Dict[str, Any]:
     channel = f"channel:session:{session_id}" if session_id else None
 
 
-    # 发布“START”
+    # 发布“START”（写入事件缓冲；负载字典在 COMPLETE 时复用，仅修改 status/timestamp）
+    bus = SessionEventBus(_pubsub)
+    payload = {"session_id": session_id, "node": "coder", "status": "START", "timestamp": int(time.time() * 1000)}
     if channel:
-        _pubsub.publish(channel, json.dumps({
-            "session_id": session_id,
-            "node": "coder",
-            "status": "START",
-            "timestamp": int(time.time() * 1000)
-        }))
+        bus.publish(channel, orjson.dumps(payload))
 
     # … 原有编译/执行逻辑 …
     topic = state.get("topic", "default_topic") # Get topic, provide default if not present
@@ -38,22 +38,25 @@ def coder_agent(state: Dict[str, Any]) -> Dict[str, Any]:
     # The original user example for this task implied direct cache use based on topic,
     # not necessarily complex compilation or execution.
     # If topic is "default_topic" because it was missing, this logic will proceed with that.
-    cache_key = f"code:{topic}"
+    # 缓存写入与缓冲中的状态消息放入同一管道，节省 Redis 往返
+    pipe = _pubsub.pipeline(transaction=False)
+    # 以主题的短哈希作为键，限制 Redis 键长度
+    cache_key = f"code:{blake2b(topic.encode('utf-8'), digest_size=8).hexdigest()}"
     cached = get_cached(cache_key) # from src.utils.cache
     if cached is not None: # get_cached returns None if not found
         code_res = cached
     else:
         # Simulate code generation based on topic
         code_res = {"code_output": f"Hello from {topic}!", "execution_success": True}
-        cache_result(cache_key, code_res, ex=3600) # from src.utils.cache
+        cache_result(cache_key, code_res, ex=3600, pipe=pipe) # from src.utils.cache
 
     # 发布“COMPLETE”
     if channel:
-        _pubsub.publish(channel, json.dumps({
-            "session_id": session_id,
-            "node": "coder",
-            "status": "COMPLETE",
-            "timestamp": int(time.time() * 1000)
-        }))
+        payload["status"] = "COMPLETE"
+        payload["timestamp"] = int(time.time() * 1000)
+        bus.publish(channel, orjson.dumps(payload))
+    bus.flush(pipe)
+    if len(pipe):
+        pipe.execute()
 
     return {"code_results": code_res}
@@ -4,28 +4,30 @@
 Planner Agent: 接收 state.topic，生成 state.tasks 列表。
 """
 
-import redis
 import time
-import json
+
+import orjson  # redis publish 可直接使用其输出的 bytes
 from typing import Dict, Any # Ensure Dict, Any are imported
 
-from src.config.settings import REDIS_HOST, REDIS_PORT, REDIS_DB
+from src.utils.event_bus import SessionEventBus
+from src.utils.redis_client import get_client as _get_redis
+
+# 发布客户端共用 src.utils.redis_client 的连接池
+_pubsub = _get_redis()
 
-_pubsub = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, decode_responses=True)
+# 任务模板在模块导入时构建一次，每次规划只替换主题
+_TASK_TEMPLATES = ("Research about {t}", "Code for {t}", "Report on {t}")
 
 def planner_agent(state: Dict[str, Any]) -> Dict[str, Any]: # Ensure function name is planner_agent
     session_id = state.get("_session_id", "")
     # Only define channel and publish if session_id is present
     channel = f"channel:session:{session_id}" if session_id else None
 
-    # 发布“START”
+    # 状态消息写入事件缓冲，在节点结束时通过一个 pipeline 统一发布（一次往返）
+    bus = SessionEventBus(_pubsub)
+    payload = {"session_id": session_id, "node": "planner", "status": "START", "timestamp": int(time.time() * 1000)}
     if channel:
-        _pubsub.publish(channel, json.dumps({
-            "session_id": session_id,
-            "node": "planner",
-            "status": "START",
-            "timestamp": int(time.time() * 1000)
-        }))
+        bus.publish(channel, orjson.dumps(payload))
 
     # … 原有规划逻辑 …
     topic = state.get("topic")
@@ -36,16 +38,14 @@ def planner_agent(state: Dict[str, Any]) -> Dict[str, Any]: # Ensure function na
         # logger.warning(f"Planner agent called for session {session_id} without a topic.")
         pass
     else:
-        tasks = [f"Research about {topic}", f"Code for {topic}", f"Report on {topic}"]
+        tasks = [template.format(t=topic) for template in _TASK_TEMPLATES]
 
 
-    # 发布“COMPLETE”
+    # 发布“COMPLETE”（复用同一个负载字典，仅修改 status/timestamp），节点边界统一 flush
     if channel:
-        _pubsub.publish(channel, json.dumps({
-            "session_id": session_id,
-            "node": "planner",
-            "status": "COMPLETE",
-            "timestamp": int(time.time() * 1000)
-        }))
+        payload["status"] = "COMPLETE"
+        payload["timestamp"] = int(time.time() * 1000)
+        bus.publish(channel, orjson.dumps(payload))
+    bus.flush()
 
     return {"tasks": tasks}
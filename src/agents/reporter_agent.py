@@ -4,16 +4,103 @@
 Reporter Agent：将 plan 中所有任务的检索结果与代码执行结果
 整理为 Markdown，并调用 OutputGenerator 生成 TXT/PDF/PPT。
 """
-import os
 import asyncio
 import json
-import aiofiles # 修复：导入 aiofiles
-from typing import Dict, Any, List
+import os
+import threading
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Dict, Any, List, Optional, Tuple
 from src.tools.output_generator import OutputGenerator
+from src.utils.fs import ensure_dir
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Markdown 报告片段模板（模块导入时构建一次）
+_REPORT_HEADER_TMPL = "# 研究报告：{topic}\n\n"
+_TASK_HEADER_TMPL = "## {idx}. {name}\n\n"
+_RESULT_TMPL = (
+    "{idx}. **{title}**\n"
+    "   - **来源**: {source}\n"
+    "   - **链接**: [{url}]({url})\n"
+    "   - **相关性分数**: {score:.2f}\n"
+    "   - **摘要**: {summary}\n\n"
+)
+_CODE_TMPL = "### 代码执行详情：\n```python\n{code}\n```\n\n"
+_STDOUT_TMPL = "#### 输出：\n```text\n{text}\n```\n\n"
+_STDERR_TMPL = "#### 错误：\n```text\n{text}\n```\n\n"
+_RETURNCODE_TMPL = "- **代码返回值**：`{returncode}`\n\n"
+
+# 摘要中的换行替换为空格（str.translate 一遍完成 \n 与 \r 的替换）
+_NL_TABLE = str.maketrans({"\n": " ", "\r": " "})
+_SUMMARY_MAX_CHARS = 150
+
+# 输出格式在日志中的显示名称
+_FORMAT_LABELS = {"md": "Markdown", "txt": "TXT", "pdf": "PDF", "ppt": "PPT"}
+
+# 报告结果缓存：output_dir -> (报告内容哈希, 各格式文件路径)。
+# 各格式文件名在目录内固定，因此按目录只记录最近一次成功生成的内容；内容未变且文件仍在时跳过重新生成
+_REPORT_CACHE_MAXSIZE = 64
+_report_cache: "OrderedDict[str, Tuple[str, Dict[str, str]]]" = OrderedDict()
+_report_cache_lock = threading.Lock()
+
+
+def _report_hash(markdown_content: str, formats: List[str]) -> str:
+    """报告内容 + 请求的格式列表的短哈希（幻灯片摘要同样由 Markdown 所用的任务数据得出）"""
+    h = blake2b(markdown_content.encode("utf-8"), digest_size=16)
+    h.update(",".join(formats).encode("ascii"))
+    return h.hexdigest()
+
+
+def _get_cached_report(output_dir: str, content_hash: str) -> Optional[Dict[str, str]]:
+    with _report_cache_lock:
+        entry = _report_cache.get(output_dir)
+    if entry is None or entry[0] != content_hash:
+        return None
+    paths = entry[1]
+    if not all(os.path.exists(path) for path in paths.values()):
+        return None
+    return dict(paths)
+
+
+def _put_cached_report(output_dir: str, content_hash: str, paths: Dict[str, str]) -> None:
+    with _report_cache_lock:
+        _report_cache[output_dir] = (content_hash, dict(paths))
+        _report_cache.move_to_end(output_dir)
+        if len(_report_cache) > _REPORT_CACHE_MAXSIZE:
+            _report_cache.popitem(last=False)
+
+
+def _build_ppt_data(topic: str, summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """根据 Markdown 拼接阶段收集的任务摘要构建传给 OutputGenerator.to_ppt 的幻灯片 JSON。"""
+    ppt_json_slides = []
+    for summary in summaries:
+        slide_content_lines = []
+        if summary["top3"]:
+            slide_content_lines.append("主要发现：")
+            slide_content_lines.extend(f"  {r_idx}. {title}" for r_idx, title in enumerate(summary["top3"], 1))
+        if summary["has_stdout"]:
+            slide_content_lines.append("\n代码执行概要：请参阅详细报告。")
+        elif summary["has_code"]:
+            slide_content_lines.append("\n代码片段：请参阅详细报告。")
+
+        if not slide_content_lines:
+            slide_content_lines.append("此任务无关键信息摘要。")
+
+        ppt_json_slides.append({"heading": summary["heading"], "content": "\n".join(slide_content_lines)})
+
+    return {"title": f"研究报告：{topic}", "slides": ppt_json_slides}
+
+
+async def _generate_ppt(og: OutputGenerator, topic: str, summaries: List[Dict[str, Any]]) -> str:
+    """构建幻灯片数据并生成 PPTX；构建过程中的异常与生成异常一样由调用方统一处理。"""
+    ppt_data_for_generator = _build_ppt_data(topic, summaries)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("传递给PPT生成器的JSON: %s", json.dumps(ppt_data_for_generator, indent=2, ensure_ascii=False))
+    return await og.to_ppt(ppt_data_for_generator)
+
+
 async def run_reporter(plan: Dict[str, Any]) -> Dict[str, Any]:
     """
     输入：
@@ -30,128 +117,123 @@ async def run_reporter(plan: Dict[str, Any]) -> Dict[str, Any]:
 
     logger.info(f"Reporter Agent：开始为主题「{topic}」生成报告。输出选项: {output_options}")
 
-    # 1. 拼接 Markdown 文本
-    md_lines = []
-    md_lines.append(f"# 研究报告：{topic}\n\n")
+    # 没有需要由 Reporter 生成的格式时（如仅 audio），无需拼接 Markdown 或创建 OutputGenerator
+    formats = [fmt for fmt in _FORMAT_LABELS if fmt in output_options]
+    if not formats:
+        logger.info("Reporter Agent：根据输出选项，本次运行无需生成报告文件。")
+        plan["report_paths"] = {}
+        return plan
+
+    # 1. 拼接 Markdown 文本（每个检索结果 / 代码块各格式化一次模板）
+    # 同一遍遍历中收集每个任务的幻灯片摘要，供 PPT 生成复用
+    md_parts = [_REPORT_HEADER_TMPL.format(topic=topic)]
+    append = md_parts.append
+    summaries: List[Dict[str, Any]] = []
     for i, task in enumerate(tasks, 1):
-        name = task.get("name", f"子任务 {i}")
-        md_lines.append(f"## {i}. {name}\n\n")
+        append(_TASK_HEADER_TMPL.format(idx=i, name=task.get("name", f"子任务 {i}")))
 
         results = task.get("results", [])
         if results:
-            md_lines.append("### 检索结果：\n")
+            append("### 检索结果：\n")
             for idx, r in enumerate(results, 1):
-                title = r.get("title", "无标题")
-                url = r.get("url", "#")
-                source = r.get("source", "未知来源")
-                score = r.get("score", 0.0)
-                content_snippet = r.get("content", "无内容").replace("\n", " ").strip()
-                content_display = (content_snippet[:150] + '...') if len(content_snippet) > 150 else content_snippet
-                md_lines.append(f"{idx}. **{title}**\n")
-                md_lines.append(f"   - **来源**: {source}\n")
-                md_lines.append(f"   - **链接**: [{url}]({url})\n")
-                md_lines.append(f"   - **相关性分数**: {score:.2f}\n")
-                md_lines.append(f"   - **摘要**: {content_display}\n\n")
+                get = r.get
+                url = get("url", "#")
+                content_snippet = get("content", "无内容").translate(_NL_TABLE).strip()
+                summary = content_snippet[:_SUMMARY_MAX_CHARS]
+                if len(content_snippet) > _SUMMARY_MAX_CHARS:
+                    summary += "..."
+                append(_RESULT_TMPL.format(
+                    idx=idx,
+                    title=get("title", "无标题"),
+                    source=get("source", "未知来源"),
+                    url=url,
+                    score=get("score", 0.0),
+                    summary=summary,
+                ))
         else:
-            md_lines.append("本任务无检索结果。\n\n")
+            append("本任务无检索结果。\n\n")
 
         code_to_execute = task.get("code", "").strip()
         code_res = task.get("code_result", {})
         if code_to_execute:
-            md_lines.append("### 代码执行详情：\n")
-            md_lines.append("```python\n")
-            md_lines.append(code_to_execute + "\n")
-            md_lines.append("```\n\n")
+            append(_CODE_TMPL.format(code=code_to_execute))
             if code_res:
                 stdout = code_res.get("stdout", "")
                 stderr = code_res.get("stderr", "")
-                returncode = code_res.get("returncode", None)
                 if stdout:
-                    md_lines.append("#### 输出：\n```text\n")
-                    md_lines.append(stdout.strip() + "\n```\n\n")
+                    append(_STDOUT_TMPL.format(text=stdout.strip()))
                 if stderr:
-                    md_lines.append("#### 错误：\n```text\n")
-                    md_lines.append(stderr.strip() + "\n```\n\n")
-                md_lines.append(f"- **代码返回值**：`{returncode}`\n\n")
+                    append(_STDERR_TMPL.format(text=stderr.strip()))
+                append(_RETURNCODE_TMPL.format(returncode=code_res.get("returncode", None)))
             else:
-                md_lines.append("此任务中的代码未执行或无结果。\n\n")
+                append("此任务中的代码未执行或无结果。\n\n")
         elif "code_result" in task and not code_to_execute:
-             md_lines.append("此任务未提供可执行代码。\n\n")
-
-    markdown_content = "".join(md_lines)
-    logger.debug(f"生成的Markdown内容:\n{markdown_content[:500]}...")
+             append("此任务未提供可执行代码。\n\n")
+
+        summaries.append({
+            "heading": task.get("name", "子任务"),
+            "top3": [r.get("title", "无标题") for r in results[:3]],
+            "has_stdout": bool(code_res.get("stdout")),
+            "has_code": bool(code_to_execute),
+        })
+
+    markdown_content = "".join(md_parts)
+    logger.debug("生成的Markdown内容:\n%.500s...", markdown_content)
+
+    # 与该目录上次成功生成的报告内容相同时直接复用已有文件
+    content_hash = _report_hash(markdown_content, formats)
+    cached_paths = _get_cached_report(output_dir, content_hash)
+    if cached_paths is not None:
+        plan["report_paths"] = cached_paths
+        logger.info(f"Reporter Agent：报告内容未变化，复用已生成的文件：{cached_paths}")
+        return plan
 
     # 2. 确保输出目录存在
     try:
-        os.makedirs(output_dir, exist_ok=True)
+        ensure_dir(output_dir)
     except OSError as e:
         logger.error(f"创建输出目录 '{output_dir}' 失败: {e}")
         plan["report_paths"] = {"error": f"创建输出目录失败: {e}"}
         return plan
 
-    # 3. 调用 OutputGenerator 逐个生成文件
+    # 3. 调用 OutputGenerator 并发生成各格式文件（彼此独立，总耗时取决于最慢的一个）
     og_config = {"output_dir": output_dir}
     og = OutputGenerator(og_config)
     generated_paths: Dict[str, str] = {}
 
-    # 修复：在 to_markdown 中使用 aiofiles
-    try:
-        if "md" in output_options:
-            md_path = await og.to_markdown(markdown_content)
-            generated_paths["md"] = md_path
-            logger.info(f"Markdown报告已生成：{md_path}")
-    except Exception as e:
-        logger.error(f"生成Markdown文件失败: {e}")
-        generated_paths["md"] = f"错误: {e}"
-
-    try:
-        if "txt" in output_options:
-            txt_path = await og.to_text(markdown_content)
-            generated_paths["txt"] = txt_path
-            logger.info(f"纯文本报告已生成：{txt_path}")
-    except Exception as e:
-        logger.error(f"生成TXT文件失败: {e}")
-        generated_paths["txt"] = f"错误: {e}"
-
-    try:
-        if "pdf" in output_options:
-            pdf_path = await og.to_pdf(markdown_content)
-            generated_paths["pdf"] = pdf_path
-            logger.info(f"PDF报告已生成：{pdf_path}")
-    except Exception as e:
-        logger.error(f"生成PDF文件失败: {e}")
-        generated_paths["pdf"] = f"错误: {e}"
+    # 需要 PDF 时预先解析一次 Markdown，各导出方法共用同一份解析结果
+    source = markdown_content
+    if "pdf" in output_options:
+        try:
+            source = await og.prepare(markdown_content)
+        except Exception as e:
+            logger.error(f"预解析Markdown失败，PDF 将单独解析: {e}")
+
+    jobs: Dict[str, Any] = {}
+    if "md" in output_options:
+        jobs["md"] = og.to_markdown(source)
+    if "txt" in output_options:
+        jobs["txt"] = og.to_text(source)
+    if "pdf" in output_options:
+        jobs["pdf"] = og.to_pdf(source)
+    if "ppt" in output_options:
+        jobs["ppt"] = _generate_ppt(og, topic, summaries)
+
+    done = await asyncio.gather(*jobs.values(), return_exceptions=True)
+    failed = False
+    for fmt, result in zip(jobs, done):
+        label = _FORMAT_LABELS[fmt]
+        if isinstance(result, BaseException):
+            failed = True
+            logger.error(f"生成{label}文件失败: {result}", exc_info=result)
+            generated_paths[fmt] = f"错误: {result}"
+        else:
+            generated_paths[fmt] = result
+            logger.info(f"{label}报告已生成：{result}")
 
-    try:
-        if "ppt" in output_options:
-            ppt_json_slides = []
-            for task in tasks:
-                heading = task.get("name", "子任务")
-                slide_content_lines = []
-                task_results = task.get("results", [])
-                if task_results:
-                    slide_content_lines.append("主要发现：")
-                    for r_idx, r in enumerate(task_results[:3],1):
-                        slide_content_lines.append(f"  {r_idx}. {r.get('title', '无标题')}")
-                if task.get("code_result", {}).get('stdout'):
-                    slide_content_lines.append("\n代码执行概要：请参阅详细报告。")
-                elif task.get("code","").strip():
-                     slide_content_lines.append("\n代码片段：请参阅详细报告。")
-
-                if not slide_content_lines:
-                    slide_content_lines.append("此任务无关键信息摘要。")
-
-                ppt_json_slides.append({"heading": heading, "content": "\n".join(slide_content_lines)})
-
-            ppt_data_for_generator = {"title": f"研究报告：{topic}", "slides": ppt_json_slides}
-            logger.debug(f"传递给PPT生成器的JSON: {json.dumps(ppt_data_for_generator, indent=2, ensure_ascii=False)}")
-
-            ppt_path = await og.to_ppt(ppt_data_for_generator)
-            generated_paths["ppt"] = ppt_path
-            logger.info(f"PPT报告已生成：{ppt_path}")
-    except Exception as e:
-        logger.error(f"生成PPT文件失败: {e}", exc_info=True)
-        generated_paths["ppt"] = f"错误: {e}"
+    # 仅缓存全部格式均生成成功的结果
+    if not failed:
+        _put_cached_report(output_dir, content_hash, generated_paths)
 
     # 4. 将路径写回 plan
     plan["report_paths"] = generated_paths
@@ -4,30 +4,42 @@
 Researcher Agent: 根据 state.tasks 中的具体任务执行检索，并把结果写入 state.research_results。
 """
 
-import redis
+import asyncio
+import logging
 import time
-import json
-from typing import Dict, Any # Ensure Dict, Any are imported
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Dict, Any, List # Ensure Dict, Any are imported
 
-from src.config.settings import REDIS_HOST, REDIS_PORT, REDIS_DB
+import orjson  # redis publish 可直接使用其输出的 bytes
+
+from src.config.settings import MAX_PARALLEL_TASKS
+from src.tools.fused_search import fused_search
 # Make sure cache functions are imported if used
 from src.utils.cache import get_cached, cache_result
+from src.utils.event_bus import SessionEventBus
+from src.utils.redis_client import get_client as _get_redis
+
+logger = logging.getLogger(__name__)
+
+# 发布客户端共用 src.utils.redis_client 的连接池
+_pubsub = _get_redis()
 
-_pubsub = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, decode_responses=True)
+# 状态消息模板：只有 session_id（已做 JSON 转义）与时间戳随调用变化，无需每次序列化整个字典
+_START_MSG_TMPL = b'{"session_id":%s,"node":"researcher","status":"START","timestamp":%d}'
+_COMPLETE_MSG_TMPL = b'{"session_id":%s,"node":"researcher","status":"COMPLETE","timestamp":%d}'
 
 def research_agent(state: Dict[str, Any]) -> Dict[str, Any]: # Ensure function name is research_agent
     session_id = state.get("_session_id", "")
     # Only define channel and publish if session_id is present
     channel = f"channel:session:{session_id}" if session_id else None
 
-    # 发布“START”
+    # 发布“START”：先写入事件缓冲。命中缓存时与 COMPLETE 在同一个非事务 pipeline 中发布（一次往返）；
+    # 未命中时在检索前立即发布，订阅方仍能及时看到节点开始
+    bus = SessionEventBus(_pubsub)
     if channel:
-        _pubsub.publish(channel, json.dumps({
-            "session_id": session_id,
-            "node": "researcher",
-            "status": "START",
-            "timestamp": int(time.time() * 1000)
-        }))
+        session_json = orjson.dumps(session_id)
+        bus.publish(channel, _START_MSG_TMPL % (session_json, int(time.time() * 1000)))
 
     # … 原有检索逻辑 … （示例用缓存或模拟结果）
     topic = state.get("topic")
@@ -43,17 +55,102 @@ def research_agent(state: Dict[str, Any]) -> Dict[str, Any]: # Ensure function n
         if cached is not None: # Explicitly check for None, as an empty list/dict from cache could be valid.
             results = cached
         else:
+            bus.flush()
             # Simulate research
             results = [{"title": f"Result 1 for {topic}"}, {"title": f"Result 2 for {topic}"}]
             cache_result(cache_key, results, ex=3600) # from src.utils.cache
 
     # 发布“COMPLETE”
     if channel:
-        _pubsub.publish(channel, json.dumps({
-            "session_id": session_id,
-            "node": "researcher",
-            "status": "COMPLETE",
-            "timestamp": int(time.time() * 1000)
-        }))
+        bus.publish(channel, _COMPLETE_MSG_TMPL % (session_json, int(time.time() * 1000)))
+    bus.flush()
 
     return {"research_results": results}
+
+
+def _task_query(task: Any) -> str:
+    """任务既可能是字符串，也可能是带 prompt/name 字段的字典，统一取出检索语句。"""
+    if isinstance(task, dict):
+        return task.get("prompt") or task.get("name") or ""
+    return str(task)
+
+
+# fused_search 结果缓存的有效期（秒）与每个来源返回的条数
+_SEARCH_CACHE_TTL = 3600
+_SEARCH_TOP_K = 5
+
+
+@lru_cache(maxsize=256)
+def _search_cache_key(query: str, top_k: int) -> str:
+    """检索缓存键：先规整空白（仅空白不同的语句共用缓存），再取短哈希限制键长。"""
+    normalized = " ".join(query.split())
+    digest = blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+    return f"fused:{digest}:{top_k}"
+
+
+def _cached_fused_search(query: str, top_k: int = _SEARCH_TOP_K) -> List[Dict[str, Any]]:
+    """
+    带 Redis 缓存的 fused_search（同步，供线程池调用）：
+    - 命中缓存时不再访问任何外部检索服务；
+    - 仅缓存非空结果，避免检索服务临时故障导致的空结果被缓存一小时；
+    - 缓存读写失败不影响检索本身。
+    """
+    cache_key = _search_cache_key(query, top_k)
+    try:
+        cached = get_cached(cache_key)
+    except Exception as e:
+        logger.warning(f"读取检索缓存失败: '{query}'，错误: {e}")
+        cached = None
+    if cached is not None:
+        return cached
+
+    results = fused_search(query, top_k)
+    if results:
+        try:
+            cache_result(cache_key, results, ex=_SEARCH_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"写入检索缓存失败: '{query}'，错误: {e}")
+    return results
+
+
+async def _run_task(query: str, semaphore: asyncio.Semaphore) -> List[Dict[str, Any]]:
+    """
+    执行单条检索语句。缓存查询与 fused_search 均为同步阻塞调用（Redis / HTTP 请求），
+    整体放入线程池执行；信号量限制同时在途的检索数量。异常由 run_researcher 统一处理。
+    """
+    if not query:
+        return []
+    async with semaphore:
+        return await asyncio.to_thread(_cached_fused_search, query, _SEARCH_TOP_K)
+
+
+async def run_researcher(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    LangGraph Researcher 节点：对 plan["tasks"] 中相互独立的子任务并发检索，
+    总耗时由各任务耗时之和降为其中的最大值。
+    - 相同检索语句只检索一次，结果经 Redis 缓存（_cached_fused_search）复用于后续运行；
+    - 字典型任务直接回写 results 字段，供 Reporter 使用；
+    - research_results 以检索语句为键汇总全部结果。
+    """
+    tasks = plan.get("tasks") or []
+    queries = [_task_query(t) for t in tasks]
+    # 相同检索语句只检索一次
+    distinct_queries = list(dict.fromkeys(queries))
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_TASKS)
+    results = await asyncio.gather(*(_run_task(q, semaphore) for q in distinct_queries),
+                                   return_exceptions=True)
+
+    # 单个检索失败不影响其他子任务，失败的检索语句记为空结果
+    research_results: Dict[str, Any] = {}
+    for query, query_results in zip(distinct_queries, results):
+        if isinstance(query_results, BaseException):
+            logger.error(f"子任务检索失败: '{query}'，错误: {query_results}")
+            query_results = []
+        research_results[query] = query_results
+
+    for task, query in zip(tasks, queries):
+        if isinstance(task, dict):
+            task["results"] = list(research_results[query])
+
+    logger.info(f"Researcher 并发完成 {len(tasks)} 个子任务检索（去重后 {len(distinct_queries)} 条检索语句）")
+    return {"tasks": tasks, "research_results": research_results}
@@ -1,17 +1,55 @@
 # 文件路径: src/agents/voice_agent.py
 # -*- coding: utf-8 -*-
 """
-Voice Agent：将最终报告文本通过 gTTS 转为 MP3，写入指定输出目录。
+Voice Agent：将最终报告文本转为 MP3，写入指定输出目录。
+- TTS_ENGINE=EDGE 且已安装 edge-tts 时，音频分块流式写入文件，无需等待整篇合成完成；
+- 其余情况（或 edge-tts 合成失败）使用 gTTS。
 """
 import os
+import re
 import asyncio
-import aiofiles # 修复：导入 aiofiles
 from gtts import gTTS
 from typing import Dict, Any
 import logging
 
+from src.config.settings import DEFAULT_TTS_ENGINE, EDGE_TTS_VOICE, TTSEngine
+from src.utils.fs import ensure_dir
+
+try:
+    import edge_tts
+except ImportError:  # edge-tts 为可选依赖
+    edge_tts = None
+
 logger = logging.getLogger(__name__)
 
+# 文件名中非字母数字的字符替换为下划线（\W 在 str 模式下按 Unicode 匹配，中文等字符会被保留）
+_SLUG_RE = re.compile(r"\W")
+
+
+def _read_text_sync(path: str) -> str:
+    """同步读取文本文件；由 asyncio.to_thread 整体放入线程池执行。"""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+async def _synthesize_edge(text_content: str, audio_path: str) -> None:
+    """edge-tts 流式合成：音频块到达即写入文件，文件打开/关闭放入线程池执行。"""
+    communicate = edge_tts.Communicate(text_content, EDGE_TTS_VOICE)
+    audio_file = await asyncio.to_thread(open, audio_path, "wb")
+    try:
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                # 带缓冲的本地写入，单块开销远小于一次线程切换
+                audio_file.write(chunk["data"])
+    finally:
+        await asyncio.to_thread(audio_file.close)
+
+
+def _synthesize_gtts(text_content: str, audio_path: str) -> None:
+    """gTTS 同步合成；由 asyncio.to_thread 放入线程池执行。"""
+    tts = gTTS(text=text_content, lang="zh-cn", slow=False)
+    tts.save(audio_path)
+
 
 async def run_voice(plan: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -39,9 +77,8 @@ async def run_voice(plan: Dict[str, Any]) -> Dict[str, Any]:
     logger.info(f"Voice Agent：开始处理文本报告「{txt_path}」以生成语音。")
 
     try:
-        # 修复：使用 aiofiles 异步读取文件内容
-        async with aiofiles.open(txt_path, "r", encoding="utf-8") as f:
-            text_content = await f.read()
+        # open+read 一次性放入线程池，避免 aiofiles 每个操作各切换一次线程
+        text_content = await asyncio.to_thread(_read_text_sync, txt_path)
     except Exception as e:
         logger.error(f"Voice Agent：读取文本文件「{txt_path}」失败：{e}")
         return plan
@@ -51,25 +88,30 @@ async def run_voice(plan: Dict[str, Any]) -> Dict[str, Any]:
         return plan
 
     try:
-        os.makedirs(output_dir, exist_ok=True)
+        ensure_dir(output_dir)
     except OSError as e:
         logger.error(f"Voice Agent：创建输出目录「{output_dir}」失败：{e}")
         return plan
 
-    topic_slug = "".join(c if c.isalnum() else "_" for c in plan.get("topic", "report"))[:50]
+    topic_slug = _SLUG_RE.sub("_", plan.get("topic", "report"))[:50]
     audio_filename = f"{topic_slug}_audio.mp3"
     audio_path = os.path.join(output_dir, audio_filename)
 
+    if DEFAULT_TTS_ENGINE is TTSEngine.EDGE and edge_tts is not None:
+        try:
+            logger.info(f"Voice Agent：开始使用edge-tts流式合成语音（{EDGE_TTS_VOICE}）...")
+            await _synthesize_edge(text_content, audio_path)
+            plan["audio_path"] = audio_path
+            logger.info(f"Voice Agent：语音合成完成，音频文件已保存至「{audio_path}」。")
+            return plan
+        except Exception as e:
+            logger.warning(f"Voice Agent：edge-tts 合成失败，回退到 gTTS：{e}")
+    elif DEFAULT_TTS_ENGINE is TTSEngine.EDGE:
+        logger.warning("Voice Agent：未安装 edge-tts，回退到 gTTS。")
+
     try:
         logger.info("Voice Agent：开始使用gTTS合成语音，这可能需要一些时间...")
-
-        loop = asyncio.get_running_loop()
-
-        def generate_audio_sync():
-            tts = gTTS(text=text_content, lang="zh-cn", slow=False)
-            tts.save(audio_path)
-
-        await loop.run_in_executor(None, generate_audio_sync)
+        await asyncio.to_thread(_synthesize_gtts, text_content, audio_path)
 
         plan["audio_path"] = audio_path
         logger.info(f"Voice Agent：语音合成完成，音频文件已保存至「{audio_path}」。")
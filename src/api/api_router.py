@@ -1,49 +1,111 @@
-# src/a# 文件路径：src/api/api_router.py
-# # -*- coding: utf-8 -*-
-# """
-# REST API 路由定义：提供两个查询接口
-#   - GET /api/queue_length: 返回当前 Redis 队列长度
-#   - GET /api/failure_rate: 返回当前节点故障率
-# """
-#
-# from fastapi import APIRouter, HTTPException, Depends
-# from typing import List
-#
-# from src.workers.queue_monitor import get_queue_length
-# from src.workers.alert import get_failure_rate
-# from src.config.settings import API_KEYS
-#
-# # 简单的 API Key 校验依赖
-# async def verify_api_key(x_api_key: str = Depends(lambda x_api_key: x_api_key in API_KEYS)):
-#     if not x_api_key:
-#         raise HTTPException(status_code=401, detail="Unauthorized: Invalid or Missing API Key")
-#
-# router = APIRouter(dependencies=[Depends(verify_api_key)])
-#
-# @router.get("/api/queue_length")
-# async def api_get_queue_length():
-#     """
-#     获取当前 Redis 队列 (queue:session_tasks) 的长度
-#     返回示例:
-#       { "queue_length": 123 }
-#     """
-#     try:
-#         length = get_queue_length("queue:session_tasks")
-#         if length == -1:
-#             raise HTTPException(status_code=503, detail="无法连接到 Redis 或获取队列长度失败")
-#         return {"queue_length": length}
-#     except Exception as e:
-#         raise HTTPException(status_code=500, detail=f"获取队列长度异常: {e}")
-#
-# @router.get("/api/failure_rate")
-# async def api_get_failure_rate():
-#     """
-#     获取当前节点故障率（最近 MAX_WINDOW_SIZE 条任务）
-#     返回示例:
-#       { "failure_rate": 0.07 }
-#     """
-#     try:
-#         rate = get_failure_rate()
-#         return {"failure_rate": rate}
-#     except Exception as e:
-#         raise HTTPException(status_code=500, detail=f"获取失败率异常: {e}")
\ No newline at end of file
+# 文件路径：src/api/api_router.py
+# -*- coding: utf-8 -*-
+"""
+REST API 路由定义：提供两个查询接口
+  - GET /api/queue_length: 返回当前 Redis 队列长度
+  - GET /api/failure_rate: 返回当前节点故障率
+两个指标由后台任务 refresh_metrics_loop 每 METRICS_REFRESH_SECONDS 秒刷新一次快照，
+接口直接返回快照并附带 ETag / Cache-Control，N 次请求只对应每秒一次 Redis 查询。
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+
+from src.workers.queue_monitor import get_queue_length
+from src.workers.alert import get_failure_rate
+from src.config.settings import API_KEY_SET, METRICS_REFRESH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+QUEUE_NAME = "queue:session_tasks"
+
+# 指标快照：{"queue_length": int, "failure_rate": float, "ts": 刷新时间(ns)}；未刷新前为 None
+_snapshot: Optional[dict] = None
+# 快照最多每个刷新间隔变化一次，客户端可在此期间复用响应
+_CACHE_CONTROL = f"max-age={max(1, int(METRICS_REFRESH_SECONDS))}"
+
+
+# 简单的 API Key 校验依赖
+async def verify_api_key(x_api_key: Optional[str] = Header(None)):
+    if not x_api_key or x_api_key not in API_KEY_SET:
+        raise HTTPException(status_code=401, detail="Unauthorized: Invalid or Missing API Key")
+
+router = APIRouter(dependencies=[Depends(verify_api_key)])
+
+
+async def refresh_snapshot() -> dict:
+    """读取一次队列长度（同步 Redis 调用，放入线程池）与故障率，替换当前快照。"""
+    global _snapshot
+    queue_length = await asyncio.to_thread(get_queue_length, QUEUE_NAME)
+    _snapshot = {"queue_length": queue_length, "failure_rate": get_failure_rate(), "ts": time.time_ns()}
+    return _snapshot
+
+
+async def refresh_metrics_loop(interval: float = METRICS_REFRESH_SECONDS):
+    """后台任务：按固定间隔刷新指标快照，由应用启动时创建。"""
+    logger.info(f"[API] 指标快照刷新任务已启动, 间隔: {interval}秒")
+    while True:
+        try:
+            await refresh_snapshot()
+        except Exception as e:
+            logger.error(f"[API] 刷新指标快照异常: {e}", exc_info=True)
+        await asyncio.sleep(interval)
+
+
+async def _current_snapshot(request: Request, response: Response) -> Optional[dict]:
+    """
+    返回当前快照并设置缓存相关响应头；快照尚未生成时（后台任务未启动）同步刷新一次。
+    客户端 If-None-Match 与当前 ETag 一致时返回 None，由调用方回复 304。
+    """
+    snapshot = _snapshot if _snapshot is not None else await refresh_snapshot()
+    etag = f'"{snapshot["ts"]}"'
+    if request.headers.get("if-none-match") == etag:
+        return None
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = _CACHE_CONTROL
+    return snapshot
+
+
+def _not_modified(request: Request) -> Response:
+    return Response(status_code=304, headers={
+        "ETag": request.headers["if-none-match"],
+        "Cache-Control": _CACHE_CONTROL,
+    })
+
+
+@router.get("/api/queue_length")
+async def api_get_queue_length(request: Request, response: Response):
+    """
+    获取当前 Redis 队列 (queue:session_tasks) 的长度
+    返回示例:
+      { "queue_length": 123 }
+    """
+    try:
+        snapshot = await _current_snapshot(request, response)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取队列长度异常: {e}")
+    if snapshot is None:
+        return _not_modified(request)
+    if snapshot["queue_length"] == -1:
+        raise HTTPException(status_code=503, detail="无法连接到 Redis 或获取队列长度失败")
+    return {"queue_length": snapshot["queue_length"]}
+
+
+@router.get("/api/failure_rate")
+async def api_get_failure_rate(request: Request, response: Response):
+    """
+    获取当前节点故障率（最近 MAX_WINDOW_SIZE 条任务）
+    返回示例:
+      { "failure_rate": 0.07 }
+    """
+    try:
+        snapshot = await _current_snapshot(request, response)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取失败率异常: {e}")
+    if snapshot is None:
+        return _not_modified(request)
+    return {"failure_rate": snapshot["failure_rate"]}
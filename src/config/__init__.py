@@ -1,9 +1,8 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
-from .loader import load_yaml_config
-from .questions import BUILT_IN_QUESTIONS, BUILT_IN_QUESTIONS_ZH_CN
 # 从 settings.py 导入搜索引擎常量与枚举
+# （settings.py 在导入时已调用 load_dotenv()，此处无需再次加载 .env）
 from .settings import SELECTED_SEARCH_ENGINE, SearchEngine
 
 # 从 loader.py 导入 YAML 配置加载函数
@@ -12,13 +11,6 @@ from .loader import load_yaml_config
 # 从 questions.py 导入内置问题列表
 from .questions import BUILT_IN_QUESTIONS, BUILT_IN_QUESTIONS_ZH_CN
 
-# 从 .env 文件加载环境变量
-from dotenv import load_dotenv
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
 # Team configuration
 TEAM_MEMBER_CONFIGRATIONS = {
     "researcher": {
@@ -47,8 +39,6 @@ TEAM_MEMBER_CONFIGRATIONS = {
 
 TEAM_MEMBERS = list(TEAM_MEMBER_CONFIGRATIONS.keys())
 
-load_dotenv()
-
 # __all__ 定义了从该包（config）中 'from src.config import *' 时会导入的名称
 __all__ = [
     "SELECTED_SEARCH_ENGINE",
@@ -5,78 +5,123 @@ YAML 配置文件加载器，支持环境变量替换。
 """
 import logging
 import os
+import re
 import yaml
-from typing import Dict, Any
+from hashlib import blake2b
+from typing import Dict, Any, Tuple
 
-# 缓存已加载和处理过的配置，避免重复IO和解析
+# 优先使用 libyaml 的 C 实现解析，明显快于纯 Python 的 SafeLoader
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# 缓存已加载和处理过的配置，避免重复IO和解析；键为绝对路径，值为 ((st_mtime_ns, st_size), 配置)，
+# 文件被修改后自动失效，无需重启进程
 # 简化注释：配置缓存
-_config_cache: Dict[str, Dict[str, Any]] = {}
+_config_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+# 内容哈希 -> 处理后的配置：内容相同的配置文件（不同路径、或被 touch 过）共用同一份解析结果
+_CONTENT_INTERN_MAXSIZE = 32
+_content_intern: Dict[bytes, Dict[str, Any]] = {}
+
+# 整个字符串为 $VAR 或 ${VAR} 时替换为对应环境变量
+_ENV_RE = re.compile(r"\$(?:\{([A-Za-z_]\w*)\}|([A-Za-z_]\w*))")
+_env = os.environ
 
 
 def replace_env_vars(value: Any) -> Any:
     """
-    如果值是字符串且以 '$' 开头，则替换为环境变量。
+    如果值是形如 $VAR 或 ${VAR} 的字符串，则替换为环境变量。
     简化注释：替换环境变量
     """
-    if isinstance(value, str) and value.startswith("$"):
-        env_var_name = value[1:]  # 获取环境变量名 (去掉 '$')
-        # os.getenv 的第二个参数是默认值，如果环境变量不存在，则返回原始值 (如 "$VAR")
-        return os.getenv(env_var_name, value)
+    if isinstance(value, str):
+        m = _ENV_RE.fullmatch(value)
+        if m:
+            # 如果环境变量不存在，则返回原始值 (如 "$VAR")
+            return _env.get(m.group(1) or m.group(2), value)
     return value
 
 
+def _replace_in_list(items: list) -> None:
+    """原地替换列表中的环境变量（嵌套的字典 / 列表递归处理）。"""
+    for i, item in enumerate(items):
+        if isinstance(item, dict):
+            process_dict(item)
+        elif isinstance(item, list):
+            _replace_in_list(item)
+        else:
+            items[i] = replace_env_vars(item)
+
+
 def process_dict(config: Dict[str, Any]) -> Dict[str, Any]:
     """
     递归遍历字典，对所有字符串值应用环境变量替换。
+    原地修改并返回传入的字典，不再为每一层构建新的字典 / 列表。
     简化注释：递归处理字典
     """
     if not isinstance(config, dict):
         return config
 
-    processed = {}
     for key, value in config.items():
         if isinstance(value, dict):
             # 如果值是字典，则递归处理
-            processed[key] = process_dict(value)
+            process_dict(value)
         elif isinstance(value, list):
-            # 如果值是列表，则遍历列表中的每个元素
-            processed[key] = [process_dict(item) if isinstance(item, dict) else replace_env_vars(item) for item in
-                              value]
+            # 如果值是列表，则原地处理列表中的每个元素
+            _replace_in_list(value)
         else:
             # 对其他类型的值（主要是字符串）进行环境变量替换
-            processed[key] = replace_env_vars(value)
-    return processed
+            config[key] = replace_env_vars(value)
+    return config
 
 
 def load_yaml_config(file_path: str) -> Dict[str, Any]:
     """
     加载并处理 YAML 配置文件。
     - 修复：在 open() 函数中增加了 encoding='utf-8'，以解决在 Windows 环境下的 'gbk' 解码错误。
-    - 增加了对文件不存在的检查和缓存功能。
+    - 增加了对文件不存在的检查和缓存功能；缓存以文件修改时间校验。
     简化注释：加载YAML配置
     """
-    # 如果文件路径已在缓存中，直接返回缓存结果
-    if file_path in _config_cache:
-        return _config_cache[file_path]
-
     # 如果文件不存在，记录警告并返回空字典
-    if not os.path.exists(file_path):
+    abs_path = os.path.abspath(file_path)
+    try:
+        st = os.stat(abs_path)
+    except FileNotFoundError:
         logging.warning(f"配置文件未找到: {file_path}，将返回空配置。")
         return {}
+    stamp = (st.st_mtime_ns, st.st_size)
+
+    # 如果文件路径已在缓存中且文件未被修改，直接返回缓存结果
+    cached = _config_cache.get(abs_path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
 
     # --- 核心修复点 ---
-    # 使用 'utf-8' 编码打开文件，防止在不同操作系统上出现解码错误
+    # 以字节读取并按 'utf-8' 解码，防止在不同操作系统上出现解码错误
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f) or {}  # 如果文件为空，yaml.safe_load返回None，我们将其置为{}
+        with open(abs_path, "rb") as f:
+            raw = f.read()
     except Exception as e:
-        logging.error(f"读取或解析YAML文件失败: {file_path}, 错误: {e}", exc_info=True)
-        return {}  # 发生错误时返回空字典
+        logging.error(f"读取YAML文件失败: {file_path}, 错误: {e}", exc_info=True)
+        return {}
+
+    # 内容未变（例如仅修改时间变化，或另一路径下的同内容文件）时复用已处理的配置，跳过 YAML 解析
+    digest = blake2b(raw, digest_size=16).digest()
+    processed_config = _content_intern.get(digest)
+    if processed_config is None:
+        try:
+            config = yaml.load(raw.decode("utf-8"), Loader=_YamlLoader) or {}  # 如果文件为空，yaml.load返回None，我们将其置为{}
+        except Exception as e:
+            logging.error(f"读取或解析YAML文件失败: {file_path}, 错误: {e}", exc_info=True)
+            return {}  # 发生错误时返回空字典
 
-    # 处理环境变量替换
-    processed_config = process_dict(config)
+        # 处理环境变量替换；源文件中没有 '$' 时不可能存在环境变量引用，直接跳过整棵树的遍历
+        processed_config = process_dict(config) if b"$" in raw else config
+        if len(_content_intern) >= _CONTENT_INTERN_MAXSIZE:
+            _content_intern.pop(next(iter(_content_intern)))
+        _content_intern[digest] = processed_config
 
     # 将处理后的配置存入缓存
-    _config_cache[file_path] = processed_config
+    _config_cache[abs_path] = (stamp, processed_config)
 
-    return processed_config
\ No newline at end of file
+    return processed_config
@@ -3,15 +3,26 @@
 """
 项目全局配置文件：从环境变量或 .env 中读取各类配置，
 包括 Redis 连接、告警阈值、SMTP、钉钉机器人、FastAPI 服务等。
-所有模块通过 import settings 来获取对应配置。
+所有模块通过 import settings 来获取对应配置；
+也可通过 get_settings() 获取进程内唯一的只读 Settings 快照（.env 仅在本模块首次导入时解析一次）。
 """
 
 import os
+import re
+from dataclasses import dataclass, fields
+from functools import lru_cache
 from dotenv import load_dotenv
 from enum import Enum
+from typing import FrozenSet, Tuple
 
-# 仅在开发或测试阶段加载 .env；生产环境可由 Kubernetes ConfigMap、Docker Env 或 CI/CD 填充
-load_dotenv()
+# 逗号分隔列表的解析：一次 findall 取出所有非空、非空白的条目
+_CSV = re.compile(r"[^,\s]+")
+
+# 仅在开发或测试阶段（DEEPFLOW_ENV=dev，默认值）加载 .env；
+# 生产环境由 Kubernetes ConfigMap、Docker Env 或 CI/CD 填充，设置 DEEPFLOW_ENV=prod 等即可跳过 .env 的查找与解析
+DEEPFLOW_ENV = os.getenv("DEEPFLOW_ENV", "dev")
+if DEEPFLOW_ENV == "dev":
+    load_dotenv()
 
 # -------------------- Redis 配置 --------------------
 # Redis 服务主机地址，默认 127.0.0.1；国内服务器可根据实际部署修改
@@ -20,11 +31,17 @@ REDIS_HOST = os.getenv("REDIS_HOST", "127.0.0.1")
 REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
 # Redis 数据库索引，默认 0
 REDIS_DB = int(os.getenv("REDIS_DB", 0))
+# 共享连接池的最大连接数（每个连接池），限制并发会话下的文件描述符占用
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 32))
+# 连接池耗尽时等待空闲连接的最长时间（秒），超时后抛出 ConnectionError，默认 5s
+REDIS_POOL_TIMEOUT_SECONDS = float(os.getenv("REDIS_POOL_TIMEOUT_SECONDS", 5))
 
 # -------------------- API 鉴权配置 --------------------
 # 项目的 API Key 列表，以逗号分隔，必须通过环境变量设置；若为空，则抛出异常
 API_KEYS_STR = os.getenv("API_KEYS", "")
-API_KEYS = [key.strip() for key in API_KEYS_STR.split(',') if key.strip()]
+API_KEYS = tuple(_CSV.findall(API_KEYS_STR))
+# 鉴权时做成员判断用的集合
+API_KEY_SET = frozenset(API_KEYS)
 if not API_KEYS:
     raise ValueError("请在环境变量中设置 API_KEYS（以逗号分隔多个 Key）")
 
@@ -52,7 +69,7 @@ SMTP_USER = os.getenv("SMTP_USER", "")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
 # 收件人列表，以逗号分隔，格式示例 "alice@example.com,bob@example.com"
 ALERT_EMAIL_LIST_STR = os.getenv("ALERT_EMAIL_LIST", "")
-ALERT_EMAIL_LIST = [email.strip() for email in ALERT_EMAIL_LIST_STR.split(',') if email.strip()]
+ALERT_EMAIL_LIST = tuple(_CSV.findall(ALERT_EMAIL_LIST_STR))
 
 # -------------------- 钉钉机器人告警配置 --------------------
 # 钉钉自定义机器人 Webhook 地址
@@ -69,6 +86,8 @@ API_PORT = int(os.getenv("API_PORT", 8000))
 # -------------------- APScheduler 定时任务配置 --------------------
 # 定时任务（队列监控、节点故障率监控）循环间隔（秒），默认 60s
 JOB_INTERVAL_SECONDS = int(os.getenv("JOB_INTERVAL_SECONDS", 60))
+# REST 查询接口（/api/queue_length、/api/failure_rate）快照的后台刷新间隔（秒），默认 1s
+METRICS_REFRESH_SECONDS = float(os.getenv("METRICS_REFRESH_SECONDS", 1))
 
 # -------------------- Prometheus 指标埋点（可选） --------------------
 # 若设置为 true，则启用指标埋点并暴露 /metrics 接口
@@ -77,7 +96,35 @@ PROMETHEUS_METRICS_ENABLED = os.getenv("PROMETHEUS_METRICS_ENABLED", "false").lo
 # -------------------- 所有节点名称，用于 Prometheus 监控（可选） --------------------
 # 在最初阶段，可不使用；如果在指标中需要标签，可在 .env 中设置 ALL_NODES="planner,researcher,coder,reporter,voice"
 ALL_NODES_STR = os.getenv("ALL_NODES", "planner,researcher,coder,reporter,voice")
-ALL_NODES = [node.strip() for node in ALL_NODES_STR.split(',') if node.strip()]
+ALL_NODES = tuple(_CSV.findall(ALL_NODES_STR))
+
+# -------------------- 并发配置 --------------------
+# Researcher 节点并发执行子任务的上限，避免触发检索服务 / LLM 的限流
+MAX_PARALLEL_TASKS = int(os.getenv("MAX_PARALLEL_TASKS", 8))
+
+# -------------------- 状态事件批量发布配置 --------------------
+# 节点状态消息缓冲条数上限，达到后立即通过 pipeline 发布
+EVENT_BATCH_SIZE = int(os.getenv("EVENT_BATCH_SIZE", 16))
+# 缓冲中首条消息的最长等待时间（毫秒），超过后随下一条消息一起发布
+EVENT_FLUSH_MS = int(os.getenv("EVENT_FLUSH_MS", 50))
+
+# -------------------- 会话状态过期配置 --------------------
+# 会话状态在 Redis 中的有效期（秒），每次读取时刷新，默认 24 小时
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", 86400))
+# 执行失败的会话状态有效期（秒），较短以免错误状态长期占用 Redis 内存，默认 1 小时
+ERROR_STATE_TTL_SECONDS = int(os.getenv("ERROR_STATE_TTL_SECONDS", 3600))
+
+# -------------------- LangGraph 预热配置 --------------------
+# 设为 1 / true 时，在导入 src.graph.builder 时即导入全部节点并编译图（可配合 gunicorn --preload 等预加载钩子），
+# 节点缺失或配置错误在进程启动时立即暴露，首个请求无需承担编译开销
+DEEPFLOW_WARMUP_GRAPH = os.getenv("DEEPFLOW_WARMUP_GRAPH", "0").lower() in ("1", "true")
+
+# -------------------- LangGraph 检查点配置 --------------------
+# SQLite 检查点文件路径；相同 thread_id 的重复执行可直接复用已完成的结果。默认为空（关闭），需显式配置才启用；
+# 检查点文件不会自动清理，启用后需自行定期删除或轮换
+LANGGRAPH_CHECKPOINT_DB = os.getenv("LANGGRAPH_CHECKPOINT_DB", "")
+# 已完成检查点的最长复用时间（秒），超过后重新执行图，默认 24 小时
+LANGGRAPH_CHECKPOINT_MAX_AGE_SECONDS = int(os.getenv("LANGGRAPH_CHECKPOINT_MAX_AGE_SECONDS", 86400))
 
 # -------------------- TTS 引擎配置 --------------------
 # 可选 TTS 引擎，用于 Voice Agent 语音合成
@@ -85,6 +132,60 @@ class TTSEngine(Enum):
     GTTS = "GTTS"       # 使用 gTTS 库
     AZURE = "AZURE"     # 使用 Azure TTS（可扩展）
     GOOGLE = "GOOGLE"   # 使用 Google TTS（可扩展）
+    EDGE = "EDGE"       # 使用 edge-tts（原生异步，边合成边写入）
 
 # 从环境变量读取默认 TTS 引擎，若为空则使用 GTTS
-DEFAULT_TTS_ENGINE = TTSEngine(os.getenv("TTS_ENGINE", "GTTS"))
\ No newline at end of file
+DEFAULT_TTS_ENGINE = TTSEngine(os.getenv("TTS_ENGINE", "GTTS"))
+# edge-tts 使用的发音人
+EDGE_TTS_VOICE = os.getenv("EDGE_TTS_VOICE", "zh-CN-XiaoxiaoNeural")
+
+
+# -------------------- 只读配置快照 --------------------
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """上述模块级配置的只读快照，字段名与模块常量一致。"""
+    DEEPFLOW_ENV: str
+    REDIS_HOST: str
+    REDIS_PORT: int
+    REDIS_DB: int
+    REDIS_MAX_CONNECTIONS: int
+    REDIS_POOL_TIMEOUT_SECONDS: float
+    API_KEYS: Tuple[str, ...]
+    API_KEY_SET: FrozenSet[str]
+    QUEUE_ALERT_THRESHOLD: int
+    FAILURE_RATE_THRESHOLD: float
+    ALERT_PROVIDER: str
+    ALERT_STATE_EXPIRY_SECONDS: int
+    SMTP_SERVER: str
+    SMTP_PORT: int
+    SMTP_USER: str
+    SMTP_PASSWORD: str
+    ALERT_EMAIL_LIST: Tuple[str, ...]
+    DINGTALK_WEBHOOK: str
+    DINGTALK_SECRET: str
+    API_HOST: str
+    API_PORT: int
+    JOB_INTERVAL_SECONDS: int
+    METRICS_REFRESH_SECONDS: float
+    PROMETHEUS_METRICS_ENABLED: bool
+    ALL_NODES: Tuple[str, ...]
+    MAX_PARALLEL_TASKS: int
+    EVENT_BATCH_SIZE: int
+    EVENT_FLUSH_MS: int
+    SESSION_TTL_SECONDS: int
+    ERROR_STATE_TTL_SECONDS: int
+    DEEPFLOW_WARMUP_GRAPH: bool
+    LANGGRAPH_CHECKPOINT_DB: str
+    LANGGRAPH_CHECKPOINT_MAX_AGE_SECONDS: int
+    DEFAULT_TTS_ENGINE: TTSEngine
+    EDGE_TTS_VOICE: str
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    返回进程内唯一的 Settings 实例：直接取自模块导入时已解析的常量，
+    不再重复调用 load_dotenv() 或读取 os.environ。
+    """
+    module_globals = globals()
+    return Settings(**{f.name: module_globals[f.name] for f in fields(Settings)})
@@ -5,33 +5,68 @@
 - `build_graph()`: 从 langgraph.json 配置文件动态构建 StateGraph。
 - `run_langgraph()`: 集成了分布式锁、Redis状态持久化（支持分片）、Pub/Sub消息通知、
   以及详细的异常处理机制，是整个研究流程的核心驱动函数。
+- `arun_langgraph()`: run_langgraph 的异步版本（redis.asyncio + ainvoke），供 FastAPI 接口直接 await。
 """
 
+import asyncio
+import hashlib
 import os
 import json
 import logging
+import secrets
+import sqlite3
+import threading
 import time
-import uuid  # 确保导入 uuid
-from typing import Dict, Any, Optional, TypedDict  # 确保导入 TypedDict
+from datetime import datetime, timezone
+from functools import cache, lru_cache
+from typing import Dict, Any, Iterable, Optional, TypedDict  # 确保导入 TypedDict
 
+import orjson  # redis publish 可直接使用其输出的 bytes
 from langgraph.graph import StateGraph, START, END  # 从 langgraph.graph 导入
 
 from src.utils.logging import init_logger
 from src.utils.cache import (
     get_state_sharded, set_state_sharded, delete_state_sharded,
-    get_state, set_state, delete_state
+    get_state, set_state, delete_state, get_state_fields_sharded,
+    aget_state, aget_state_sharded
 )
-from src.utils.lock import acquire_lock, release_lock
-from src.config.settings import REDIS_HOST, REDIS_PORT, REDIS_DB
-
-import redis
+from src.utils.lock import acquire_lock, release_lock, release_lock_with_pipe, aacquire_lock, arelease_lock
+from src.utils.redis_client import get_client as _get_redis, get_async_client as _get_async_redis
+from src.config.settings import get_settings
 
 # 初始化日志
 init_logger("INFO")  # 确保日志已配置
 logger = logging.getLogger(__name__)
 
-# Pub/Sub 客户端 (用于发布“全流程 START/COMPLETE/ERROR” 以及各节点状态)
-_pubsub = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, decode_responses=True)
+_settings = get_settings()
+
+@cache
+def _pubsub():
+    """
+    Pub/Sub 客户端 (用于发布“全流程 START/COMPLETE/ERROR” 以及各节点状态)，共用 src.utils.redis_client 的连接池。
+    首次发布时才创建，仅导入本模块（测试、CLI --help、不发布消息的 Worker）不会构造客户端。
+    """
+    return _get_redis()
+
+
+@cache
+def _apubsub():
+    """arun_langgraph 使用的 redis.asyncio 客户端，共用 src.utils.redis_client 的异步连接池，首次使用时才创建。"""
+    return _get_async_redis()
+
+# 全流程事件模板：字段顺序与原字典一致，只有 session_id / 时间戳 / 附带字段（均已做 JSON 编码）随调用变化
+_ALL_START_TMPL = b'{"session_id":%s,"node":"ALL","status":"START","timestamp":%d,"topic":%s}'
+_ALL_COMPLETE_TMPL = (b'{"session_id":%s,"node":"ALL","status":"COMPLETE","timestamp":%d,'
+                      b'"report_paths":%s,"audio_path":%s}')
+_ALL_ERROR_TMPL = b'{"session_id":%s,"node":"ALL","status":"ERROR","error":%s,"timestamp":%d}'
+
+# 调试日志中不输出的大字段（检索结果、代码结果可能达到 MB 级）
+_STATE_LOG_EXCLUDE = frozenset(("research_results", "code_results"))
+
+
+def _state_for_log(state: Dict[str, Any]) -> Dict[str, Any]:
+    """返回去除大字段后的状态视图，仅用于调试日志。"""
+    return {k: state[k] for k in state.keys() - _STATE_LOG_EXCLUDE}
 
 
 # 定义 LangGraph 状态模式 (StateSchema)
@@ -53,28 +88,40 @@ class StateSchema(TypedDict, total=False):
     output_options: Optional[list[str]]  # 输出格式选项
 
 
+# 项目根目录下的 langgraph.json（兼容不同执行路径）
+try:
+    _BASE_PATH = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+except NameError:  # 如果在某些非标准 Python 环境中 __file__ 未定义
+    _BASE_PATH = os.getcwd()
+_LANGGRAPH_JSON_PATH = os.path.join(_BASE_PATH, "langgraph.json")
+
+
+def _graph_def_mtime_ns() -> int:
+    """langgraph.json 的修改时间（图定义与已编译图的缓存键）；文件不存在时抛出 FileNotFoundError。"""
+    try:
+        return os.stat(_LANGGRAPH_JSON_PATH).st_mtime_ns
+    except FileNotFoundError:
+        logger.error(f"langgraph.json 文件未找到，路径: {_LANGGRAPH_JSON_PATH}")
+        raise FileNotFoundError(f"核心配置文件 langgraph.json 未在路径 {_LANGGRAPH_JSON_PATH} 找到。")
+
+
+@lru_cache(maxsize=1)
+def _load_graph_def(graph_def_mtime_ns: int) -> Dict[str, Any]:
+    """读取并解析 langgraph.json；按修改时间缓存，文件未变化时不再重复 open/read/json 解析。"""
+    with open(_LANGGRAPH_JSON_PATH, "r", encoding="utf-8") as f:
+        graph_def = json.load(f)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"已加载 langgraph.json 内容: {json.dumps(graph_def, indent=2, ensure_ascii=False)}")
+    return graph_def
+
+
 def build_graph() -> StateGraph:
     """
     读取项目根目录下的 langgraph.json 并注册节点至 StateGraph。
     不包含持久化或插件逻辑，仅负责图结构定义。
     """
     logger.info("开始构建 LangGraph 实例...")
-    try:
-        # 获取项目根目录，兼容不同执行路径
-        base_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    except NameError:  # 如果在某些非标准 Python 环境中 __file__ 未定义
-        base_path = os.getcwd()
-
-    lg_json_path = os.path.join(base_path, "langgraph.json")
-    logger.debug(f"期望的 langgraph.json 路径: {lg_json_path}")
-
-    if not os.path.exists(lg_json_path):
-        logger.error(f"langgraph.json 文件未找到，路径: {lg_json_path}")
-        raise FileNotFoundError(f"核心配置文件 langgraph.json 未在路径 {lg_json_path} 找到。")
-
-    with open(lg_json_path, "r", encoding="utf-8") as f:
-        graph_def = json.load(f)
-    logger.debug(f"已加载 langgraph.json 内容: {json.dumps(graph_def, indent=2, ensure_ascii=False)}")
+    graph_def = _load_graph_def(_graph_def_mtime_ns())
 
     graph = StateGraph(StateSchema)  # 使用定义好的 StateSchema
 
@@ -83,6 +130,11 @@ def build_graph() -> StateGraph:
     if not nodes_config:
         logger.warning("langgraph.json 中未定义任何节点 (nodes)。")
 
+    # 节点函数按 langgraph.json 中的 module / func 解析（在此处导入，避免仅使用运行器的模块提前加载全部 Agent；
+    # 导入 registry 时内置 Agent 节点已并行预解析，命中 (模块路径, 函数名) 缓存）
+    from src.graph.registry import import_node_functions
+
+    node_specs = []
     for node_name, node_info in nodes_config.items():
         module_path_str = node_info.get("module", "")
         func_name_str = node_info.get("func", "")
@@ -96,19 +148,18 @@ def build_graph() -> StateGraph:
             full_module_path = f"src.{module_path_str}"
         else:
             full_module_path = module_path_str
+        node_specs.append((node_name, full_module_path, func_name_str))
 
-        try:
-            module_components = full_module_path.split(".")
-            # __import__ 的 fromlist 参数需要是模块的直接父包或最后一级组件
-            imported_module = __import__(full_module_path, fromlist=[module_components[-1]])
-            node_function = getattr(imported_module, func_name_str)
-
-            graph.add_node(node_name, node_function)
-            logger.info(f"已成功注册节点 '{node_name}' -> {full_module_path}.{func_name_str}")
-        except (ImportError, AttributeError) as e:
-            logger.error(f"导入或获取节点函数 {full_module_path}.{func_name_str} (节点名: '{node_name}') 失败: {e}",
-                         exc_info=True)
-            raise
+    try:
+        node_functions = import_node_functions(node_specs)
+    except (ImportError, AttributeError) as e:
+        logger.error(f"导入节点函数失败 (节点: {[spec[0] for spec in node_specs]}): {e}", exc_info=True)
+        raise
+
+    # 按 langgraph.json 中的顺序串行注册节点
+    for node_name, node_function in node_functions:
+        graph.add_node(node_name, node_function)
+        logger.info(f"已成功注册节点 '{node_name}' -> {node_function.__module__}.{node_function.__name__}")
 
     # 注册边
     edges_config = graph_def.get("edges", [])
@@ -157,26 +208,202 @@ def build_graph_with_memory() -> StateGraph:
     return build_graph()
 
 
+# LangGraph 检查点（SQLite），首次使用时初始化；依赖未安装或未配置时为 None
+_checkpointer = None
+_checkpointer_initialized = False
+_checkpointer_lock = threading.Lock()
+
+
+def _get_checkpointer():
+    """
+    返回进程内共享的 SqliteSaver 检查点实例。
+    - 需要安装 langgraph-checkpoint-sqlite，未安装时记录日志并返回 None；
+    - LANGGRAPH_CHECKPOINT_DB 为空时关闭检查点。
+    """
+    global _checkpointer, _checkpointer_initialized
+    if _checkpointer_initialized:
+        return _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer_initialized:
+            return _checkpointer
+        _checkpointer_initialized = True
+        if not _settings.LANGGRAPH_CHECKPOINT_DB:
+            logger.info("未配置 LANGGRAPH_CHECKPOINT_DB，LangGraph 检查点已关闭。")
+            return None
+        try:
+            from langgraph.checkpoint.sqlite import SqliteSaver
+        except ImportError:
+            logger.info("未安装 langgraph-checkpoint-sqlite，LangGraph 检查点已关闭。")
+            return None
+        # 同一连接会被多个调用线程共享，SqliteSaver 内部自带锁
+        conn = sqlite3.connect(_settings.LANGGRAPH_CHECKPOINT_DB, check_same_thread=False)
+        _checkpointer = SqliteSaver(conn)
+        logger.info(f"LangGraph 检查点已启用: {_settings.LANGGRAPH_CHECKPOINT_DB}")
+    return _checkpointer
+
+
+# arun_langgraph 使用的 AsyncSqliteSaver：aiosqlite 连接绑定在创建它的事件循环上，按事件循环各建一个；
+# 保存打开连接的 Task，同一事件循环内并发的首次调用等待同一个 Task，不会重复建立连接
+_acheckpointer_task: Optional[asyncio.Task] = None
+_acheckpointer_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def _open_async_checkpointer():
+    try:
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError:
+        logger.info("未安装 langgraph-checkpoint-sqlite / aiosqlite，LangGraph 异步检查点已关闭。")
+        return None
+    conn = await aiosqlite.connect(_settings.LANGGRAPH_CHECKPOINT_DB)
+    logger.info(f"LangGraph 异步检查点已启用: {_settings.LANGGRAPH_CHECKPOINT_DB}")
+    return AsyncSqliteSaver(conn)
+
+
+async def _aget_checkpointer():
+    """
+    返回当前事件循环共享的 AsyncSqliteSaver 检查点实例；LANGGRAPH_CHECKPOINT_DB 为空或依赖未安装时返回 None。
+    图中的 Researcher / Reporter / Voice 为协程节点，只能经 ainvoke 执行，同步的 SqliteSaver 不支持异步接口。
+    """
+    global _acheckpointer_task, _acheckpointer_loop
+    if not _settings.LANGGRAPH_CHECKPOINT_DB:
+        return None
+    loop = asyncio.get_running_loop()
+    if (_acheckpointer_task is None or _acheckpointer_loop is not loop
+            or (_acheckpointer_task.done() and (_acheckpointer_task.cancelled()
+                                                 or _acheckpointer_task.exception() is not None))):
+        # 首次调用、切换到新的事件循环，或上次打开失败时重新建立连接
+        _acheckpointer_task = loop.create_task(_open_async_checkpointer())
+        _acheckpointer_loop = loop
+    return await _acheckpointer_task
+
+
+# 带异步检查点的已编译图：(基础图, 检查点实例, 副本)，基础图或检查点实例变化时重新生成
+_async_runnable_cache: tuple = (None, None, None)
+
+
+def _with_checkpointer(runnable, checkpointer):
+    """返回使用指定检查点实例的已编译图副本（浅复制，不重新编译），按 (图, 检查点) 缓存。"""
+    global _async_runnable_cache
+    cached_runnable, cached_checkpointer, cached_copy = _async_runnable_cache
+    if cached_runnable is runnable and cached_checkpointer is checkpointer:
+        return cached_copy
+    runnable_copy = runnable.copy(update={"checkpointer": checkpointer})
+    _async_runnable_cache = (runnable, checkpointer, runnable_copy)
+    return runnable_copy
+
+
+@lru_cache(maxsize=1)
+def _compiled_runnable(graph_def_mtime_ns: int):
+    """
+    构建并编译图，结果按 langgraph.json 的修改时间缓存：
+    同一份图定义在进程内只读取、导入节点并编译一次，文件修改后自动重新编译。
+    """
+    graph = build_graph_with_memory()
+    checkpointer = _get_checkpointer()
+    return graph.compile(checkpointer=checkpointer) if checkpointer else graph.compile()
+
+
+# lru_cache 本身不阻止并发未命中：冷启动时多个会话同时到达会各自编译一遍图，这里串行化取用
+_compile_lock = threading.Lock()
+
+
+def _get_runnable():
+    """返回当前 langgraph.json 对应的已编译图；缓存未命中时只有一个线程编译，其余线程等待后直接复用。"""
+    graph_def_mtime_ns = _graph_def_mtime_ns()
+    with _compile_lock:
+        return _compiled_runnable(graph_def_mtime_ns)
+
+
+# 状态存取函数组，按 use_sharded（False=0 / True=1）索引，导入时构建一次
+_PERSISTERS = (
+    (get_state, set_state, delete_state),
+    (get_state_sharded, set_state_sharded, delete_state_sharded),
+)
+
+
 def _get_state_persister(use_sharded: bool):
     """根据 use_sharded 标志选择合适的 Redis 状态存取函数组。"""
-    if use_sharded:
-        return get_state_sharded, set_state_sharded, delete_state_sharded
-    else:
-        return get_state, set_state, delete_state
+    return _PERSISTERS[bool(use_sharded)]
+
+
+def _checkpoint_reusable(snapshot) -> bool:
+    """
+    已完成的检查点是否可直接复用：图已跑完、未超过 LANGGRAPH_CHECKPOINT_MAX_AGE_SECONDS，
+    且其中记录的报告 / 音频文件仍然存在（输出目录可能已被清理或覆盖）。
+    """
+    values = snapshot.values
+    report_paths = values.get("report_paths")
+    if not report_paths or snapshot.next or not snapshot.created_at:
+        return False
+    created_at = datetime.fromisoformat(snapshot.created_at)
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    age = (datetime.now(timezone.utc) - created_at).total_seconds()
+    if age > _settings.LANGGRAPH_CHECKPOINT_MAX_AGE_SECONDS:
+        return False
+    paths = [path for path in report_paths.values() if path]
+    if values.get("audio_path"):
+        paths.append(values["audio_path"])
+    return all(os.path.exists(path) for path in paths)
+
+
+def _checkpoint_config(session_id: str, state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    检查点配置：thread_id 由会话ID与主题、输出目录、输出格式的短哈希组成，
+    同一会话换了主题或输出选项后不会复用旧的检查点。
+    """
+    key = "|".join((
+        str(state.get("topic", "")),
+        str(state.get("output_dir", "")),
+        ",".join(sorted(state.get("output_options") or ())),
+    ))
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return {"configurable": {"thread_id": f"{session_id}:{digest}"}}
+
+
+def _invoke_graph(runnable, checkpointer, current_state: Dict[str, Any], session_id: str) -> Dict[str, Any]:
+    """同步执行图；启用检查点时该线程已完整跑完且结果仍有效时直接复用，不再重复计算。"""
+    if not checkpointer:
+        return runnable.invoke(current_state)  # 执行图
+    config = _checkpoint_config(session_id, current_state)
+    snapshot = runnable.get_state(config)
+    if _checkpoint_reusable(snapshot):
+        logger.info(f"[Session={session_id}] 命中已完成的检查点，跳过图执行。")
+        return snapshot.values  # get_state 每次都从通道新建该字典，无需再复制
+    return runnable.invoke(current_state, config=config)  # 执行图
+
+
+async def _ainvoke_graph(runnable, checkpointer, current_state: Dict[str, Any], session_id: str) -> Dict[str, Any]:
+    """_invoke_graph 的异步版本，使用 AsyncSqliteSaver 与 aget_state / ainvoke。"""
+    if not checkpointer:
+        return await runnable.ainvoke(current_state)
+    runnable = _with_checkpointer(runnable, checkpointer)
+    config = _checkpoint_config(session_id, current_state)
+    snapshot = await runnable.aget_state(config)
+    if _checkpoint_reusable(snapshot):
+        logger.info(f"[Session={session_id}] 命中已完成的检查点，跳过图执行。")
+        return snapshot.values
+    return await runnable.ainvoke(current_state, config=config)
 
 
 def run_langgraph(initial_state: Dict[str, Any],
                   session_id: Optional[str] = None,
-                  use_sharded: bool = True) -> Dict[str, Any]:
+                  use_sharded: bool = True,
+                  resume: bool = True) -> Dict[str, Any]:
     """
     带记忆的 LangGraph 流程主执行函数。
     集成了分布式锁、Redis状态持久化、Pub/Sub事件通知和异常处理。
+    图通过同步 invoke 执行，要求全部节点为同步函数；当前 langgraph.json 中的
+    Researcher / Reporter / Voice 为协程节点，CLI、Worker 与服务端均应使用 arun_langgraph。
 
     参数:
       initial_state: 包含流程初始数据的字典，必须有 "topic"。
                      也可能包含 "output_dir", "output_options" 等。
       session_id: 可选的会话ID。若不提供，则自动生成。
       use_sharded: 是否使用分片方式在 Redis 中存储会话状态，默认为 True。
+      resume: 是否从 Redis 加载该 session_id 已有的状态，默认为 True。
+              调用方确知是全新会话（或 initial_state 已是完整状态）时传 False，可省去一次 GET 往返。
 
     返回:
       包含最终状态的字典。若执行失败，则包含 "error" 字段。
@@ -185,7 +412,7 @@ def run_langgraph(initial_state: Dict[str, Any],
     current_state: StateSchema = {}  # 初始化为 TypedDict 兼容的空字典
 
     # --- 步骤 1: 会话管理 (加载或新建) ---
-    if session_id:
+    if session_id and resume:
         logger.info(f"[Session={session_id}] 尝试加载现有会话状态 (use_sharded={use_sharded})。")
         loaded_s = get_state_func(session_id)
         current_state = loaded_s if loaded_s is not None else {}
@@ -193,8 +420,10 @@ def run_langgraph(initial_state: Dict[str, Any],
             logger.info(f"[Session={session_id}] 已成功加载状态。")
         else:
             logger.info(f"[Session={session_id}] 未找到现有状态，将创建新会话。")
+    elif session_id:
+        logger.info(f"[Session={session_id}] resume=False，跳过加载现有状态。")
     else:
-        session_id = str(uuid.uuid4())
+        session_id = secrets.token_urlsafe(16)
         logger.info(f"[Session={session_id}] 无提供 session_id，已生成新会话ID。")
         current_state = {}  # 新会话，空状态开始
 
@@ -215,6 +444,10 @@ def run_langgraph(initial_state: Dict[str, Any],
 
     # 定义 Pub/Sub 通道
     pubsub_channel = f"channel:session:{session_id}"
+    # 成功路径中锁随最终状态一起在管道内释放，finally 中不再重复释放
+    lock_released = False
+    # START / COMPLETE / ERROR 事件共用的 session_id JSON 编码，只编码一次
+    session_json = orjson.dumps(session_id)
 
     try:
         # --- 步骤 3: 校验必要输入 (如 'topic') ---
@@ -224,69 +457,80 @@ def run_langgraph(initial_state: Dict[str, Any],
             raise ValueError("初始状态中必须包含 'topic' 字段才能启动流程。")
 
         # --- 步骤 4: 发布 "ALL START" 事件到 Pub/Sub ---
-        start_event_payload = {
-            "session_id": session_id, "node": "ALL", "status": "START",
-            "timestamp": int(time.time() * 1000),
-            "topic": current_state.get("topic")  # 附带主题信息
-        }
-        _pubsub.publish(pubsub_channel, json.dumps(start_event_payload))
+        start_event_payload = _ALL_START_TMPL % (
+            session_json, time.time_ns() // 1_000_000, orjson.dumps(current_state.get("topic"))  # 附带主题信息
+        )
+        # 同步发布，保证订阅方先于节点事件与 COMPLETE / ERROR 收到 START
+        _pubsub().publish(pubsub_channel, start_event_payload)
         logger.info(f"[Session={session_id}] 已发布 'ALL START' 事件到频道 {pubsub_channel}。")
 
         # --- 步骤 5: 构建图实例并执行 ---
-        logger.debug(f"[Session={session_id}] 开始构建 LangGraph (带记忆模式)...")
-        graph = build_graph_with_memory()  # 获取图实例
-        runnable = graph.compile()  # 编译图为可执行对象
-        logger.info(f"[Session={session_id}] LangGraph 构建并编译完成，准备执行 invoke。")
-        logger.debug(f"[Session={session_id}] 传递给 invoke 的状态: {current_state}")
-
-        final_state: StateSchema = runnable.invoke(current_state)  # 执行图
+        logger.debug(f"[Session={session_id}] 获取已编译的 LangGraph (带记忆模式)...")
+        runnable = _get_runnable()  # 图定义未变化时复用已编译的可执行对象
+        checkpointer = _get_checkpointer()
+        logger.info(f"[Session={session_id}] LangGraph 已就绪，准备执行 invoke。")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[Session={session_id}] 传递给 invoke 的状态: {_state_for_log(current_state)}")
+
+        final_state: StateSchema = _invoke_graph(runnable, checkpointer, current_state, session_id)
         logger.info(f"[Session={session_id}] LangGraph 流程执行完毕。")
-        logger.debug(f"[Session={session_id}] 从 invoke 返回的最终状态: {final_state}")
-
-        # --- 步骤 5.1: 发布 "ALL COMPLETE" 事件 ---
-        complete_event_payload = {
-            "session_id": session_id, "node": "ALL", "status": "COMPLETE",
-            "timestamp": int(time.time() * 1000),
-            "report_paths": final_state.get("report_paths"),  # 附带报告路径
-            "audio_path": final_state.get("audio_path")  # 附带音频路径
-        }
-        _pubsub.publish(pubsub_channel, json.dumps(complete_event_payload))
-        logger.info(f"[Session={session_id}] 已发布 'ALL COMPLETE' 事件。")
-
-        # --- 步骤 6: 持久化最终状态到 Redis ---
-        set_state_func(session_id, final_state)  # 使用选择的存取函数
-        logger.info(f"[Session={session_id}] 最终状态已持久化到 Redis (use_sharded={use_sharded})。")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[Session={session_id}] 从 invoke 返回的最终状态: {_state_for_log(final_state)}")
+
+        # --- 步骤 5.1: 构建 "ALL COMPLETE" 事件 ---
+        complete_event_payload = _ALL_COMPLETE_TMPL % (
+            session_json, time.time_ns() // 1_000_000,
+            orjson.dumps(final_state.get("report_paths")),  # 附带报告路径
+            orjson.dumps(final_state.get("audio_path")),  # 附带音频路径
+        )
+
+        # --- 步骤 6: 发布 "ALL COMPLETE"、持久化最终状态、释放锁，合并为一个非事务管道（一次往返） ---
+        pipe = _pubsub().pipeline(transaction=False)
+        pipe.publish(pubsub_channel, complete_event_payload)
+        set_state_func(session_id, final_state, ex=_settings.SESSION_TTL_SECONDS, pipe=pipe)  # 使用选择的存取函数
+        release_lock_with_pipe(pipe, session_id, lock_id)
+        pipe_results = pipe.execute()
+        lock_released = True
+        logger.info(f"[Session={session_id}] 已发布 'ALL COMPLETE' 事件，最终状态已持久化到 Redis (use_sharded={use_sharded})。")
+        if pipe_results[-1] == 1:
+            logger.info(f"[Session={session_id}] 分布式锁已成功释放。")
+        else:
+            logger.warning(f"[Session={session_id}] 锁释放失败或锁已超时。")
 
         # --- 步骤 7: 准备并返回结果 ---
-        # 确保返回的字典中包含 _session_id，即使 final_state 中可能没有（理论上应该有）
-        response = dict(final_state)
-        if "_session_id" not in response:
-            response["_session_id"] = session_id
-        return response
+        # final_state 运行时即为 dict，直接返回，不再整体复制（其中可能包含 MB 级的研究结果）；
+        # 确保其中包含 _session_id，即使 final_state 中可能没有（理论上应该有）
+        final_state.setdefault("_session_id", session_id)
+        return final_state  # type: ignore[return-value]
 
     except Exception as ex:
         error_message = str(ex)
         logger.error(f"[Session={session_id}] LangGraph 流程执行中发生异常: {error_message}", exc_info=True)
 
-        # 发布 "ALL ERROR" 事件
-        error_event_payload = {
-            "session_id": session_id, "node": "ALL", "status": "ERROR",
-            "error": error_message, "timestamp": int(time.time() * 1000)
-        }
-        _pubsub.publish(pubsub_channel, json.dumps(error_event_payload))
-        logger.info(f"[Session={session_id}] 已发布 'ALL ERROR' 事件。")
-
-        # 将错误信息保存到当前状态并持久化
-        current_state_with_error = current_state.copy()  # 基于捕获异常时的 current_state
-        current_state_with_error["error"] = error_message
-        set_state_func(session_id, current_state_with_error)  # 持久化带错误信息的状态
-        logger.info(f"[Session={session_id}] 带错误信息的状态已持久化。")
+        # 构建 "ALL ERROR" 事件
+        error_event_payload = _ALL_ERROR_TMPL % (
+            session_json, orjson.dumps(error_message), time.time_ns() // 1_000_000
+        )
+        # 发布 "ALL ERROR"、持久化带错误信息的状态、释放锁，与成功路径一样合并为一个非事务管道（一次往返）
+        # 直接在捕获异常时的 current_state 上写入错误信息（此后不再被使用），避免整体复制
+        current_state["error"] = error_message
+        pipe = _pubsub().pipeline(transaction=False)
+        pipe.publish(pubsub_channel, error_event_payload)
+        set_state_func(session_id, current_state, ex=_settings.ERROR_STATE_TTL_SECONDS, pipe=pipe)  # 使用较短的有效期
+        release_lock_with_pipe(pipe, session_id, lock_id)
+        pipe_results = pipe.execute()
+        lock_released = True
+        logger.info(f"[Session={session_id}] 已发布 'ALL ERROR' 事件，带错误信息的状态已持久化。")
+        if pipe_results[-1] == 1:
+            logger.info(f"[Session={session_id}] 分布式锁已成功释放。")
+        else:
+            logger.warning(f"[Session={session_id}] 锁释放失败或锁已超时。")
 
         return {"_session_id": session_id, "error": error_message}
 
     finally:
         # --- 步骤 8: 释放锁 ---
-        if lock_id:  # 只有成功获取了锁才需要释放
+        if lock_id and not lock_released:  # 只有成功获取了锁且尚未释放时才需要释放
             released = release_lock(session_id, lock_id)
             if released:
                 logger.info(f"[Session={session_id}] 分布式锁已成功释放。")
@@ -295,15 +539,128 @@ def run_langgraph(initial_state: Dict[str, Any],
                 logger.warning(f"[Session={session_id}] 锁释放失败或锁已超时。")
 
 
-def get_existing_state(session_id: str, use_sharded: bool = True) -> Optional[Dict[str, Any]]:
-    """从 Redis 获取指定会话的已存状态。"""
+# 异步状态读取函数，按 use_sharded 索引；写入仍复用 _PERSISTERS 中的 set 函数（只向异步管道加入命令）
+_ASYNC_LOADERS = (aget_state, aget_state_sharded)
+
+
+async def arun_langgraph(initial_state: Dict[str, Any],
+                         session_id: Optional[str] = None,
+                         use_sharded: bool = True,
+                         resume: bool = True) -> Dict[str, Any]:
+    """
+    run_langgraph 的异步版本，供 FastAPI 等事件循环内的调用方直接 await：
+    会话加载、分布式锁与最终的发布/持久化/释放锁管道均通过 redis.asyncio 完成，
+    图通过 ainvoke 执行（同步节点由 LangGraph 放入线程池），等待期间不阻塞事件循环。
+    参数与返回值同 run_langgraph。
+    """
+    _, set_state_func, _ = _get_state_persister(use_sharded)
+    current_state: StateSchema = {}
+
+    # --- 步骤 1: 会话管理 (加载或新建) ---
+    if session_id and resume:
+        logger.info(f"[Session={session_id}] 尝试加载现有会话状态 (use_sharded={use_sharded})。")
+        current_state = await _ASYNC_LOADERS[bool(use_sharded)](session_id) or {}
+    elif not session_id:
+        session_id = secrets.token_urlsafe(16)
+        logger.info(f"[Session={session_id}] 无提供 session_id，已生成新会话ID。")
+
+    current_state.update(initial_state)
+    current_state["_session_id"] = session_id
+
+    # --- 步骤 2: 获取分布式锁 ---
+    lock_id = await aacquire_lock(session_id, timeout=600, wait=10)
+    if not lock_id:
+        error_msg = "会话正在执行，请稍后重试"
+        logger.warning(f"[Session={session_id}] 获取锁失败 => {error_msg}")
+        return {"_session_id": session_id, "error": error_msg}
+    logger.info(f"[Session={session_id}] 已成功获取分布式锁，Lock ID: {lock_id}")
+
+    pubsub_channel = f"channel:session:{session_id}"
+    lock_released = False
+    session_json = orjson.dumps(session_id)
+
+    try:
+        if not current_state.get("topic"):
+            logger.error(f"[Session={session_id}] 初始状态中缺少 'topic'。")
+            raise ValueError("初始状态中必须包含 'topic' 字段才能启动流程。")
+
+        await _apubsub().publish(pubsub_channel, _ALL_START_TMPL % (
+            session_json, time.time_ns() // 1_000_000, orjson.dumps(current_state.get("topic"))
+        ))
+
+        runnable = _get_runnable()
+        checkpointer = await _aget_checkpointer()
+        final_state = await _ainvoke_graph(runnable, checkpointer, current_state, session_id)
+        logger.info(f"[Session={session_id}] LangGraph 流程执行完毕。")
+
+        # 发布 "ALL COMPLETE"、持久化最终状态、释放锁，合并为一个非事务管道（一次往返）
+        async with _apubsub().pipeline(transaction=False) as pipe:
+            pipe.publish(pubsub_channel, _ALL_COMPLETE_TMPL % (
+                session_json, time.time_ns() // 1_000_000,
+                orjson.dumps(final_state.get("report_paths")), orjson.dumps(final_state.get("audio_path")),
+            ))
+            set_state_func(session_id, final_state, ex=_settings.SESSION_TTL_SECONDS, pipe=pipe)
+            release_lock_with_pipe(pipe, session_id, lock_id)
+            pipe_results = await pipe.execute()
+        lock_released = True
+        if pipe_results[-1] != 1:
+            logger.warning(f"[Session={session_id}] 锁释放失败或锁已超时。")
+
+        final_state.setdefault("_session_id", session_id)
+        return final_state  # type: ignore[return-value]
+
+    except Exception as ex:
+        error_message = str(ex)
+        logger.error(f"[Session={session_id}] LangGraph 流程执行中发生异常: {error_message}", exc_info=True)
+
+        # 发布 "ALL ERROR"、持久化带错误信息的状态、释放锁，同样合并为一个非事务管道
+        current_state["error"] = error_message
+        async with _apubsub().pipeline(transaction=False) as pipe:
+            pipe.publish(pubsub_channel, _ALL_ERROR_TMPL % (
+                session_json, orjson.dumps(error_message), time.time_ns() // 1_000_000
+            ))
+            set_state_func(session_id, current_state, ex=_settings.ERROR_STATE_TTL_SECONDS, pipe=pipe)
+            release_lock_with_pipe(pipe, session_id, lock_id)
+            pipe_results = await pipe.execute()
+        lock_released = True
+        if pipe_results[-1] != 1:
+            logger.warning(f"[Session={session_id}] 锁释放失败或锁已超时。")
+
+        return {"_session_id": session_id, "error": error_message}
+
+    finally:
+        if not lock_released and not await arelease_lock(session_id, lock_id):
+            logger.warning(f"[Session={session_id}] 锁释放失败或锁已超时。")
+
+
+def get_existing_state(session_id: str, use_sharded: bool = True,
+                       fields: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    从 Redis 获取指定会话的已存状态。
+    传入 fields 时只返回这些字段；分片存储下仅读取包含这些字段的分片（一次管道往返）。
+    """
+    logger.debug(f"查询会话 {session_id} 的现有状态 (use_sharded={use_sharded}, fields={fields})。")
+    if fields is not None and use_sharded:
+        return get_state_fields_sharded(session_id, fields)
     get_state_func, _, _ = _get_state_persister(use_sharded)
-    logger.debug(f"查询会话 {session_id} 的现有状态 (use_sharded={use_sharded})。")
-    return get_state_func(session_id)
+    state = get_state_func(session_id)
+    if fields is not None and state is not None:
+        return {field: state.get(field) for field in fields}
+    return state
 
 
 def reset_session(session_id: str, use_sharded: bool = True) -> None:
     """删除 Redis 中指定会话的所有状态数据。"""
     _, _, delete_state_func = _get_state_persister(use_sharded)
     delete_state_func(session_id)
-    logger.info(f"会话 {session_id} (use_sharded={use_sharded}) 的状态数据已重置。")
\ No newline at end of file
+    logger.info(f"会话 {session_id} (use_sharded={use_sharded}) 的状态数据已重置。")
+
+
+def warmup_graph():
+    """预热：导入全部节点并编译图（结果写入 _compiled_runnable 缓存），节点缺失时立即抛出异常。"""
+    _get_runnable()
+    logger.info("LangGraph 图已预热编译完成。")
+
+
+if _settings.DEEPFLOW_WARMUP_GRAPH:
+    warmup_graph()
@@ -116,15 +116,13 @@ def planner_node(
     if plan_iterations >= configurable.max_plan_iterations:
         return Command(goto="reporter")
 
-    full_response = ""
     if AGENT_LLM_MAP["planner"] == "basic":
         response = llm.invoke(messages)
         full_response = response.model_dump_json(indent=4, exclude_none=True)
     else:
-        response = llm.stream(messages)
-        for chunk in response:
-            full_response += chunk.content
-    logger.debug(f"Current state messages: {state['messages']}")
+        # Collect streamed chunks and join once instead of re-building the string per token
+        full_response = "".join(chunk.content for chunk in llm.stream(messages))
+    logger.debug("Current state messages: %s", state["messages"])
     logger.info(f"Planner response: {full_response}")
 
     try:
@@ -218,7 +216,7 @@ def coordinator_node(
         .bind_tools([handoff_to_planner])
         .invoke(messages)
     )
-    logger.debug(f"Current state messages: {state['messages']}")
+    logger.debug("Current state messages: %s", state["messages"])
 
     goto = "__end__"
     locale = state.get("locale", "en-US")  # Default locale if not specified
@@ -241,7 +239,7 @@ def coordinator_node(
         logger.warning(
             "Coordinator response contains no tool calls. Terminating workflow execution."
         )
-        logger.debug(f"Coordinator response: {response}")
+        logger.debug("Coordinator response: %s", response)
 
     return Command(
         update={"locale": locale, "resources": configurable.resources},
@@ -279,7 +277,7 @@ def reporter_node(state: State):
                 name="observation",
             )
         )
-    logger.debug(f"Current invoke messages: {invoke_messages}")
+    logger.debug("Current invoke messages: %s", invoke_messages)
     response = get_llm_by_type(AGENT_LLM_MAP["reporter"]).invoke(invoke_messages)
     response_content = response.content
     logger.info(f"reporter response: {response_content}")
@@ -399,7 +397,7 @@ async def _execute_agent_step(
 
     # Process the result
     response_content = result["messages"][-1].content
-    logger.debug(f"{agent_name.capitalize()} full response: {response_content}")
+    logger.debug("%s full response: %s", agent_name.capitalize(), response_content)
 
     # Update the step with the execution result
     current_step.execution_res = response_content
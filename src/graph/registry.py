@@ -0,0 +1,55 @@
+# 文件路径: src/graph/registry.py
+# -*- coding: utf-8 -*-
+"""
+LangGraph 节点函数解析：按 langgraph.json 中的 (module, func) 导入节点函数并缓存。
+langgraph.json 是节点绑定的唯一来源；导入本模块时预先解析内置 Agent 节点，
+任一 Agent 模块导入失败会在首次构建图时立即暴露。
+各 Agent 模块（及其 langchain、gTTS 等重量级依赖）在线程池中并行导入，缩短冷启动时间。
+"""
+
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+# 并行导入的最大线程数
+_IMPORT_MAX_WORKERS = 8
+
+# 内置节点：节点名 -> (模块路径, 函数名)，仅用于导入时预热 _NODE_FN_CACHE，实际绑定以 langgraph.json 为准
+_BUILTIN_NODES: Dict[str, Tuple[str, str]] = {
+    "planner": ("src.agents.planner", "planner_agent"),
+    "researcher": ("src.agents.research_agent", "run_researcher"),
+    "coder": ("src.agents.coder_agent", "coder_agent"),
+    "reporter": ("src.agents.reporter_agent", "run_reporter"),
+    "voice": ("src.agents.voice_agent", "run_voice"),
+}
+
+
+# 已解析的节点函数：(模块路径, 函数名) -> 函数；langgraph.json 修改后重新编译图时，已解析的节点无需再次导入与 getattr
+_NODE_FN_CACHE: Dict[Tuple[str, str], Callable[..., Any]] = {}
+
+
+def _import_node(spec: Tuple[str, str, str]) -> Tuple[str, Callable[..., Any]]:
+    node_name, module_path, func_name = spec
+    func = _NODE_FN_CACHE.get((module_path, func_name))
+    if func is None:
+        func = _NODE_FN_CACHE[(module_path, func_name)] = getattr(importlib.import_module(module_path), func_name)
+    return node_name, func
+
+
+def import_node_functions(specs: Iterable[Tuple[str, str, str]]) -> List[Tuple[str, Callable[..., Any]]]:
+    """
+    并行导入 (节点名, 模块路径, 函数名) 列表中的节点函数，按输入顺序返回 (节点名, 函数)。
+    已解析过的 (模块路径, 函数名) 直接取自 _NODE_FN_CACHE；待导入的不超过一个时不创建线程池。
+    任一模块导入失败时抛出对应的 ImportError / AttributeError。
+    """
+    specs = list(specs)
+    if sum((module_path, func_name) not in _NODE_FN_CACHE for _, module_path, func_name in specs) <= 1:
+        return [_import_node(spec) for spec in specs]
+    with ThreadPoolExecutor(max_workers=min(_IMPORT_MAX_WORKERS, len(specs))) as executor:
+        return list(executor.map(_import_node, specs))
+
+
+# 导入时并行解析内置节点，填充 _NODE_FN_CACHE
+import_node_functions(
+    (node_name, module_path, func_name) for node_name, (module_path, func_name) in _BUILTIN_NODES.items()
+)
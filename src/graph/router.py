@@ -2,11 +2,15 @@
 # -*- coding: utf-8 -*-
 # 定义图中的条件路由逻辑
 
+import logging
 from typing import Literal, List, Dict, Any
 
 from src.config import Configuration
 from src.prompts.planner_model import Plan, StepType  # 修复：导入 Plan 模型
 
+# 路由决策走日志而非 print：避免每次路由都抢占 stdout 锁并 flush，且可按级别过滤
+logger = logging.getLogger(__name__)
+
 
 def route_after_intent(state: Dict[str, Any]) -> Literal["coordinator", "reporter"]:
     """
@@ -15,10 +19,10 @@ def route_after_intent(state: Dict[str, Any]) -> Literal["coordinator", "reporte
     """
     intent = state.get("intent")
     if intent == "history_review":
-        print("--- [路由] 决策：历史回顾，直接转向报告员 ---")
+        logger.info("--- [路由] 决策：历史回顾，直接转向报告员 ---")
         return "reporter"
 
-    print("--- [路由] 决策：常规研究，转向协调员 ---")
+    logger.info("--- [路由] 决策：常规研究，转向协调员 ---")
     return "coordinator"
 
 
@@ -32,22 +36,22 @@ def route_after_coordinator(state: Dict[str, Any]) -> Literal[
     # 这个路由函数实际上可能不会被 LangGraph 的 Command 机制调用，但我们保持逻辑正确
     activated_agents: List[str] = state.get("activated_agents", [])
     if not isinstance(activated_agents, list) or not activated_agents:
-        print("--- [路由] 错误：协调员未返回有效的 'activated_agents' 列表，需要人工干预 ---")
+        logger.warning("--- [路由] 错误：协调员未返回有效的 'activated_agents' 列表，需要人工干预 ---")
         return "human_feedback"
 
     if "background_investigator" in activated_agents:
-        print("--- [路由] 决策：需要背景调查，转向背景调查员 ---")
+        logger.info("--- [路由] 决策：需要背景调查，转向背景调查员 ---")
         return "background_investigator"
 
     if "planner" in activated_agents:
-        print("--- [路由] 决策：需要规划，转向规划师 ---")
+        logger.info("--- [路由] 决策：需要规划，转向规划师 ---")
         return "planner"
 
     if "research_team" in activated_agents:
-        print("--- [路由] 决策：直接研究，转向研究团队 ---")
+        logger.info("--- [路由] 决策：直接研究，转向研究团队 ---")
         return "research_team"
 
-    print(f"--- [路由] 决策：路径不明确 (激活的智能体: {activated_agents})，需要人工干预 ---")
+    logger.warning(f"--- [路由] 决策：路径不明确 (激活的智能体: {activated_agents})，需要人工干预 ---")
     return "human_feedback"
 
 
@@ -60,10 +64,10 @@ def route_after_planner(state: Dict[str, Any]) -> Literal["research_team", "huma
     plan = state.get("current_plan")
     # 检查 plan 是否是 Plan 类的实例，并且其 steps 列表不为空
     if isinstance(plan, Plan) and plan.steps:
-        print(f"--- [路由] 已生成计划 ({len(plan.steps)}个步骤)，转向研究团队 ---")
+        logger.info(f"--- [路由] 已生成计划 ({len(plan.steps)}个步骤)，转向研究团队 ---")
         return "research_team"
 
-    print("--- [路由] 未能从规划师处获得有效计划，需要人工干预 ---")
+    logger.warning("--- [路由] 未能从规划师处获得有效计划，需要人工干预 ---")
     return "human_feedback"
 
 
@@ -91,10 +95,10 @@ def should_continue_research(state: Dict[str, Any]) -> Literal["planner", "repor
 
     plan_iterations = state.get("plan_iterations", 1)
     if plan_iterations >= config.max_plan_iterations:
-        print(f"--- [路由] 已达到最大规划迭代次数 ({config.max_plan_iterations})，转向报告员 ---")
+        logger.info(f"--- [路由] 已达到最大规划迭代次数 ({config.max_plan_iterations})，转向报告员 ---")
         return "reporter"
 
     # 逻辑3：如果未达到最大迭代次数，但需要更多信息，可以返回规划师
     # （这里的逻辑可以根据需要变得更复杂，例如分析当前结果的质量）
-    print(f"--- [路由] 研究内容可能不足，返回规划师进行新一轮规划 ---")
+    logger.info(f"--- [路由] 研究内容可能不足，返回规划师进行新一轮规划 ---")
     return "planner"
\ No newline at end of file
@@ -3,15 +3,123 @@
 
 from pathlib import Path
 from typing import Any, Dict
+import json
 import os
+import socket
+import threading
+import urllib.request
 
+import httpx
 from langchain_openai import ChatOpenAI
+from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
 
 from src.config import load_yaml_config
 from src.config.agents import LLMType
 
 # Cache for LLM instances
 _llm_cache: dict[LLMType, ChatOpenAI] = {}
+# Cache keyed by the merged model config, so LLM types that resolve to the same
+# config share one client (and its underlying HTTP connection pool)
+_llm_conf_cache: dict[str, ChatOpenAI] = {}
+# Reentrant: get_llm_by_type holds it while _get_http_clients takes it again
+_llm_cache_lock = threading.RLock()
+
+# Upper bound on in-flight LLM requests per process. The shared HTTP connection
+# pool is capped at this size, so extra sync (graph worker threads) and async
+# callers wait for a free slot instead of flooding the provider and triggering 429s.
+LLM_MAX_INFLIGHT = int(os.getenv("LLM_MAX_INFLIGHT", "8"))
+
+try:
+    import h2  # noqa: F401  httpx needs the h2 package for HTTP/2
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+# Disable Nagle on LLM connections so small JSON request bodies are not held
+# back waiting for the previous segment's delayed ACK; keep idle pooled
+# connections alive at the TCP level as well.
+_SOCKET_OPTIONS = [
+    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+
+# One sync and one async HTTP client shared by every ChatOpenAI instance: LLM
+# types with different models on the same provider reuse the same keep-alive
+# (and, with h2 installed, multiplexed HTTP/2) connections and TLS sessions.
+_http_clients: tuple[DefaultHttpxClient, DefaultAsyncHttpxClient] | None = None
+
+
+def _no_proxy_pattern(host: str) -> str | None:
+    """httpx mount pattern for one NO_PROXY entry (same rules httpx applies with trust_env)."""
+    if "://" in host:
+        return host
+    if "/" in host:
+        # CIDR ranges are not expressible as mount patterns
+        return None
+    if ":" in host:
+        return f"all://[{host}]"
+    if host.replace(".", "").isdigit() or host.lower() == "localhost":
+        return f"all://{host}"
+    return f"all://*{host}"
+
+
+def _proxy_mounts(transport_cls, transport_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Mounts equivalent to httpx's own HTTP(S)_PROXY / ALL_PROXY / NO_PROXY handling,
+    but built with the same limits and socket options as the direct transport.
+    NO_PROXY hosts map to None, i.e. the client's direct transport.
+    """
+    proxies = urllib.request.getproxies()
+    mounts: Dict[str, Any] = {}
+    for scheme in ("http", "https", "all"):
+        url = proxies.get(scheme)
+        if url:
+            if "://" not in url:
+                url = f"http://{url}"
+            mounts[f"{scheme}://"] = transport_cls(proxy=url, **transport_kwargs)
+    if mounts:
+        for host in filter(None, (h.strip() for h in proxies.get("no", "").split(","))):
+            if host == "*":
+                return {}
+            pattern = _no_proxy_pattern(host)
+            if pattern:
+                mounts[pattern] = None
+    return mounts
+
+
+def _get_http_clients() -> tuple[DefaultHttpxClient, DefaultAsyncHttpxClient]:
+    global _http_clients
+    if _http_clients is not None:
+        return _http_clients
+    with _llm_cache_lock:
+        if _http_clients is not None:
+            return _http_clients
+        # With an explicit transport, pool limits and HTTP/2 are configured on
+        # the transport; the client-level arguments would be ignored.
+        # Proxy env vars are turned into mounts here (trust_env=False) so that
+        # proxied connections get the same limits and socket options; httpx's
+        # own env mounts would use defaults. The pool limit applies per mount.
+        transport_kwargs = dict(
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_INFLIGHT,
+                max_keepalive_connections=LLM_MAX_INFLIGHT,
+            ),
+            http2=_HTTP2,
+            socket_options=_SOCKET_OPTIONS,
+        )
+        _http_clients = (
+            DefaultHttpxClient(
+                transport=httpx.HTTPTransport(**transport_kwargs),
+                mounts=_proxy_mounts(httpx.HTTPTransport, transport_kwargs),
+                trust_env=False,
+            ),
+            DefaultAsyncHttpxClient(
+                transport=httpx.AsyncHTTPTransport(**transport_kwargs),
+                mounts=_proxy_mounts(httpx.AsyncHTTPTransport, transport_kwargs),
+                trust_env=False,
+            ),
+        )
+        return _http_clients
 
 
 def _get_env_llm_conf(llm_type: str) -> Dict[str, Any]:
@@ -47,7 +155,15 @@ def _create_llm_use_conf(llm_type: LLMType, conf: Dict[str, Any]) -> ChatOpenAI:
     if not merged_conf:
         raise ValueError(f"Unknown LLM Conf: {llm_type}")
 
-    return ChatOpenAI(**merged_conf)
+    conf_key = json.dumps(merged_conf, sort_keys=True, default=str)
+    llm = _llm_conf_cache.get(conf_key)
+    if llm is None:
+        http_client, http_async_client = _get_http_clients()
+        merged_conf.setdefault("http_client", http_client)
+        merged_conf.setdefault("http_async_client", http_async_client)
+        llm = ChatOpenAI(**merged_conf)
+        _llm_conf_cache[conf_key] = llm
+    return llm
 
 
 def get_llm_by_type(
@@ -56,15 +172,22 @@ def get_llm_by_type(
     """
     Get LLM instance by type. Returns cached instance if available.
     """
-    if llm_type in _llm_cache:
-        return _llm_cache[llm_type]
-
-    conf = load_yaml_config(
-        str((Path(__file__).parent.parent.parent / "conf.yaml").resolve())
-    )
-    llm = _create_llm_use_conf(llm_type, conf)
-    _llm_cache[llm_type] = llm
-    return llm
+    llm = _llm_cache.get(llm_type)
+    if llm is not None:
+        return llm
+
+    # Double-checked locking: concurrent first calls from graph worker threads
+    # must not build duplicate clients
+    with _llm_cache_lock:
+        if llm_type in _llm_cache:
+            return _llm_cache[llm_type]
+
+        conf = load_yaml_config(
+            str((Path(__file__).parent.parent.parent / "conf.yaml").resolve())
+        )
+        llm = _create_llm_use_conf(llm_type, conf)
+        _llm_cache[llm_type] = llm
+        return llm
 
 
 # In the future, we will use reasoning_llm and vl_llm for different purposes
@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 """
 应用入口：启动 FastAPI 服务并创建后台监控协程 (优化版)
-    - on_startup: 创建队列长度和节点故障率的后台监控协程。
+    - on_startup: 创建队列长度和节点故障率的后台监控协程，以及 REST 指标快照刷新协程。
     - /metrics: (可选) 暴露 Prometheus 监控指标。
 """
 
@@ -17,7 +17,8 @@ from src.config.settings import (
 )
 from src.workers.queue_monitor import monitor_queue_length_loop
 from src.workers.alert import monitor_failure_rate_loop
-from src.api.api_router import router as api_router
+from src.api.api_router import router as api_router, refresh_metrics_loop
+from src.utils.event_loop import install_uvloop, uvicorn_loop_name
 
 # 配置主模块日志
 logger = logging.getLogger(__name__)
@@ -28,6 +29,9 @@ if not logging.getLogger().hasHandlers():
         handlers=[logging.StreamHandler()]
     )
 
+# 优先使用 uvloop 作为事件循环（非 Windows 且已安装时生效）
+UVLOOP_ENABLED = install_uvloop()
+
 app = FastAPI(title="DeerFlow 监控服务 (优化版)")
 
 # 注册 REST API 路由
@@ -57,6 +61,8 @@ async def startup_event():
     loop.create_task(monitor_queue_length_loop())
     # 启动节点故障率监控
     loop.create_task(monitor_failure_rate_loop())
+    # 定时刷新 REST 查询接口使用的指标快照
+    loop.create_task(refresh_metrics_loop())
     logger.info("后台监控协程已启动。")
 
 @app.get("/")
@@ -66,4 +72,5 @@ async def root():
 
 if __name__ == "__main__":
     logger.info(f"启动 Uvicorn 服务器: host={API_HOST}, port={API_PORT}")
-    uvicorn.run("src.main:app", host=API_HOST, port=API_PORT, reload=True)
\ No newline at end of file
+    uvicorn.run("src.main:app", host=API_HOST, port=API_PORT, reload=True,
+                loop=uvicorn_loop_name(UVLOOP_ENABLED))
\ No newline at end of file
@@ -4,21 +4,35 @@
 import base64
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 from src.podcast.graph.state import PodcastState
 from src.tools.tts import VolcengineTTS
 
 logger = logging.getLogger(__name__)
 
+_TTS_MAX_CONCURRENCY = int(os.getenv("PODCAST_TTS_CONCURRENCY", "4"))
+
 
 def tts_node(state: PodcastState):
     logger.info("Generating audio chunks for podcast...")
-    tts_client = _create_tts_client()
-    for line in state["script"].lines:
-        tts_client.voice_type = (
-            "BV002_streaming" if line.speaker == "male" else "BV001_streaming"
-        )
-        result = tts_client.text_to_speech(line.paragraph, speed_ratio=1.05)
+    # Each line is an independent TTS request, so synthesize them concurrently
+    # (bounded to respect the API rate limit) and stitch the chunks back in order.
+    clients = {
+        "male": _create_tts_client("BV002_streaming"),
+        "female": _create_tts_client("BV001_streaming"),
+    }
+
+    def synthesize(line):
+        tts_client = clients["male" if line.speaker == "male" else "female"]
+        return tts_client.text_to_speech(line.paragraph, speed_ratio=1.05)
+
+    lines = state["script"].lines
+    max_workers = max(1, min(_TTS_MAX_CONCURRENCY, len(lines)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(synthesize, lines))
+
+    for result in results:
         if result["success"]:
             audio_data = result["audio_data"]
             audio_chunk = base64.b64decode(audio_data)
@@ -30,7 +44,7 @@ def tts_node(state: PodcastState):
     }
 
 
-def _create_tts_client():
+def _create_tts_client(voice_type: str = "BV001_streaming"):
     app_id = os.getenv("VOLCENGINE_TTS_APPID", "")
     if not app_id:
         raise Exception("VOLCENGINE_TTS_APPID is not set")
@@ -38,7 +52,6 @@ def _create_tts_client():
     if not access_token:
         raise Exception("VOLCENGINE_TTS_ACCESS_TOKEN is not set")
     cluster = os.getenv("VOLCENGINE_TTS_CLUSTER", "volcano_tts")
-    voice_type = "BV001_streaming"
     return VolcengineTTS(
         appid=app_id,
         access_token=access_token,
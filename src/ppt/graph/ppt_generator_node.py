@@ -18,8 +18,11 @@ def ppt_generator_node(state: PPTState):
     generated_file_path = os.path.join(
         os.getcwd(), f"generated_ppt_{uuid.uuid4()}.pptx"
     )
-    subprocess.run(["marp", state["ppt_file_path"], "-o", generated_file_path])
-    # remove the temp file
-    os.remove(state["ppt_file_path"])
+    # feed the markdown through stdin instead of a temp file
+    subprocess.run(
+        ["marp", "--stdin", "-o", generated_file_path],
+        input=state["ppt_content"],
+        encoding="utf-8",
+    )
     logger.info(f"generated_file_path: {generated_file_path}")
     return {"generated_file_path": generated_file_path}
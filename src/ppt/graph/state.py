@@ -17,4 +17,3 @@ class PPTState(MessagesState):
 
     # Assets
     ppt_content: str = ""
-    ppt_file_path: str = ""
@@ -16,21 +16,27 @@ FastAPI 服务：提供 HTTP/REST 和 WebSocket 接口，用于控制和监控 L
 import os
 import json
 import logging
-import uuid  # 用于在 /api/start 未提供 session_id 时生成
+import secrets  # 用于在 /api/start 未提供 session_id 时生成
 import time  # 未直接使用，但 WebSocket 逻辑中常备
 import threading  # 用于 WebSocket 后台监听线程
 import asyncio  # 用于 run_coroutine_threadsafe
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Header, HTTPException, Depends
-from fastapi.responses import JSONResponse  # 虽然未使用，但 FastAPI 常备
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel, Field  # 用于请求体校验
 from typing import Optional, Dict, Any, List
 from starlette.websockets import WebSocketState  # 用于检查 WebSocket 连接状态
 
 import redis  # 用于 WebSocket 的 PubSub 客户端
 
-from src.config.settings import REDIS_HOST, REDIS_PORT, REDIS_DB, API_KEYS
-from src.graph.builder import run_langgraph, get_existing_state, reset_session
+try:
+    import orjson  # noqa: F401  ORJSONResponse 依赖 orjson
+    _DEFAULT_RESPONSE_CLASS = ORJSONResponse
+except ImportError:
+    _DEFAULT_RESPONSE_CLASS = JSONResponse
+
+from src.config.settings import REDIS_HOST, REDIS_PORT, REDIS_DB, API_KEY_SET
+from src.graph.builder import arun_langgraph, get_existing_state, reset_session
 from src.utils.cache import enqueue_session  # 显式导入用于 /api/start
 from src.utils.logging import init_logger
 
@@ -50,7 +56,8 @@ def get_redis_pubsub_client():
     return _redis_pubsub_client
 
 
-app = FastAPI(title="DeerFlow 带记忆服务", version="1.0.0")
+# 默认使用 orjson 序列化响应，状态/报告接口返回的大字典编码更快
+app = FastAPI(title="DeerFlow 带记忆服务", version="1.0.0", default_response_class=_DEFAULT_RESPONSE_CLASS)
 
 
 # --- 权限校验依赖注入 ---
@@ -62,7 +69,7 @@ async def verify_api_key(x_api_key: str = Header(None, description="API 访问
     if not x_api_key:
         logger.warning("请求头中缺少 X-API-KEY。")
         raise HTTPException(status_code=401, detail="请求头 X-API-KEY 缺失")
-    if x_api_key not in API_KEYS:
+    if x_api_key not in API_KEY_SET:
         logger.warning(f"无效的 API Key: {x_api_key}")
         raise HTTPException(status_code=401, detail="未授权：无效的 API Key")
     return x_api_key
@@ -79,6 +86,7 @@ class RunNowRequest(BaseModel):
     session_id: Optional[str] = Field(None, description="可选的会话ID")
     use_sharded: bool = Field(True, description="是否使用分片存储Redis状态")
     initial_state: Optional[Dict[str, Any]] = Field(None, description="可选的完整初始状态字典")
+    resume: bool = Field(True, description="是否加载该会话ID已有的状态；确知为新会话时传 false 可省去一次 Redis 读取")
 
 
 # --- API 端点定义 ---
@@ -87,12 +95,12 @@ class RunNowRequest(BaseModel):
 async def api_start(payload: StartRequest) -> Dict[str, Any]:
     """
     异步启动 LangGraph 流程：将任务（topic 和 session_id）放入 Redis 队列。
-    由后台的 session_worker.py 消费队列并实际执行 run_langgraph。
+    由后台的 session_worker.py 消费队列并实际执行 arun_langgraph。
     - **topic**: 必要的研究主题。
-    - **session_id**: 可选。如果提供，则使用此ID；否则自动生成UUID。
+    - **session_id**: 可选。如果提供，则使用此ID；否则自动生成随机会话 ID。
     返回包含 `_session_id` 和入队消息的字典。
     """
-    sid = payload.session_id if payload.session_id else str(uuid.uuid4())
+    sid = payload.session_id if payload.session_id else secrets.token_urlsafe(16)
     logger.info(f"API /api/start: 接收到主题 '{payload.topic}'，会话ID: {sid}，准备入队。")
 
     # 实际的入队操作，交由 src.utils.cache.enqueue_session 处理
@@ -104,12 +112,13 @@ async def api_start(payload: StartRequest) -> Dict[str, Any]:
 @app.post("/api/run_now", dependencies=[Depends(verify_api_key)], summary="同步执行研究流程")
 async def api_run_now(payload: RunNowRequest) -> Dict[str, Any]:
     """
-    同步阻塞执行 LangGraph 流程。
-    直接调用 `run_langgraph`，等待其完成后返回最终状态。
+    同步执行 LangGraph 流程：等待其完成后返回最终状态。
+    通过 `arun_langgraph` 在事件循环内异步执行，等待期间不阻塞其他请求。
     - **topic**: 必要的研究主题 (除非在 initial_state 中提供)。
     - **session_id**: 可选。
     - **use_sharded**: 是否使用分片存储，默认 True。
     - **initial_state**: 可选，用于传递更复杂的初始状态。
+    - **resume**: 是否加载已有会话状态，默认 True。
     如果流程执行中发生错误（如获取锁失败、内部异常），会返回包含 "error" 字段的响应。
     """
     effective_initial_state = payload.initial_state if payload.initial_state else {}
@@ -122,10 +131,11 @@ async def api_run_now(payload: RunNowRequest) -> Dict[str, Any]:
 
     logger.info(
         f"API /api/run_now: 开始同步执行流程，主题 '{effective_initial_state['topic']}'，会话ID: {payload.session_id or '将自动生成'}")
-    result = run_langgraph(
+    result = await arun_langgraph(
         initial_state=effective_initial_state,
         session_id=payload.session_id,
-        use_sharded=payload.use_sharded
+        use_sharded=payload.use_sharded,
+        resume=payload.resume
     )
 
     if "error" in result:
@@ -157,7 +167,7 @@ async def api_get_report(session_id: str) -> Dict[str, Any]:
     路径信息存储在会话状态的 "report_paths" 字段中。
     """
     logger.debug(f"API /api/get_report: 获取会话 {session_id} 的报告路径。")
-    state = get_existing_state(session_id, use_sharded=True)
+    state = get_existing_state(session_id, use_sharded=True, fields=("report_paths",))  # 只读 base 分片
     if not state:
         raise HTTPException(status_code=404, detail="会话未找到")
 
@@ -174,7 +184,7 @@ async def api_get_audio(session_id: str) -> Dict[str, Any]:
     路径信息存储在会话状态的 "audio_path" 字段中。
     """
     logger.debug(f"API /api/get_audio: 获取会话 {session_id} 的音频路径。")
-    state = get_existing_state(session_id, use_sharded=True)
+    state = get_existing_state(session_id, use_sharded=True, fields=("audio_path",))  # 只读 base 分片
     if not state:
         raise HTTPException(status_code=404, detail="会话未找到")
 
@@ -209,7 +219,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str,
     if not x_api_key:
         await websocket.close(code=1008, reason="X-API-KEY header missing")
         return
-    if x_api_key not in API_KEYS:
+    if x_api_key not in API_KEY_SET:
         await websocket.close(code=1008, reason="Unauthorized: Invalid API Key")
         return
 
@@ -226,8 +236,10 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str,
     async def forward_messages_async():
         """异步监听 Redis Pub/Sub 并转发消息给 WebSocket 客户端"""
         try:
-            await pubsub.subscribe(channel)
+            # redis-py 的 subscribe 为同步调用，放入 executor 执行
+            await main_event_loop.run_in_executor(None, pubsub.subscribe, channel)
             logger.info(f"WebSocket: 已订阅 Redis 频道 {channel} (会话ID: {session_id})")
+            send_text = websocket.send_text  # 热路径上避免每条消息重复属性查找
             while not stop_event.is_set():
                 try:
                     # pubsub.get_message 现在需要异步处理或在 executor 中运行
@@ -235,9 +247,11 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str,
                     # 注意：fakeredis 的 pubsub.get_message(timeout=...) 行为可能与真实 Redis 不同
                     # 更健壮的方式是使用 aioredis 库，或者在线程中运行阻塞的 pubsub.listen()
                     message = await main_event_loop.run_in_executor(None, pubsub.get_message, True, 0.1)  # timeout 0.1s
-                    if message and message.get("type") == "message":
+                    # ignore_subscribe_messages=True 且只订阅了单个频道：返回值要么为 None，要么就是 "message"，
+                    # 无需再逐条探测 type 字段
+                    if message:
                         if websocket.client_state == WebSocketState.CONNECTED:
-                            await websocket.send_text(message["data"])
+                            await send_text(message["data"])
                         else:
                             logger.warning(f"WebSocket: 连接已断开 (会话ID: {session_id})，停止消息转发。")
                             break
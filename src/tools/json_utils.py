@@ -2,7 +2,6 @@
 # -*- coding: utf-8 -*-
 # 提供JSON处理相关的工具函数
 
-import re
 import json
 
 def repair_json_output(raw_text: str) -> str:
@@ -11,11 +10,12 @@ def repair_json_output(raw_text: str) -> str:
     这对于处理 LLM 可能在 JSON 前后添加解释性文本的情况很有用。
     简化注释：修复并提取JSON
     """
-    # 使用正则表达式查找第一个 '{' 和最后一个 '}' 之间的内容
-    # 这是一种健壮的方法，可以处理 JSON 前后的 markdown 标记或解释
-    json_match = re.search(r"\{[\s\S]*\}", raw_text)
-    if json_match:
-        return json_match.group(0)
+    # 截取第一个 '{' 与最后一个 '}' 之间的内容（与贪婪正则 \{[\s\S]*\} 的结果一致），
+    # 可以处理 JSON 前后的 markdown 标记或解释；find/rfind 为线性扫描，长文本上没有正则回溯开销
+    start = raw_text.find("{")
+    end = raw_text.rfind("}")
+    if start != -1 and end > start:
+        return raw_text[start:end + 1]
 
     # 如果正则匹配失败，可以尝试一些回退策略，例如直接解析
     try:
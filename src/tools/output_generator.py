@@ -4,15 +4,93 @@
 OutputGenerator：将 Markdown 内容导出为 TXT、PDF、PPTX，并返回对应路径。
 """
 import os
-import aiofiles
+import asyncio
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import blake2b
 import markdown2
 import pdfkit # type: ignore
 from pptx import Presentation
-from typing import Dict, Any
+from typing import Dict, Any, Union
 import logging
 
+from src.utils.fs import ensure_dir
+
 logger = logging.getLogger(__name__)
 
+_MARKDOWN_EXTRAS = ["fenced-code-blocks", "tables", "footnotes", "header-ids", "smarty-pants"]
+
+# Markdown → HTML 渲染结果缓存：内容哈希 -> HTML（相同报告内容重复导出时无需再次解析）
+_HTML_CACHE_MAXSIZE = 16
+_html_cache: "OrderedDict[str, str]" = OrderedDict()
+_html_cache_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class PreparedMarkdown:
+    """OutputGenerator.prepare 的结果：原始 Markdown 与渲染好的 HTML，供各导出方法共用。"""
+    markdown: str
+    html: str
+
+
+def _render_html_sync(md: str) -> str:
+    """将 Markdown 渲染为 HTML，按内容哈希缓存（同步，CPU 密集，由线程池调用）。"""
+    key = blake2b(md.encode("utf-8"), digest_size=16).hexdigest()
+    with _html_cache_lock:
+        html = _html_cache.get(key)
+        if html is not None:
+            _html_cache.move_to_end(key)
+            return html
+    html = markdown2.markdown(md, extras=_MARKDOWN_EXTRAS)
+    with _html_cache_lock:
+        _html_cache[key] = html
+        if len(_html_cache) > _HTML_CACHE_MAXSIZE:
+            _html_cache.popitem(last=False)
+    return html
+
+
+def _markdown_of(md: Union[str, PreparedMarkdown]) -> str:
+    return md.markdown if isinstance(md, PreparedMarkdown) else md
+
+
+def _write_text_sync(path: str, text: str) -> None:
+    """同步写入文本文件；由 asyncio.to_thread 整体放入线程池执行（open+write 只需一次线程切换）。"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _build_ppt_sync(ppt_json: Dict[str, Any], ppt_path: str) -> None:
+    """根据 ppt_json 构建 PPTX 并保存到 ppt_path（同步）。"""
+    prs = Presentation()
+    slide_layout_title = prs.slide_layouts[0]
+    slide = prs.slides.add_slide(slide_layout_title)
+    title_shape = slide.shapes.title
+    subtitle_shape = slide.placeholders.get(1)
+
+    title_shape.text = ppt_json.get("title", "演示文稿")
+    if subtitle_shape:
+        subtitle_shape.text = ""
+
+    slide_layout_content = prs.slide_layouts[1]
+    for slide_info in ppt_json.get("slides", []):
+        slide = prs.slides.add_slide(slide_layout_content)
+        title_shape = slide.shapes.title
+        body_shape = slide.shapes.placeholders[1]
+
+        title_shape.text = slide_info.get("heading", "内容页")
+
+        tf = body_shape.text_frame
+        tf.clear()
+
+        content_text = slide_info.get("content", "")
+        for line in content_text.split('\n'):
+            p = tf.add_paragraph()
+            p.text = line.strip()
+
+    prs.save(ppt_path)
+
+
 class OutputGenerator:
     def __init__(self, config: Dict[str, Any]):
         """
@@ -21,53 +99,60 @@ class OutputGenerator:
         """
         self.output_dir = config.get("output_dir", "outputs")
         try:
-            os.makedirs(self.output_dir, exist_ok=True)
+            ensure_dir(self.output_dir)
             logger.info(f"输出目录 '{self.output_dir}' 已确保存在。")
         except OSError as e:
             logger.error(f"创建输出目录 '{self.output_dir}' 失败: {e}", exc_info=True)
             raise
 
-    async def to_text(self, md: str) -> str:
+    async def prepare(self, md: str) -> PreparedMarkdown:
+        """
+        预先解析 Markdown（渲染 HTML）一次，结果可传给 to_text / to_markdown / to_pdf 共用。
+        渲染在线程池中执行，并按内容哈希缓存。
+        """
+        html = await asyncio.to_thread(_render_html_sync, md)
+        return PreparedMarkdown(markdown=md, html=html)
+
+    async def to_text(self, md: Union[str, PreparedMarkdown]) -> str:
         """
         将 Markdown 转为纯文本（去掉标记），并写入 .txt 文件。
         """
         txt_path = os.path.join(self.output_dir, "report.txt")
         logger.info(f"准备将 Markdown 转换为 TXT: {txt_path}")
         try:
-            # 修复：使用 aiofiles
-            async with aiofiles.open(txt_path, "w", encoding="utf-8") as f:
-                await f.write(md)
+            await asyncio.to_thread(_write_text_sync, txt_path, _markdown_of(md))
             logger.info(f"TXT 文件已成功保存至: {txt_path}")
             return txt_path
         except Exception as e:
             logger.error(f"保存 TXT 文件失败 ({txt_path}): {e}", exc_info=True)
             raise
 
-    async def to_markdown(self, md: str) -> str:
+    async def to_markdown(self, md: Union[str, PreparedMarkdown]) -> str:
         """
         直接输出 Markdown 文件（.md）。
         """
         md_path = os.path.join(self.output_dir, "report.md")
         logger.info(f"准备保存 Markdown 文件: {md_path}")
         try:
-            # 修复：使用 aiofiles
-            async with aiofiles.open(md_path, "w", encoding="utf-8") as f:
-                await f.write(md)
+            await asyncio.to_thread(_write_text_sync, md_path, _markdown_of(md))
             logger.info(f"Markdown 文件已成功保存至: {md_path}")
             return md_path
         except Exception as e:
             logger.error(f"保存 Markdown 文件失败 ({md_path}): {e}", exc_info=True)
             raise
 
-    async def to_pdf(self, md: str) -> str:
+    async def to_pdf(self, md: Union[str, PreparedMarkdown]) -> str:
         """
-        将 Markdown 转为 HTML，再调用 pdfkit 生成 PDF。
+        将 Markdown 转为 HTML（传入 prepare 的结果时直接复用其 HTML），再调用 pdfkit 生成 PDF。
         依赖：系统需安装 wkhtmltopdf。
         """
         pdf_path = os.path.join(self.output_dir, "report.pdf")
         logger.info(f"准备将 Markdown 转换为 PDF: {pdf_path}")
         try:
-            html = markdown2.markdown(md, extras=["fenced-code-blocks", "tables", "footnotes", "header-ids", "smarty-pants"])
+            if isinstance(md, PreparedMarkdown):
+                html = md.html
+            else:
+                html = await asyncio.to_thread(_render_html_sync, md)
             options = {
                 'encoding': "UTF-8",
                 'custom-header': [
@@ -76,7 +161,8 @@ class OutputGenerator:
                 'no-outline': None,
                 'quiet': ''
             }
-            pdfkit.from_string(html, pdf_path, options=options)
+            # wkhtmltopdf 渲染为阻塞调用，放入线程池，可与其他格式的生成并行
+            await asyncio.to_thread(pdfkit.from_string, html, pdf_path, options=options)
             logger.info(f"PDF 文件已成功生成至: {pdf_path}")
             return pdf_path
         except FileNotFoundError:
@@ -95,33 +181,8 @@ class OutputGenerator:
         ppt_path = os.path.join(self.output_dir, "report.pptx")
         logger.info(f"准备从 JSON 生成 PPTX: {ppt_path}")
         try:
-            prs = Presentation()
-            slide_layout_title = prs.slide_layouts[0]
-            slide = prs.slides.add_slide(slide_layout_title)
-            title_shape = slide.shapes.title
-            subtitle_shape = slide.placeholders.get(1)
-
-            title_shape.text = ppt_json.get("title", "演示文稿")
-            if subtitle_shape:
-                subtitle_shape.text = ""
-
-            slide_layout_content = prs.slide_layouts[1]
-            for slide_info in ppt_json.get("slides", []):
-                slide = prs.slides.add_slide(slide_layout_content)
-                title_shape = slide.shapes.title
-                body_shape = slide.shapes.placeholders[1]
-
-                title_shape.text = slide_info.get("heading", "内容页")
-
-                tf = body_shape.text_frame
-                tf.clear()
-
-                content_text = slide_info.get("content", "")
-                for line in content_text.split('\n'):
-                    p = tf.add_paragraph()
-                    p.text = line.strip()
-
-            prs.save(ppt_path)
+            # python-pptx 构建与保存均为同步操作，整体放入线程池执行
+            await asyncio.to_thread(_build_ppt_sync, ppt_json, ppt_path)
             logger.info(f"PPTX 文件已成功生成至: {ppt_path}")
             return ppt_path
         except Exception as e:
@@ -5,42 +5,105 @@ Redis 客户端封装：支持多种存储方案，包括分片存储、队列
 新增告警状态管理功能。
 """
 
-import redis
 import json
-from typing import Any, Optional, Dict
-from src.config.settings import REDIS_HOST, REDIS_PORT, REDIS_DB
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Dict, Iterable, List, Sequence, Tuple
+from src.config.settings import SESSION_TTL_SECONDS
+from src.utils.redis_client import get_client, get_binary_client, get_async_client
+
+try:
+    import orjson  # 会话 state 可能达到 MB 级，C 实现的编解码明显快于标准库 json
+
+    def _dumps_state(value: Any) -> bytes:
+        # 与 json.dumps 一致：非字符串键转为字符串，而不是抛出异常
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+    _loads_state = orjson.loads
+except ImportError:
+    _dumps_state = json.dumps
+    _loads_state = json.loads
 
 # 全局 Redis 客户端
 _redis_client = None
 
 
 def get_redis_client():
-    """获取Redis客户端单例"""
+    """获取Redis客户端单例（使用 src.utils.redis_client 的共享连接池）"""
     global _redis_client
     if _redis_client is None:
-        _redis_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, decode_responses=True)
+        _redis_client = get_client()
     return _redis_client
 
 
 # --- 单 Key 存储（过期时间：24 小时）---
-def set_state(session_id: str, state: Dict[str, Any], ex: int = 86400) -> None:
-    """将整个 state 字典以 JSON 存储到 Redis"""
-    client = get_redis_client()
+def set_state(session_id: str, state: Dict[str, Any], ex: int = SESSION_TTL_SECONDS, pipe=None) -> None:
+    """
+    将整个 state 字典以 JSON 存储到 Redis。
+    传入 pipe（redis pipeline）时仅将 SET 加入管道，由调用方统一 execute。
+    """
+    client = pipe if pipe is not None else get_redis_client()
     key = f"state:{session_id}"
-    client.set(key, json.dumps(state), ex=ex)
+    client.set(key, _dumps_state(state), ex=ex)
+
+
+def _refresh_keys(keys: Sequence[str], raw_values: Sequence[Any], state: Dict[str, Any]) -> List[str]:
+    """
+    读取后需要刷新 TTL 的 Key：带 error 的失败会话保持写入时较短的 ERROR_STATE_TTL_SECONDS，
+    不被轮询延长到 SESSION_TTL_SECONDS；不存在的分片不刷新。
+    """
+    if state.get("error"):
+        return []
+    return [key for key, raw in zip(keys, raw_values) if raw is not None]
+
+
+def _expire_keys(client, keys: Sequence[str]) -> None:
+    """将 keys 的 TTL 刷新为 SESSION_TTL_SECONDS，多个 Key 在一个非事务管道中发送。"""
+    if len(keys) == 1:
+        client.expire(keys[0], SESSION_TTL_SECONDS)
+    elif keys:
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.expire(key, SESSION_TTL_SECONDS)
+        pipe.execute()
+
+
+async def _aexpire_keys(client, keys: Sequence[str]) -> None:
+    """_expire_keys 的异步版本。"""
+    if len(keys) == 1:
+        await client.expire(keys[0], SESSION_TTL_SECONDS)
+    elif keys:
+        async with client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.expire(key, SESSION_TTL_SECONDS)
+            await pipe.execute()
 
 
 def get_state(session_id: str) -> Optional[Dict[str, Any]]:
-    """从 Redis 读取整个 state 并刷新 TTL"""
+    """从 Redis 读取整个 state 并刷新 TTL（失败会话除外）"""
     client = get_redis_client()
     key = f"state:{session_id}"
     data = client.get(key)
     if data:
-        client.expire(key, 86400)  # 刷新 TTL
-        return json.loads(data)
+        state = _loads_state(data)
+        _expire_keys(client, _refresh_keys((key,), (data,), state))  # 刷新 TTL
+        return state
     return None
 
 
+async def aget_state(session_id: str) -> Optional[Dict[str, Any]]:
+    """get_state 的异步版本。"""
+    client = get_async_client()
+    key = f"state:{session_id}"
+    data = await client.get(key)
+    if not data:
+        return None
+    state = _loads_state(data)
+    await _aexpire_keys(client, _refresh_keys((key,), (data,), state))  # 刷新 TTL
+    return state
+
+
 def delete_state(session_id: str) -> None:
     """删除指定 session_id 对应的状态"""
     client = get_redis_client()
@@ -49,9 +112,15 @@ def delete_state(session_id: str) -> None:
 
 
 # --- 分片存储（针对大状态）---
-def set_state_sharded(session_id: str, state: Dict[str, Any], ex: int = 86400) -> None:
-    """将 state 中的大字段拆分存储"""
-    client = get_redis_client()
+def _shard_keys(session_id: str) -> Tuple[str, str, str]:
+    return f"state:{session_id}:base", f"state:{session_id}:research", f"state:{session_id}:code"
+
+
+def set_state_sharded(session_id: str, state: Dict[str, Any], ex: int = SESSION_TTL_SECONDS, pipe=None) -> None:
+    """
+    将 state 中的大字段拆分存储，三个带过期时间的 SET 在一个非事务管道中发送（一次往返）。
+    传入 pipe（redis pipeline）时仅将 SET 加入该管道，由调用方统一 execute。
+    """
     base = {
         "topic": state.get("topic"),
         "tasks": state.get("tasks"),
@@ -63,43 +132,90 @@ def set_state_sharded(session_id: str, state: Dict[str, Any], ex: int = 86400) -
     research = state.get("research_results", {})
     code = state.get("code_results", {})
 
-    client.set(f"state:{session_id}:base", json.dumps(base), ex=ex)
-    client.set(f"state:{session_id}:research", json.dumps(research), ex=ex)
-    client.set(f"state:{session_id}:code", json.dumps(code), ex=ex)
+    own_pipe = pipe is None
+    if own_pipe:
+        pipe = get_redis_client().pipeline(transaction=False)
+    key_base, key_research, key_code = _shard_keys(session_id)
+    pipe.set(key_base, _dumps_state(base), ex=ex)
+    pipe.set(key_research, _dumps_state(research), ex=ex)
+    pipe.set(key_code, _dumps_state(code), ex=ex)
+    if own_pipe:
+        pipe.execute()
 
 
-def get_state_sharded(session_id: str) -> Optional[Dict[str, Any]]:
-    """从分片 Key 中读取各部分数据，并合并成一个完整 state"""
-    client = get_redis_client()
-    key_base = f"state:{session_id}:base"
-    data_base = client.get(key_base)
+def _merge_shards(data_base, research_data, code_data) -> Optional[Dict[str, Any]]:
+    """将三个分片的原始数据合并为完整 state；base 不存在时返回 None。"""
     if data_base is None:
         return None
+    research = _loads_state(research_data) if research_data is not None else {}
+    code = _loads_state(code_data) if code_data is not None else {}
+    return {**_loads_state(data_base), "research_results": research, "code_results": code}
 
-    base = json.loads(data_base)
-    key_research = f"state:{session_id}:research"
-    key_code = f"state:{session_id}:code"
 
-    research_data = client.get(key_research)
-    code_data = client.get(key_code)
+def get_state_sharded(session_id: str) -> Optional[Dict[str, Any]]:
+    """
+    从分片 Key 中读取各部分数据，并合并成一个完整 state。
+    三个分片由一条 MGET 读取；随后仅对存在的分片刷新 TTL（一个管道），带 error 的失败会话不刷新。
+    """
+    keys = _shard_keys(session_id)
+    client = get_redis_client()
+    raw_values = client.mget(keys)
+    state = _merge_shards(*raw_values)
+    if state is not None:
+        _expire_keys(client, _refresh_keys(keys, raw_values, state))
+    return state
+
 
-    research = json.loads(research_data) if research_data is not None else {}
-    code = json.loads(code_data) if code_data is not None else {}
+async def aget_state_sharded(session_id: str) -> Optional[Dict[str, Any]]:
+    """get_state_sharded 的异步版本。"""
+    keys = _shard_keys(session_id)
+    client = get_async_client()
+    raw_values = await client.mget(keys)
+    state = _merge_shards(*raw_values)
+    if state is not None:
+        await _aexpire_keys(client, _refresh_keys(keys, raw_values, state))
+    return state
 
-    client.expire(key_base, 86400)
-    if research_data is not None:
-        client.expire(key_research, 86400)
-    if code_data is not None:
-        client.expire(key_code, 86400)
 
-    merged = {**base, "research_results": research, "code_results": code}
-    return merged
+# 分片布局：research_results / code_results 各占一个 Key，其余字段都在 base 中
+_SHARD_OF_FIELD = {"research_results": "research", "code_results": "code"}
+
+
+def get_state_fields_sharded(session_id: str, fields: Iterable[str]) -> Optional[Dict[str, Any]]:
+    """
+    只读取分片 state 中的指定字段：仅用一条 MGET 读取包含这些字段的分片（base 始终读取，用于判断会话是否存在），
+    再按 get_state_sharded 的规则刷新 TTL。会话不存在时返回 None，缺失字段的值为 None。
+    """
+    fields = list(fields)
+    shards = ["base"]
+    for field in fields:
+        shard = _SHARD_OF_FIELD.get(field)
+        if shard and shard not in shards:
+            shards.append(shard)
+
+    keys = [f"state:{session_id}:{shard}" for shard in shards]
+    client = get_redis_client()
+    raw_values = client.mget(keys)
+    if raw_values[0] is None:
+        return None
+
+    loaded = dict(zip(shards, raw_values))
+    base = _loads_state(loaded["base"])
+    _expire_keys(client, _refresh_keys(keys, raw_values, base))
+    result: Dict[str, Any] = {}
+    for field in fields:
+        shard = _SHARD_OF_FIELD.get(field)
+        if shard is None:
+            result[field] = base.get(field)
+        else:
+            raw = loaded[shard]
+            result[field] = _loads_state(raw) if raw is not None else {}
+    return result
 
 
 def delete_state_sharded(session_id: str) -> None:
     """删除分片存储的所有 Key"""
-    client = get_redis_client()
-    client.delete(f"state:{session_id}:base", f"state:{session_id}:research", f"state:{session_id}:code")
+    get_redis_client().delete(*_shard_keys(session_id))
 
 
 # --- 任务队列（Redis List）---
@@ -130,19 +246,119 @@ def dequeue_session(block: bool = True, timeout: int = 5) -> Optional[Dict[str,
 
 
 # --- 二级缓存（用于中间结果）---
-def cache_result(cache_key: str, value: Any, ex: int = 3600) -> None:
-    """缓存某个中间结果，默认过期时间 1 小时"""
-    client = get_redis_client()
-    client.set(cache_key, json.dumps(value), ex=ex)
+# 中间结果以 msgpack 二进制存储（比 JSON 更快、更小），未安装 msgpack 时回退到 JSON 字节；
+# 已安装 zstandard 时，超过 _COMPRESS_MIN_BYTES 的负载再做 zstd 压缩（检索结果等文本通常可压缩 4~6 倍）
+try:
+    import msgpack
+
+    def _serialize(value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def _deserialize(raw: bytes) -> Any:
+        return msgpack.unpackb(raw, raw=False)
+except ImportError:
+    def _serialize(value: Any) -> bytes:
+        return json.dumps(value).encode("utf-8")
+
+    def _deserialize(raw: bytes) -> Any:
+        return json.loads(raw)
+
+try:
+    import zstandard as _zstd
+except ImportError:  # zstandard 为可选依赖，未安装时不压缩
+    _zstd = None
+
+# 缓存键版本前缀：负载格式变化时递增，旧格式的缓存条目随之失效（自然过期）
+_CACHE_KEY_PREFIX = "v2:"
+# 小负载压缩收益有限，直接存储
+_COMPRESS_MIN_BYTES = 1024
+_ZSTD_LEVEL = 3
+# zstd 帧魔数；msgpack / JSON 序列化结果不会以这 4 个字节开头，可据此区分是否压缩
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _pack(value: Any) -> bytes:
+    raw = _serialize(value)
+    if _zstd is not None and len(raw) >= _COMPRESS_MIN_BYTES:
+        return _zstd.compress(raw, _ZSTD_LEVEL)
+    return raw
+
+
+def _unpack(raw: bytes) -> Any:
+    if raw[:4] == _ZSTD_MAGIC:
+        if _zstd is None:
+            raise RuntimeError("缓存负载为 zstd 压缩格式，但未安装 zstandard")
+        raw = _zstd.decompress(raw)
+    return _deserialize(raw)
+
+
+# 二进制负载需要不做 decode 的客户端
+_binary_redis_client = None
+
+# 进程内热点缓存：cache_key -> (过期时间戳, 序列化字节)。保存字节而非对象，命中时重新反序列化，调用方修改结果不会污染缓存
+_LOCAL_CACHE_MAXSIZE = 1024
+_local_cache: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+_local_cache_lock = threading.Lock()
+
+
+def get_binary_redis_client():
+    """获取不做 decode_responses 的 Redis 客户端单例（用于二进制缓存负载）"""
+    global _binary_redis_client
+    if _binary_redis_client is None:
+        _binary_redis_client = get_binary_client()
+    return _binary_redis_client
+
+
+def _local_put(cache_key: str, raw: bytes, ex: int) -> None:
+    with _local_cache_lock:
+        _local_cache[cache_key] = (time.monotonic() + ex, raw)
+        _local_cache.move_to_end(cache_key)
+        if len(_local_cache) > _LOCAL_CACHE_MAXSIZE:
+            _local_cache.popitem(last=False)
+
+
+def _local_get(cache_key: str) -> Optional[bytes]:
+    with _local_cache_lock:
+        entry = _local_cache.get(cache_key)
+        if entry is None:
+            return None
+        expire_at, raw = entry
+        if expire_at <= time.monotonic():
+            del _local_cache[cache_key]
+            return None
+        _local_cache.move_to_end(cache_key)
+        return raw
+
+
+def cache_result(cache_key: str, value: Any, ex: int = 3600, pipe=None) -> None:
+    """
+    缓存某个中间结果，默认过期时间 1 小时。
+    传入 pipe（redis pipeline）时仅将 SET 加入管道，由调用方与其他命令一起 execute，节省一次往返；
+    此时不写入进程内缓存（管道尚未执行，可能失败），首次 get_cached 从 Redis 读取后再记入。
+    """
+    raw = _pack(value)
+    if pipe is not None:
+        pipe.set(_CACHE_KEY_PREFIX + cache_key, raw, ex=ex)
+        return
+    get_binary_redis_client().set(_CACHE_KEY_PREFIX + cache_key, raw, ex=ex)
+    _local_put(cache_key, raw, ex)
 
 
 def get_cached(cache_key: str) -> Optional[Any]:
-    """读取二级缓存"""
-    client = get_redis_client()
-    data = client.get(cache_key)
-    if data:
-        return json.loads(data)
-    return None
+    """读取二级缓存：先查进程内热点缓存，未命中再查 Redis（命中后同样记入进程内缓存）"""
+    raw = _local_get(cache_key)
+    if raw is None:
+        # GET 与 TTL 在同一管道中发送，只需一次往返
+        redis_key = _CACHE_KEY_PREFIX + cache_key
+        pipe = get_binary_redis_client().pipeline(transaction=False)
+        pipe.get(redis_key)
+        pipe.ttl(redis_key)
+        raw, ttl = pipe.execute()
+        if not raw:
+            return None
+        if ttl and ttl > 0:
+            _local_put(cache_key, raw, ttl)
+    return _unpack(raw)
 
 
 # --- 告警状态管理 (优化点) ---
@@ -0,0 +1,107 @@
+# 文件路径: src/utils/event_bus.py
+# -*- coding: utf-8 -*-
+"""
+会话状态事件缓冲：节点内的 pub/sub 状态消息先写入本地缓冲，
+在节点边界（或缓冲达到 EVENT_BATCH_SIZE 条 / 首条消息等待超过 EVENT_FLUSH_MS 毫秒）时
+通过一个非事务 pipeline 一次性发布，将 N 次 PUBLISH 往返合并为 1 次。
+频道当前无订阅者（PUBSUB NUMSUB 为 0）时直接丢弃消息，与 pub/sub "即发即弃"语义一致；
+仅缓存订阅者数量为正的结果（5 秒），为 0 时每次重新查询，避免刚订阅的客户端丢失事件。
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Tuple, Union
+
+from src.config.settings import EVENT_BATCH_SIZE, EVENT_FLUSH_MS
+
+logger = logging.getLogger(__name__)
+
+_Payload = Union[bytes, str]
+
+# 频道订阅者缓存：channel -> (订阅者数量, 查询时间)，只记录数量为正的结果
+_NUMSUB_TTL_SECONDS = 5.0
+_NUMSUB_CACHE_MAXSIZE = 1024
+_numsub_cache: Dict[str, Tuple[int, float]] = {}
+_numsub_lock = threading.Lock()
+
+
+def has_subscribers(client, channel: str) -> bool:
+    """
+    判断频道当前是否有订阅者；有订阅者的结果按频道缓存 _NUMSUB_TTL_SECONDS 秒，
+    同一会话的多个节点共享一次查询。无订阅者的结果不缓存，下次调用重新查询，
+    以免过期的"无订阅者"判断丢弃刚订阅客户端的消息。查询失败时按"有订阅者"处理，不丢消息。
+    """
+    now = time.monotonic()
+    with _numsub_lock:
+        cached = _numsub_cache.get(channel)
+    if cached is not None and now - cached[1] < _NUMSUB_TTL_SECONDS:
+        return cached[0] > 0
+
+    try:
+        count = int(client.pubsub_numsub(channel)[0][1])
+    except Exception as e:
+        logger.warning(f"[EventBus] 查询频道 {channel} 订阅者数量失败: {e}")
+        return True
+
+    if count <= 0:
+        with _numsub_lock:
+            _numsub_cache.pop(channel, None)
+        return False
+
+    with _numsub_lock:
+        if len(_numsub_cache) >= _NUMSUB_CACHE_MAXSIZE:
+            # 清理过期条目，避免按会话增长的频道名无限累积
+            for key in [k for k, (_, ts) in _numsub_cache.items() if now - ts >= _NUMSUB_TTL_SECONDS]:
+                del _numsub_cache[key]
+        _numsub_cache[channel] = (count, now)
+    return True
+
+
+class SessionEventBus:
+    """
+    状态事件缓冲发布器：
+    - publish(channel, payload)：频道无订阅者时直接丢弃，否则写入缓冲，达到数量或时间阈值时自动 flush；
+    - flush(pipe=None)：发布缓冲中的全部消息；传入 pipe 时仅将 PUBLISH 加入该管道，由调用方统一 execute。
+    """
+
+    def __init__(self, client, batch_size: int = EVENT_BATCH_SIZE, flush_ms: int = EVENT_FLUSH_MS):
+        self._client = client
+        self._batch_size = batch_size
+        self._flush_seconds = flush_ms / 1000
+        self._buffer: List[Tuple[str, _Payload]] = []
+        self._first_ts = 0.0
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, payload: _Payload) -> None:
+        """缓冲一条状态消息；缓冲满或首条消息已等待超过阈值时立即发布。"""
+        if not has_subscribers(self._client, channel):
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not self._buffer:
+                self._first_ts = now
+            self._buffer.append((channel, payload))
+            should_flush = (len(self._buffer) >= self._batch_size
+                            or now - self._first_ts >= self._flush_seconds)
+        if should_flush:
+            self.flush()
+
+    def flush(self, pipe=None) -> None:
+        """发布缓冲中的全部消息（保持写入顺序）。"""
+        with self._lock:
+            buffer, self._buffer = self._buffer, []
+        if not buffer:
+            return
+        if pipe is not None:
+            for channel, payload in buffer:
+                pipe.publish(channel, payload)
+            return
+        with self._client.pipeline(transaction=False) as p:
+            for channel, payload in buffer:
+                p.publish(channel, payload)
+            p.execute()
+        logger.debug(f"[EventBus] 批量发布 {len(buffer)} 条状态消息")
+
+    def __len__(self) -> int:
+        return len(self._buffer)
@@ -0,0 +1,30 @@
+# 文件路径: src/utils/event_loop.py
+# -*- coding: utf-8 -*-
+"""
+事件循环工具：在受支持的平台上将 uvloop 设为全局 asyncio 事件循环策略，
+供 CLI 与 FastAPI 服务入口统一调用。
+"""
+import asyncio
+import sys
+
+
+def install_uvloop() -> bool:
+    """
+    尝试将 uvloop 安装为全局事件循环策略。
+    - Windows 平台不支持 uvloop，直接跳过；
+    - uvloop 未安装时回退到标准 asyncio 事件循环。
+    返回：是否已成功启用 uvloop。
+    """
+    if sys.platform == "win32":
+        return False
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+def uvicorn_loop_name(uvloop_enabled: bool) -> str:
+    """返回传递给 uvicorn.run(loop=...) 的事件循环实现名称。"""
+    return "uvloop" if uvloop_enabled else "asyncio"
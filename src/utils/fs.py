@@ -0,0 +1,22 @@
+# 文件路径: src/utils/fs.py
+# -*- coding: utf-8 -*-
+"""
+文件系统小工具：输出目录只需在进程内首次使用时创建一次，之后跳过 makedirs 的 stat 系统调用。
+"""
+import os
+import threading
+from typing import Set
+
+# 本进程已确保存在的目录（规范化后的路径）
+_ENSURED_DIRS: Set[str] = set()
+_ensured_lock = threading.Lock()
+
+
+def ensure_dir(path: str) -> None:
+    """确保目录存在；同一目录在进程内只调用一次 os.makedirs。创建失败时抛出 OSError。"""
+    key = os.path.normpath(path)
+    if key in _ENSURED_DIRS:
+        return
+    os.makedirs(key, exist_ok=True)
+    with _ensured_lock:
+        _ENSURED_DIRS.add(key)
@@ -3,11 +3,12 @@
 """
 提供基于 Redis 的分布式锁封装，确保同一个 session_id 同一时刻只有一个执行流。
 """
+import asyncio
 import redis
 import uuid
 import time
 from typing import Optional
-from src.config.settings import REDIS_HOST, REDIS_PORT, REDIS_DB
+from src.utils.redis_client import get_client, get_async_client
 
 # 全局 Redis 连接
 _redis_client = None
@@ -15,7 +16,7 @@ _redis_client = None
 def get_redis_client():
     global _redis_client
     if _redis_client is None:
-        _redis_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, decode_responses=True)
+        _redis_client = get_client()
     return _redis_client
 
 def acquire_lock(session_id: str, timeout: int = 10, wait: int = 5) -> Optional[str]:
@@ -34,6 +35,28 @@ def acquire_lock(session_id: str, timeout: int = 10, wait: int = 5) -> Optional[
         time.sleep(0.05) # User specified 0.05 in their final lock.py
     return None
 
+async def aacquire_lock(session_id: str, timeout: int = 10, wait: int = 5) -> Optional[str]:
+    """acquire_lock 的异步版本：等待期间让出事件循环，而不是 time.sleep 阻塞线程。"""
+    client = get_async_client()
+    lock_key = f"lock:session:{session_id}"
+    lock_id = str(uuid.uuid4())
+    deadline = time.time() + wait
+    while time.time() < deadline:
+        if await client.set(lock_key, lock_id, nx=True, ex=timeout):
+            return lock_id
+        await asyncio.sleep(0.05)
+    return None
+
+# 仅当锁的值等于 lock_id 时才删除（原子操作）
+_RELEASE_LUA = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+else
+    return 0
+end
+"""
+
+
 def release_lock(session_id: str, lock_id: str) -> bool:
     """
     仅当 key 对应的值等于 lock_id 时才删除锁，保证不会误释放别人的锁。
@@ -41,17 +64,30 @@ def release_lock(session_id: str, lock_id: str) -> bool:
     """
     client = get_redis_client()
     lock_key = f"lock:session:{session_id}"
-    lua = """
-    if redis.call("GET", KEYS[1]) == ARGV[1] then
-        return redis.call("DEL", KEYS[1])
-    else
-        return 0
-    end
-    """
     try:
-        result = client.eval(lua, 1, lock_key, lock_id)
+        result = client.eval(_RELEASE_LUA, 1, lock_key, lock_id)
         return result == 1
     except redis.RedisError: # Catch generic RedisError as per user's spec
         # In a real app, log this error
         # logger.error(f"Redis error during lock release for {session_id}: {e}", exc_info=True)
         return False
+
+
+async def arelease_lock(session_id: str, lock_id: str) -> bool:
+    """release_lock 的异步版本。"""
+    client = get_async_client()
+    lock_key = f"lock:session:{session_id}"
+    try:
+        result = await client.eval(_RELEASE_LUA, 1, lock_key, lock_id)
+        return result == 1
+    except redis.RedisError:
+        return False
+
+
+def release_lock_with_pipe(pipe, session_id: str, lock_id: str) -> None:
+    """
+    release_lock 的管道版本：仅将释放锁的 Lua 脚本加入 pipe，
+    由调用方与其他命令一起 execute；该命令在结果列表中的返回值为 1 表示释放成功。
+    同步与 redis.asyncio 的管道均可使用（加入命令本身不产生 I/O）。
+    """
+    pipe.eval(_RELEASE_LUA, 1, f"lock:session:{session_id}", lock_id)
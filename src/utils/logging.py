@@ -6,15 +6,34 @@ Unified logging configuration to avoid conflicts with multiple basicConfig calls
 import logging
 import os
 
+# Built once and shared by the single root handler (%-style is the cheapest format style)
+_FORMATTER = logging.Formatter(
+    "%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S" # Added date format for consistency
+)
+_initialized = False
+
 def init_logger(level:str="INFO"):
+    """
+    Idempotent: the first call installs one stream handler on the root logger
+    and sets the level; later calls (from other entry points / modules) are no-ops,
+    so log records are never formatted and emitted twice.
+    """
+    global _initialized
+    if _initialized:
+        return
+    _initialized = True
+
     # Convert string level to logging level constant
     log_level = getattr(logging, level.upper(), logging.INFO)
+    root = logging.getLogger()
+    root.setLevel(log_level)
 
-    logging.basicConfig(
-        level=log_level,
-        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S" # Added date format for consistency
-    )
+    # Respect handlers installed by someone else (e.g. pytest caplog, uvicorn)
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(_FORMATTER)
+        root.addHandler(handler)
     # Suppress excessive logging from third-party libraries
     noisy_libraries = ["httpx", "urllib3", "httpcore", "openai", "asyncio"] # Added more common noisy libraries
     for noisy_lib in noisy_libraries:
@@ -0,0 +1,49 @@
+# 文件路径: src/utils/redis_client.py
+# -*- coding: utf-8 -*-
+"""
+共享 Redis 连接池：Agent 发布客户端、图执行器的 Pub/Sub、缓存与分布式锁共用同一个 ConnectionPool，
+限制并发会话下的连接数（文件描述符）并省去重复建连的开销。
+连接池为阻塞式：并发会话突发超过 REDIS_MAX_CONNECTIONS 时排队等待空闲连接（最长 REDIS_POOL_TIMEOUT_SECONDS 秒），
+而不是直接抛出 "Too many connections"。
+二进制缓存负载不能做 decode_responses，因此另有一个参数相同、仅不解码的 BINARY_POOL。
+FastAPI 等事件循环内的调用方使用 ASYNC_POOL（redis.asyncio），Redis 往返期间不占用事件循环线程。
+"""
+
+import redis
+import redis.asyncio as aioredis
+
+from src.config.settings import (
+    REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_MAX_CONNECTIONS, REDIS_POOL_TIMEOUT_SECONDS
+)
+
+# 连接池在首次取连接时才真正建连，模块导入时不会访问 Redis；
+# 开启 TCP keepalive，并对空闲超过 30 秒的连接在复用前做健康检查，超时自动重试一次
+_POOL_KWARGS = dict(
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    db=REDIS_DB,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    timeout=REDIS_POOL_TIMEOUT_SECONDS,
+    socket_keepalive=True,
+    health_check_interval=30,
+    retry_on_timeout=True,
+)
+
+POOL = redis.BlockingConnectionPool(decode_responses=True, **_POOL_KWARGS)
+BINARY_POOL = redis.BlockingConnectionPool(**_POOL_KWARGS)
+ASYNC_POOL = aioredis.BlockingConnectionPool(decode_responses=True, **_POOL_KWARGS)
+
+
+def get_client() -> redis.Redis:
+    """返回绑定到共享连接池的 Redis 客户端（客户端对象本身很轻量，可按需创建）。"""
+    return redis.Redis(connection_pool=POOL)
+
+
+def get_binary_client() -> redis.Redis:
+    """返回绑定到二进制连接池（不做 decode_responses）的 Redis 客户端。"""
+    return redis.Redis(connection_pool=BINARY_POOL)
+
+
+def get_async_client() -> aioredis.Redis:
+    """返回绑定到异步连接池的 redis.asyncio 客户端，供事件循环内的调用方使用。"""
+    return aioredis.Redis(connection_pool=ASYNC_POOL)
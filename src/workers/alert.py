@@ -11,11 +11,10 @@ from collections import deque
 from typing import Deque
 
 from src.config.settings import (
-    FAILURE_RATE_THRESHOLD, ALERT_PROVIDER,
-    JOB_INTERVAL_SECONDS, ALERT_STATE_EXPIRY_SECONDS
+    FAILURE_RATE_THRESHOLD,
+    JOB_INTERVAL_SECONDS, ALERT_STATE_EXPIRY_SECONDS, PROMETHEUS_METRICS_ENABLED
 )
-from src.adapters.local_alert_adapter import LocalAlertAdapter
-from src.adapters.cloud_alert_adapter import CloudAlertAdapter
+from src.adapters.alert_batcher import submit_alert
 from src.utils.cache import get_alert_state, set_alert_state
 
 # 可选 Prometheus 埋点
@@ -65,12 +64,8 @@ def send_failure_alert(is_recovery: bool, rate: float):
         dingtalk_msg = f"【节点告警】失败率 {rate * 100:.2f}% > {FAILURE_RATE_THRESHOLD * 100:.2f}%"
 
     logger.info(f"准备发送通知: {subject}")
-    if ALERT_PROVIDER == "local":
-        LocalAlertAdapter.notify(subject, body)
-        from src.adapters.dingtalk_adapter import send_dingbot_text
-        send_dingbot_text(dingtalk_msg)
-    else:
-        CloudAlertAdapter.notify(subject, body)
+    # 监控循环运行在事件循环中：交给 AlertBatcher 合并后在线程池发送，不阻塞循环
+    submit_alert(subject, body, dingtalk_msg)
 
     if PROMETHEUS_METRICS_ENABLED and ALERT_COUNT_COUNTER:
         alert_type_label = "recovery" if is_recovery else "alert"
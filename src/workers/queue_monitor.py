@@ -14,11 +14,10 @@ from typing import Optional
 
 from src.config.settings import (
     REDIS_HOST, REDIS_PORT, REDIS_DB,
-    QUEUE_ALERT_THRESHOLD, ALERT_PROVIDER,
-    JOB_INTERVAL_SECONDS, ALERT_STATE_EXPIRY_SECONDS
+    QUEUE_ALERT_THRESHOLD,
+    JOB_INTERVAL_SECONDS, ALERT_STATE_EXPIRY_SECONDS, PROMETHEUS_METRICS_ENABLED
 )
-from src.adapters.local_alert_adapter import LocalAlertAdapter
-from src.adapters.cloud_alert_adapter import CloudAlertAdapter
+from src.adapters.alert_batcher import submit_alert
 from src.utils.cache import get_alert_state, set_alert_state
 
 # 可选：Prometheus 埋点
@@ -63,12 +62,8 @@ def send_queue_alert(is_recovery: bool, queue_name: str, length: int):
         dingtalk_msg = f"【队列告警】{queue_name} 长度 {length} ≥ {QUEUE_ALERT_THRESHOLD}"
 
     logger.info(f"准备发送通知: {subject}")
-    if ALERT_PROVIDER == "local":
-        LocalAlertAdapter.notify(subject, body)
-        from src.adapters.dingtalk_adapter import send_dingbot_text
-        send_dingbot_text(dingtalk_msg)
-    else:
-        CloudAlertAdapter.notify(subject, body)
+    # 监控循环运行在事件循环中：交给 AlertBatcher 合并后在线程池发送，不阻塞循环
+    submit_alert(subject, body, dingtalk_msg)
 
     if PROMETHEUS_METRICS_ENABLED and ALERT_COUNT_COUNTER:
         alert_type_label = "recovery" if is_recovery else "alert"
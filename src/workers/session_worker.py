@@ -1,6 +1,7 @@
 # src/workers/session_worker.py
 # -*- coding: utf-8 -*-
 
+import asyncio
 import json
 import time
 import logging
@@ -8,8 +9,8 @@ from typing import Optional, Dict, Any # Ensure these are imported
 
 import redis
 
-# 引入我们在 builder.py 中实现的 run_langgraph
-from src.graph.builder import run_langgraph
+# 引入我们在 builder.py 中实现的 arun_langgraph（图中含协程节点，只能经 ainvoke 执行）
+from src.graph.builder import arun_langgraph
 
 # 从 cache.py 导入用于检查已有状态的函数
 # User's snippet included delete_state_sharded, but it's not used in the worker logic they provided.
@@ -84,10 +85,20 @@ def session_worker_loop():
     """
     后台 Worker 主循环：
     1. 不断从 Redis 队列中取任务。
-    2. 对每一个 task：检查是否已执行过，若无，调用 run_langgraph 执行。
-    3. 捕获 run_langgraph 的结果或异常，在日志中写入，并继续循环。
+    2. 对每一个 task：检查是否已执行过，若无，调用 arun_langgraph 执行。
+    3. 捕获 arun_langgraph 的结果或异常，在日志中写入，并继续循环。
+    Worker 整个生命周期复用同一个事件循环：redis.asyncio 连接池与异步检查点连接都绑定在事件循环上，可在任务之间复用。
     """
     logger.info("Session Worker 已启动，开始监听 queue:session_tasks ...")
+    loop = asyncio.new_event_loop()
+    try:
+        _worker_loop(loop)
+    finally:
+        loop.close()
+
+
+def _worker_loop(loop: asyncio.AbstractEventLoop):
+    """session_worker_loop 的主体：逐条消费任务，并在给定事件循环上执行 arun_langgraph。"""
     while True:
         try:
             task = consume_queue(block=True, timeout=10) # User specified 10s timeout
@@ -103,12 +114,14 @@ def session_worker_loop():
                 logger.info(f"[Worker] 会话 {session_id} 已完成或曾出错，跳过执行。") # Clarified log
                 continue
 
-            result = run_langgraph({"topic": topic}, session_id=session_id, use_sharded=True)
+            result = loop.run_until_complete(
+                arun_langgraph({"topic": topic}, session_id=session_id, use_sharded=True)
+            )
 
             if result.get("error"):
-                logger.error(f"[Worker] session_id={session_id} 执行出错（由 run_langgraph报告）：{result['error']}")
+                logger.error(f"[Worker] session_id={session_id} 执行出错（由 arun_langgraph报告）：{result['error']}")
             else:
-                logger.info(f"[Worker] session_id={session_id} 执行完成（由 run_langgraph报告），继续等待下一个任务。")
+                logger.info(f"[Worker] session_id={session_id} 执行完成（由 arun_langgraph报告），继续等待下一个任务。")
 
         except Exception as exc:
             logger.exception(f"[Worker] session_worker_loop 出现未处理异常：{exc}")
@@ -0,0 +1,37 @@
+# 文件路径：tests/adapters/test_alert_batcher.py
+# -*- coding: utf-8 -*-
+"""
+AlertBatcher 单元测试：验证同主题告警在一个窗口内被合并，以及同步上下文下的直接发送。
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+import src.adapters.alert_batcher as batcher_mod
+
+
+@pytest.mark.asyncio
+async def test_same_subject_alerts_are_merged():
+    send_many = MagicMock()
+    batcher = batcher_mod.AlertBatcher(send_many=send_many, flush_ms=20)
+
+    batcher.notify("队列告警", "长度 1001", "短消息1")
+    batcher.notify("队列告警", "长度 1002", "短消息2")
+    batcher.notify("故障率告警", "失败率 50%")
+    await asyncio.sleep(0.1)
+
+    send_many.assert_called_once_with([
+        ("队列告警", "长度 1001\n\n长度 1002", "短消息1\n短消息2"),
+        ("故障率告警", "失败率 50%", None),
+    ])
+
+
+def test_submit_alert_without_loop_sends_synchronously(monkeypatch):
+    send = MagicMock()
+    monkeypatch.setattr(batcher_mod, "send_alert", send)
+
+    batcher_mod.submit_alert("主题", "正文", "钉钉")
+
+    send.assert_called_once_with("主题", "正文", "钉钉")
@@ -1,10 +1,13 @@
 # tests/graph/test_builder.py
 import unittest
-from unittest.mock import patch, MagicMock, ANY, call
-import uuid
+from unittest.mock import patch, MagicMock, AsyncMock, ANY, call
 import json # For pubsub message parsing
 import time # For pubsub message parsing
 import threading # For concurrency test
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 
 from src.graph import builder # Ensure this imports the updated builder
 from src.graph.builder import StateSchema # For type hints if needed
@@ -43,8 +46,21 @@ class TestRunLanggraph(unittest.TestCase): # Renamed class for clarity
             self.patchers.append(patcher)
             setattr(self, f'mock_{func_name}', mock_func)
 
+        # 存取函数组在导入时已固化到 _PERSISTERS 中，需同步替换为上面的 mock
+        persisters_patcher = patch('src.graph.builder._PERSISTERS', (
+            (self.mock_get_state, self.mock_set_state, self.mock_delete_state),
+            (self.mock_get_state_sharded, self.mock_set_state_sharded, self.mock_delete_state_sharded),
+        ))
+        persisters_patcher.start()
+        self.patchers.append(persisters_patcher)
+
+        # 关闭 SQLite 检查点，保持 invoke 调用签名不变
+        checkpointer_patcher = patch('src.graph.builder._get_checkpointer', return_value=None)
+        checkpointer_patcher.start()
+        self.patchers.append(checkpointer_patcher)
+
         self.mock_pubsub_client = MagicMock(spec=redis.Redis)
-        pubsub_patcher = patch('src.graph.builder._pubsub', self.mock_pubsub_client)
+        pubsub_patcher = patch('src.graph.builder._pubsub', return_value=self.mock_pubsub_client)
         self.mock_pubsub_client_instance = pubsub_patcher.start()
         self.patchers.append(pubsub_patcher)
 
@@ -61,6 +77,10 @@ class TestRunLanggraph(unittest.TestCase): # Renamed class for clarity
 
         self.mock_runnable_instance.invoke.side_effect = lambda state_dict: {**state_dict, "processed_by_graph": True}
 
+        # 已编译的图按 langgraph.json 修改时间缓存，每个用例使用各自的 mock 图
+        builder._compiled_runnable.cache_clear()
+        self.addCleanup(builder._compiled_runnable.cache_clear)
+
 
     def tearDown(self):
         for patcher in self.patchers:
@@ -68,29 +88,33 @@ class TestRunLanggraph(unittest.TestCase): # Renamed class for clarity
 
     def test_new_session_sharded_success(self):
         initial_state = {"topic": "sharded_success"}
-        generated_session_id = "new_session_uuid"
+        generated_session_id = "new_session_token"
 
-        mock_uuid_obj = MagicMock()
-        mock_uuid_obj.__str__.return_value = generated_session_id
-        with patch('src.graph.builder.uuid.uuid4', return_value=mock_uuid_obj):
+        with patch('src.graph.builder.secrets.token_urlsafe', return_value=generated_session_id):
             result = builder.run_langgraph(initial_state, session_id=None, use_sharded=True)
 
         self.mock_get_state_sharded.assert_not_called() # Not called if session_id is initially None
-        self.mock_acquire_lock.assert_called_once_with(generated_session_id, timeout=30, wait=10)
+        self.mock_acquire_lock.assert_called_once_with(generated_session_id, timeout=600, wait=10)
 
         expected_state_for_invoke = {"topic": "sharded_success", "_session_id": generated_session_id}
         self.mock_runnable_instance.invoke.assert_called_once_with(expected_state_for_invoke)
 
+        # COMPLETE 事件、最终状态与释放锁在同一个非事务管道中发送
+        mock_pipe = self.mock_pubsub_client.pipeline.return_value
+        self.mock_pubsub_client.pipeline.assert_called_once_with(transaction=False)
         expected_final_state = {**expected_state_for_invoke, "processed_by_graph": True}
-        self.mock_set_state_sharded.assert_called_once_with(generated_session_id, expected_final_state)
-        self.mock_release_lock.assert_called_once_with(generated_session_id, "test_lock_id")
+        self.mock_set_state_sharded.assert_called_once_with(generated_session_id, expected_final_state,
+            ex=builder._settings.SESSION_TTL_SECONDS, pipe=mock_pipe)
+        mock_pipe.eval.assert_called_once_with(ANY, 1, f"lock:session:{generated_session_id}", "test_lock_id")
+        mock_pipe.execute.assert_called_once()
+        self.mock_release_lock.assert_not_called()
 
         self.assertEqual(result, expected_final_state)
 
         pubsub_calls = self.mock_pubsub_client.publish.call_args_list
-        self.assertEqual(len(pubsub_calls), 2)
+        self.assertEqual(len(pubsub_calls), 1)
         start_event = json.loads(pubsub_calls[0][0][1])
-        complete_event = json.loads(pubsub_calls[1][0][1])
+        complete_event = json.loads(mock_pipe.publish.call_args[0][1])
         self.assertEqual(start_event["status"], "START")
         self.assertEqual(start_event["node"], "ALL")
         self.assertEqual(start_event["session_id"], generated_session_id)
@@ -109,17 +133,30 @@ class TestRunLanggraph(unittest.TestCase): # Renamed class for clarity
         result = builder.run_langgraph(initial_input_state, session_id=session_id, use_sharded=False)
 
         self.mock_get_state.assert_called_once_with(session_id)
-        self.mock_acquire_lock.assert_called_once_with(session_id, timeout=30, wait=10)
+        self.mock_acquire_lock.assert_called_once_with(session_id, timeout=600, wait=10)
 
         # current_state.update(initial_state) then current_state["_session_id"] = session_id
         expected_state_for_invoke = {"topic": "loaded_topic", "value": 1, "new_value": 2, "_session_id": session_id}
         self.mock_runnable_instance.invoke.assert_called_once_with(expected_state_for_invoke)
 
+        mock_pipe = self.mock_pubsub_client.pipeline.return_value
         expected_final_state = {**expected_state_for_invoke, "processed_by_graph": True}
-        self.mock_set_state.assert_called_once_with(session_id, expected_final_state)
-        self.mock_release_lock.assert_called_once_with(session_id, "test_lock_id")
+        self.mock_set_state.assert_called_once_with(session_id, expected_final_state,
+            ex=builder._settings.SESSION_TTL_SECONDS, pipe=mock_pipe)
+        mock_pipe.eval.assert_called_once_with(ANY, 1, f"lock:session:{session_id}", "test_lock_id")
+        self.mock_release_lock.assert_not_called()
         self.assertEqual(result, expected_final_state)
 
+    def test_existing_session_id_without_resume_skips_state_load(self):
+        session_id = "fresh_session_1"
+        initial_state = {"topic": "fresh_topic"}
+
+        builder.run_langgraph(initial_state, session_id=session_id, use_sharded=True, resume=False)
+
+        self.mock_get_state_sharded.assert_not_called()
+        expected_state_for_invoke = {"topic": "fresh_topic", "_session_id": session_id}
+        self.mock_runnable_instance.invoke.assert_called_once_with(expected_state_for_invoke)
+
 
     def test_lock_acquisition_fails(self):
         session_id = "lock_fail_session"
@@ -128,7 +165,7 @@ class TestRunLanggraph(unittest.TestCase): # Renamed class for clarity
 
         result = builder.run_langgraph(initial_state, session_id=session_id)
 
-        self.mock_acquire_lock.assert_called_once_with(session_id, timeout=30, wait=10)
+        self.mock_acquire_lock.assert_called_once_with(session_id, timeout=600, wait=10)
         self.assertEqual(result, {"_session_id": session_id, "error": "会话正在执行，请稍后重试"})
         self.mock_runnable_instance.invoke.assert_not_called()
         self.mock_release_lock.assert_not_called()
@@ -141,48 +178,64 @@ class TestRunLanggraph(unittest.TestCase): # Renamed class for clarity
 
         result = builder.run_langgraph({}, session_id=session_id, use_sharded=True) # Empty initial_state
 
-        self.mock_acquire_lock.assert_called_once_with(session_id, timeout=30, wait=10)
+        self.mock_acquire_lock.assert_called_once_with(session_id, timeout=600, wait=10)
 
-        pubsub_calls = self.mock_pubsub_client.publish.call_args_list
-        # When topic is missing, "ALL START" is not published. Only "ALL ERROR".
-        self.assertEqual(len(pubsub_calls), 1, f"Expected 1 pubsub call for ERROR, got {len(pubsub_calls)}: {pubsub_calls}")
-        error_event = json.loads(pubsub_calls[0][0][1]) # First (and only) call should be ERROR
+        # When topic is missing, "ALL START" is not published. Only "ALL ERROR", sent in the error-path pipeline.
+        self.mock_pubsub_client.publish.assert_not_called()
+        mock_pipe = self.mock_pubsub_client.pipeline.return_value
+        self.mock_pubsub_client.pipeline.assert_called_once_with(transaction=False)
+        mock_pipe.publish.assert_called_once()
+        error_event = json.loads(mock_pipe.publish.call_args[0][1])
 
         # self.assertEqual(start_event["status"], "START") # No START event
         self.assertEqual(error_event["status"], "ERROR")
-        self.assertEqual(error_event["error"], "缺少 'topic'，无法继续执行") # Error key is 'error' in pubsub
+        self.assertEqual(error_event["error"], "初始状态中必须包含 'topic' 字段才能启动流程。") # Error key is 'error' in pubsub
 
         # current_state before error: initial_state ({}) merged with loaded (None->{}), then _session_id added
         # So current_state = {"_session_id": session_id} when topic check fails.
         # Then error is added to this current_state.
-        expected_error_state = {"_session_id": session_id, "error": "缺少 'topic'，无法继续执行"}
-        self.mock_set_state_sharded.assert_called_once_with(session_id, expected_error_state)
+        expected_error_state = {"_session_id": session_id, "error": "初始状态中必须包含 'topic' 字段才能启动流程。"}
+        self.mock_set_state_sharded.assert_called_once_with(
+            session_id, expected_error_state, ex=builder._settings.ERROR_STATE_TTL_SECONDS, pipe=mock_pipe)
         self.mock_runnable_instance.invoke.assert_not_called()
-        self.mock_release_lock.assert_called_once_with(session_id, "test_lock_id")
-        self.assertEqual(result, {"_session_id": session_id, "error": "缺少 'topic'，无法继续执行"})
+        mock_pipe.eval.assert_called_once_with(ANY, 1, f"lock:session:{session_id}", "test_lock_id")
+        mock_pipe.execute.assert_called_once()
+        self.mock_release_lock.assert_not_called()
+        self.assertEqual(result, {"_session_id": session_id, "error": "初始状态中必须包含 'topic' 字段才能启动流程。"})
 
     def test_graph_invocation_error(self):
         session_id = "graph_error_session"
         initial_state = {"topic": "graph_fail_topic"}
         simulated_exception = ValueError("Graph processing failed!")
-        self.mock_runnable_instance.invoke.side_effect = simulated_exception
+        # 错误路径会在同一个 current_state 上写入 error，这里记录 invoke 时的状态快照
+        invoked_states = []
+
+        def failing_invoke(state_dict):
+            invoked_states.append(dict(state_dict))
+            raise simulated_exception
+        self.mock_runnable_instance.invoke.side_effect = failing_invoke
 
         result = builder.run_langgraph(initial_state, session_id=session_id, use_sharded=False)
 
-        self.mock_acquire_lock.assert_called_once_with(session_id, timeout=30, wait=10)
+        self.mock_acquire_lock.assert_called_once_with(session_id, timeout=600, wait=10)
 
         state_at_invoke_time = {"topic": "graph_fail_topic", "_session_id": session_id}
-        self.mock_runnable_instance.invoke.assert_called_once_with(state_at_invoke_time)
+        self.assertEqual(invoked_states, [state_at_invoke_time])
 
+        # ERROR 事件、带错误信息的状态与释放锁在同一个非事务管道中发送
+        mock_pipe = self.mock_pubsub_client.pipeline.return_value
         expected_error_state = {**state_at_invoke_time, "error": str(simulated_exception)}
-        self.mock_set_state.assert_called_once_with(session_id, expected_error_state)
+        self.mock_set_state.assert_called_once_with(
+            session_id, expected_error_state, ex=builder._settings.ERROR_STATE_TTL_SECONDS, pipe=mock_pipe)
 
-        self.mock_release_lock.assert_called_once_with(session_id, "test_lock_id")
+        mock_pipe.eval.assert_called_once_with(ANY, 1, f"lock:session:{session_id}", "test_lock_id")
+        mock_pipe.execute.assert_called_once()
+        self.mock_release_lock.assert_not_called()
         self.assertEqual(result, {"_session_id": session_id, "error": str(simulated_exception)})
 
         pubsub_calls = self.mock_pubsub_client.publish.call_args_list
-        self.assertEqual(len(pubsub_calls), 2)
-        error_event = json.loads(pubsub_calls[1][0][1])
+        self.assertEqual(len(pubsub_calls), 1)  # START only
+        error_event = json.loads(mock_pipe.publish.call_args[0][1])
         self.assertEqual(error_event["status"], "ERROR")
         self.assertEqual(error_event["error"], str(simulated_exception)) # Error key is 'error'
 
@@ -227,12 +280,143 @@ class TestRunLanggraph(unittest.TestCase): # Renamed class for clarity
         self.assertEqual(len(success_results), 1, f"Expected 1 success, got {success_results}")
         self.assertEqual(len(lock_fail_results), 1, f"Expected 1 lock failure, got {lock_fail_results}")
 
-        # Ensure release_lock was called for the thread that acquired the lock
-        self.mock_release_lock.assert_called_once_with(session_id, "real_lock_id_thread1")
+        # Ensure the lock of the thread that acquired it was released (in the tail pipeline)
+        mock_pipe = self.mock_pubsub_client.pipeline.return_value
+        mock_pipe.eval.assert_called_once_with(ANY, 1, f"lock:session:{session_id}", "real_lock_id_thread1")
+        self.mock_release_lock.assert_not_called()
 
         # Check which thread actually ran the graph
         self.assertEqual(success_results[0].get("thread_ran"), "Thread-1")
 
 
+class TestCheckpointReusable(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.NamedTemporaryFile(suffix=".md", delete=False)
+        tmp.close()
+        self.report_path = tmp.name
+        self.addCleanup(os.remove, self.report_path)
+
+    def _snapshot(self, report_paths, age_seconds=0, next_nodes=()):
+        created_at = datetime.now(timezone.utc) - timedelta(seconds=age_seconds)
+        return SimpleNamespace(values={"report_paths": report_paths, "audio_path": ""},
+                               next=next_nodes, created_at=created_at.isoformat())
+
+    def test_fresh_completed_checkpoint_with_existing_files_is_reused(self):
+        self.assertTrue(builder._checkpoint_reusable(self._snapshot({"md": self.report_path})))
+
+    def test_unfinished_checkpoint_is_not_reused(self):
+        self.assertFalse(builder._checkpoint_reusable(self._snapshot({"md": self.report_path}, next_nodes=("voice",))))
+
+    def test_expired_checkpoint_is_not_reused(self):
+        age = builder._settings.LANGGRAPH_CHECKPOINT_MAX_AGE_SECONDS + 60
+        self.assertFalse(builder._checkpoint_reusable(self._snapshot({"md": self.report_path}, age_seconds=age)))
+
+    def test_checkpoint_with_missing_report_file_is_not_reused(self):
+        missing = self.report_path + ".deleted"
+        self.assertFalse(builder._checkpoint_reusable(self._snapshot({"md": self.report_path, "pdf": missing})))
+
+
+class TestGetRunnable(unittest.TestCase):
+
+    def test_concurrent_cache_miss_compiles_once(self):
+        builder._compiled_runnable.cache_clear()
+        self.addCleanup(builder._compiled_runnable.cache_clear)
+
+        def slow_build():
+            time.sleep(0.05)
+            return MagicMock(name="graph")
+
+        with patch('src.graph.builder._graph_def_mtime_ns', return_value=1), \
+                patch('src.graph.builder._get_checkpointer', return_value=None), \
+                patch('src.graph.builder.build_graph_with_memory', side_effect=slow_build) as mock_build:
+            runnables = []
+            threads = [threading.Thread(target=lambda: runnables.append(builder._get_runnable())) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(timeout=2)
+
+        mock_build.assert_called_once()
+        self.assertEqual(len(runnables), 4)
+        self.assertTrue(all(r is runnables[0] for r in runnables))
+
+
+class TestArunLanggraph(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.mock_set_state_sharded = MagicMock()
+        self.mock_aget_state_sharded = AsyncMock(return_value=None)
+        self.mock_pipe = MagicMock()
+        self.mock_pipe.execute = AsyncMock(return_value=[1, True, True, True, 1])
+        self.mock_async_client = MagicMock()
+        self.mock_async_client.publish = AsyncMock()
+        self.mock_async_client.pipeline.return_value.__aenter__.return_value = self.mock_pipe
+        self.mock_runnable = MagicMock()
+        self.mock_runnable.ainvoke = AsyncMock(side_effect=lambda state: {**state, "processed_by_graph": True})
+
+        patchers = [
+            patch('src.graph.builder._PERSISTERS', ((MagicMock(), MagicMock(), MagicMock()),
+                                                    (MagicMock(), self.mock_set_state_sharded, MagicMock()))),
+            patch('src.graph.builder._ASYNC_LOADERS', (AsyncMock(), self.mock_aget_state_sharded)),
+            patch('src.graph.builder.aacquire_lock', AsyncMock(return_value="test_lock_id")),
+            patch('src.graph.builder.arelease_lock', AsyncMock(return_value=True)),
+            patch('src.graph.builder._apubsub', return_value=self.mock_async_client),
+            patch('src.graph.builder._aget_checkpointer', AsyncMock(return_value=None)),
+            patch('src.graph.builder._compiled_runnable', return_value=self.mock_runnable),
+            patch('src.graph.builder._graph_def_mtime_ns', return_value=0),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_success_awaits_graph_and_sends_tail_pipeline(self):
+        result = await builder.arun_langgraph({"topic": "async_topic"}, session_id="async_session")
+
+        self.mock_aget_state_sharded.assert_awaited_once_with("async_session")
+        expected_state = {"topic": "async_topic", "_session_id": "async_session", "processed_by_graph": True}
+        self.mock_runnable.ainvoke.assert_awaited_once()
+        self.mock_set_state_sharded.assert_called_once_with(
+            "async_session", expected_state, ex=builder._settings.SESSION_TTL_SECONDS, pipe=self.mock_pipe)
+        self.mock_pipe.eval.assert_called_once_with(ANY, 1, "lock:session:async_session", "test_lock_id")
+        self.assertEqual(json.loads(self.mock_async_client.publish.call_args[0][1])["status"], "START")
+        self.assertEqual(json.loads(self.mock_pipe.publish.call_args[0][1])["status"], "COMPLETE")
+        self.mock_pipe.execute.assert_awaited_once()
+        builder.arelease_lock.assert_not_awaited()
+        self.assertEqual(result, expected_state)
+
+    async def test_completed_checkpoint_is_reused_via_async_api(self):
+        checkpointed = MagicMock()
+        checkpointed.aget_state = AsyncMock(return_value=SimpleNamespace(
+            values={"topic": "async_topic", "report_paths": {"md": "r.md"}}, next=(), created_at=None))
+        checkpointed.ainvoke = AsyncMock(side_effect=lambda state, config: {**state, "processed_by_graph": True})
+        self.mock_runnable.copy.return_value = checkpointed
+        builder._aget_checkpointer.return_value = MagicMock(name="async_saver")
+
+        with patch('src.graph.builder._checkpoint_reusable', return_value=True):
+            result = await builder.arun_langgraph({"topic": "async_topic"}, session_id="ckpt_session")
+
+        config = checkpointed.aget_state.await_args[0][0]
+        self.assertTrue(config["configurable"]["thread_id"].startswith("ckpt_session:"))
+        checkpointed.ainvoke.assert_not_awaited()
+        self.mock_runnable.ainvoke.assert_not_awaited()
+        self.assertEqual(result["report_paths"], {"md": "r.md"})
+
+    def test_checkpoint_thread_id_changes_with_topic_and_options(self):
+        base = builder._checkpoint_config("s1", {"topic": "a", "output_options": ["md", "pdf"]})
+        self.assertEqual(base, builder._checkpoint_config("s1", {"topic": "a", "output_options": ["pdf", "md"]}))
+        self.assertNotEqual(base, builder._checkpoint_config("s1", {"topic": "b", "output_options": ["md", "pdf"]}))
+        self.assertNotEqual(base, builder._checkpoint_config("s1", {"topic": "a", "output_options": ["md"]}))
+
+    async def test_lock_acquisition_fails(self):
+        builder.aacquire_lock.return_value = None
+
+        result = await builder.arun_langgraph({"topic": "async_topic"}, session_id="busy_session", resume=False)
+
+        self.mock_aget_state_sharded.assert_not_awaited()
+        self.mock_runnable.ainvoke.assert_not_awaited()
+        self.assertEqual(result, {"_session_id": "busy_session", "error": "会话正在执行，请稍后重试"})
+
+
 if __name__ == '__main__':
     unittest.main()
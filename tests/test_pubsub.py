@@ -27,6 +27,9 @@ def fake_redis(monkeypatch): # User's snippet uses 'fake_redis'
     # src.utils.cache.get_redis_client() uses the module-level _redis_client.
     # Setting this ensures that get_cached/cache_result in agents use FakeRedis.
     monkeypatch.setattr(cache_mod, "_redis_client", fake)
+    # 二级缓存使用二进制负载，需要单独的非 decode 客户端
+    monkeypatch.setattr(cache_mod, "_binary_redis_client", fakeredis.FakeRedis())
+    monkeypatch.setattr(cache_mod, "_local_cache", cache_mod.OrderedDict())
     return fake
 
 def test_planner_pubsub_messages(fake_redis): # Use user's fixture name
@@ -18,9 +18,17 @@ class TestRedisCache(unittest.TestCase):
         self.redis_patcher = patch('src.utils.cache.get_redis_client', return_value=self.mock_redis_client)
         self.mock_get_redis_client = self.redis_patcher.start()
         cache._redis_client = None # Ensure get_redis_client is called
+        # Secondary cache uses a separate binary (non-decoding) client and an in-process cache
+        self.mock_binary_client = MagicMock(spec=redis.Redis)
+        self.mock_binary_pipe = self.mock_binary_client.pipeline.return_value
+        self.binary_patcher = patch('src.utils.cache.get_binary_redis_client', return_value=self.mock_binary_client)
+        self.binary_patcher.start()
+        cache._local_cache.clear()
 
     def tearDown(self):
         self.redis_patcher.stop()
+        self.binary_patcher.stop()
+        cache._local_cache.clear()
         cache._redis_client = original_redis_client_in_cache
 
     # --- Single Key State Tests ---
@@ -29,7 +37,7 @@ class TestRedisCache(unittest.TestCase):
         state_data = {"topic": "test topic", "value": 123}
         cache.set_state(session_id, state_data, ex=3600)
         self.mock_redis_client.set.assert_called_once_with(
-            f"state:{session_id}", json.dumps(state_data), ex=3600
+            f"state:{session_id}", cache._dumps_state(state_data), ex=3600
         )
 
     def test_get_state_single_key_exists_and_refreshes_ttl(self): # Renamed
@@ -81,13 +89,25 @@ class TestRedisCache(unittest.TestCase):
         cache.set_state_sharded(session_id, state_data, ex=7200)
 
         expected_calls_set = [
-            call(f"state:{session_id}:base", json.dumps(expected_base), ex=7200),
-            call(f"state:{session_id}:research", json.dumps(expected_research), ex=7200),
-            call(f"state:{session_id}:code", json.dumps(expected_code), ex=7200),
+            call(f"state:{session_id}:base", cache._dumps_state(expected_base), ex=7200),
+            call(f"state:{session_id}:research", cache._dumps_state(expected_research), ex=7200),
+            call(f"state:{session_id}:code", cache._dumps_state(expected_code), ex=7200),
         ]
-        # Order of setting shards is deterministic
-        self.mock_redis_client.set.assert_has_calls(expected_calls_set, any_order=False)
-        self.assertEqual(self.mock_redis_client.set.call_count, 3)
+        # All three shards go out in one non-transactional pipeline, in a deterministic order
+        mock_pipe = self.mock_redis_client.pipeline.return_value
+        self.mock_redis_client.pipeline.assert_called_once_with(transaction=False)
+        mock_pipe.set.assert_has_calls(expected_calls_set, any_order=False)
+        self.assertEqual(mock_pipe.set.call_count, 3)
+        mock_pipe.execute.assert_called_once()
+        self.mock_redis_client.set.assert_not_called()
+
+    def test_set_state_sharded_on_caller_pipeline(self):
+        caller_pipe = MagicMock()
+        cache.set_state_sharded("session_sharded_pipe", {"topic": "t"}, ex=60, pipe=caller_pipe)
+
+        self.assertEqual(caller_pipe.set.call_count, 3)
+        caller_pipe.execute.assert_not_called()
+        self.mock_redis_client.pipeline.assert_not_called()
 
     def test_set_state_sharded_missing_fields_defaults_to_empty_dict(self): # Renamed
         session_id = "session_sharded_missing"
@@ -105,11 +125,11 @@ class TestRedisCache(unittest.TestCase):
         cache.set_state_sharded(session_id, state_data, ex=3600)
 
         expected_calls_set = [
-            call(f"state:{session_id}:base", json.dumps(expected_base), ex=3600),
-            call(f"state:{session_id}:research", json.dumps(expected_research), ex=3600),
-            call(f"state:{session_id}:code", json.dumps(expected_code), ex=3600),
+            call(f"state:{session_id}:base", cache._dumps_state(expected_base), ex=3600),
+            call(f"state:{session_id}:research", cache._dumps_state(expected_research), ex=3600),
+            call(f"state:{session_id}:code", cache._dumps_state(expected_code), ex=3600),
         ]
-        self.mock_redis_client.set.assert_has_calls(expected_calls_set, any_order=False)
+        self.mock_redis_client.pipeline.return_value.set.assert_has_calls(expected_calls_set, any_order=False)
 
 
     def test_get_state_sharded_exists_and_refreshes_ttl(self): # Renamed
@@ -117,13 +137,8 @@ class TestRedisCache(unittest.TestCase):
         base_data = {"topic": "sharded topic", "tasks": ["task1"], "report_paths": None, "audio_path": None}
         research_data = {"data": "research"}
         code_data = {"code": "sample"}
-
-        def get_side_effect(key):
-            if key == f"state:{session_id}:base": return json.dumps(base_data)
-            if key == f"state:{session_id}:research": return json.dumps(research_data)
-            if key == f"state:{session_id}:code": return json.dumps(code_data)
-            return None
-        self.mock_redis_client.get.side_effect = get_side_effect
+        self.mock_redis_client.mget.return_value = [
+            json.dumps(base_data), json.dumps(research_data), json.dumps(code_data)]
 
         retrieved_state = cache.get_state_sharded(session_id)
 
@@ -131,46 +146,76 @@ class TestRedisCache(unittest.TestCase):
             "topic": "sharded topic", "tasks": ["task1"],
             "research_results": research_data, "code_results": code_data,
             "report_paths": None, "audio_path": None,
-            "_session_id": None, "error": None # Added expected None for these new fields
         }
         self.assertEqual(retrieved_state, expected_state)
 
-        get_calls = [ # Order of GETs is deterministic
-            call(f"state:{session_id}:base"),
-            call(f"state:{session_id}:research"),
-            call(f"state:{session_id}:code"),
-        ]
-        self.mock_redis_client.get.assert_has_calls(get_calls, any_order=False)
-
-        expire_calls = [ # Expire calls can be in any order relative to each other
+        # All three shards are read with one MGET, then refreshed in one pipeline
+        self.mock_redis_client.mget.assert_called_once_with((
+            f"state:{session_id}:base",
+            f"state:{session_id}:research",
+            f"state:{session_id}:code",
+        ))
+        mock_pipe = self.mock_redis_client.pipeline.return_value
+        self.mock_redis_client.pipeline.assert_called_once_with(transaction=False)
+        mock_pipe.expire.assert_has_calls([
             call(f"state:{session_id}:base", 86400),
             call(f"state:{session_id}:research", 86400),
             call(f"state:{session_id}:code", 86400),
-        ]
-        self.mock_redis_client.expire.assert_has_calls(expire_calls, any_order=True)
-        self.assertEqual(self.mock_redis_client.expire.call_count, 3) # All 3 shards existed and should be refreshed
+        ], any_order=True)
+        mock_pipe.execute.assert_called_once()
+        self.mock_redis_client.get.assert_not_called()
 
 
     def test_get_state_sharded_base_not_exists(self):
         session_id = "session_sharded_3"
-        self.mock_redis_client.get.side_effect = lambda key: None if key == f"state:{session_id}:base" else json.dumps({"other":"data"})
+        self.mock_redis_client.mget.return_value = [None, json.dumps({"other": "data"}), None]
 
         retrieved_state = cache.get_state_sharded(session_id)
         self.assertIsNone(retrieved_state)
-        self.mock_redis_client.get.assert_called_once_with(f"state:{session_id}:base")
+        self.mock_redis_client.pipeline.assert_not_called()
+        self.mock_redis_client.expire.assert_not_called()
+
+    def test_get_state_sharded_error_state_keeps_short_ttl(self):
+        session_id = "session_sharded_error"
+        base_data = {"topic": "failed topic", "error": "boom"}
+        self.mock_redis_client.mget.return_value = [json.dumps(base_data), json.dumps({}), json.dumps({})]
+
+        retrieved_state = cache.get_state_sharded(session_id)
+
+        self.assertEqual(retrieved_state["error"], "boom")
+        # Polling a failed session must not stretch ERROR_STATE_TTL_SECONDS to SESSION_TTL_SECONDS
+        self.mock_redis_client.pipeline.assert_not_called()
+        self.mock_redis_client.expire.assert_not_called()
+
+    def test_get_state_single_key_error_state_keeps_short_ttl(self):
+        self.mock_redis_client.get.return_value = json.dumps({"topic": "t", "error": "boom"})
+
+        self.assertEqual(cache.get_state("session_single_error")["error"], "boom")
         self.mock_redis_client.expire.assert_not_called()
 
-    def test_get_state_sharded_research_or_code_not_exist_refreshes_existing_ttl(self): # Renamed
+    def test_get_state_fields_sharded_reads_only_needed_shards(self):
+        session_id = "session_fields_1"
+        base_data = {"topic": "fields topic", "audio_path": "/tmp/a.mp3"}
+        self.mock_redis_client.mget.return_value = [json.dumps(base_data)]
+
+        result = cache.get_state_fields_sharded(session_id, ["topic", "audio_path", "report_paths"])
+
+        self.assertEqual(result, {"topic": "fields topic", "audio_path": "/tmp/a.mp3", "report_paths": None})
+        self.mock_redis_client.mget.assert_called_once_with([f"state:{session_id}:base"])
+        self.mock_redis_client.expire.assert_called_once_with(f"state:{session_id}:base", 86400)
+
+    def test_get_state_fields_sharded_base_not_exists(self):
+        self.mock_redis_client.mget.return_value = [None, None]
+
+        self.assertIsNone(cache.get_state_fields_sharded("missing", ["topic", "research_results"]))
+        self.mock_redis_client.mget.assert_called_once_with(["state:missing:base", "state:missing:research"])
+        self.mock_redis_client.expire.assert_not_called()
+
+    def test_get_state_sharded_research_or_code_not_exist_refreshes_existing_ttl(self):
         session_id = "session_sharded_partial"
         base_data = {"topic": "partial topic", "tasks": [], "report_paths": None, "audio_path": None}
         code_data = {"code": "some code"} # research_data will be missing
-
-        def get_side_effect(key):
-            if key == f"state:{session_id}:base": return json.dumps(base_data)
-            if key == f"state:{session_id}:research": return None # Research missing
-            if key == f"state:{session_id}:code": return json.dumps(code_data)
-            return None
-        self.mock_redis_client.get.side_effect = get_side_effect
+        self.mock_redis_client.mget.return_value = [json.dumps(base_data), None, json.dumps(code_data)]
 
         retrieved_state = cache.get_state_sharded(session_id)
         expected_state = {
@@ -178,23 +223,16 @@ class TestRedisCache(unittest.TestCase):
             "research_results": {}, # Defaults to empty dict because research_data was None
             "code_results": code_data,
             "report_paths": None, "audio_path": None,
-            "_session_id": None, "error": None # Added expected None for these new fields
         }
         self.assertEqual(retrieved_state, expected_state)
 
-        expected_expire_calls = [
+        # Only the shards that exist are refreshed
+        mock_pipe = self.mock_redis_client.pipeline.return_value
+        mock_pipe.expire.assert_has_calls([
             call(f"state:{session_id}:base", 86400),
-            call(f"state:{session_id}:code", 86400), # research shard was missing, so not expired
-        ]
-        self.mock_redis_client.expire.assert_has_calls(expected_expire_calls, any_order=True)
-        self.assertEqual(self.mock_redis_client.expire.call_count, 2) # Only base and code shards refreshed
-
-        # Explicitly check research shard was NOT expired
-        research_expire_called = any(
-            c == call(f"state:{session_id}:research", 86400)
-            for c in self.mock_redis_client.expire.call_args_list
-        )
-        self.assertFalse(research_expire_called, "Expire should not be called on a non-existent research shard")
+            call(f"state:{session_id}:code", 86400),
+        ], any_order=True)
+        self.assertEqual(mock_pipe.expire.call_count, 2)
 
 
     def test_delete_state_sharded(self):
@@ -246,20 +284,45 @@ class TestRedisCache(unittest.TestCase):
         cache_key = "my_cache_key_1"
         value = {"data": "important result"}
         cache.cache_result(cache_key, value, ex=1800)
-        self.mock_redis_client.set.assert_called_once_with(
-            cache_key, json.dumps(value), ex=1800
+        self.mock_binary_client.set.assert_called_once_with(
+            "v2:" + cache_key, cache._pack(value), ex=1800
         )
 
+    def test_cache_result_on_pipeline(self):
+        pipe = MagicMock()
+        cache.cache_result("my_cache_key_p", [1, 2], ex=60, pipe=pipe)
+        pipe.set.assert_called_once_with("v2:my_cache_key_p", cache._pack([1, 2]), ex=60)
+        self.mock_binary_client.set.assert_not_called()
+        # not cached in-process until the pipeline has been executed
+        self.assertIsNone(cache._local_get("my_cache_key_p"))
+
     def test_get_cached_exists(self):
         cache_key = "my_cache_key_2"
         value = {"data": "cached data"}
-        self.mock_redis_client.get.return_value = json.dumps(value)
+        self.mock_binary_pipe.execute.return_value = [cache._pack(value), 3600]
         retrieved_value = cache.get_cached(cache_key)
         self.assertEqual(retrieved_value, value)
+        self.mock_binary_pipe.get.assert_called_once_with("v2:" + cache_key)
+
+    def test_get_cached_hot_key_served_in_process(self):
+        cache_key = "my_cache_key_hot"
+        value = {"data": "hot"}
+        cache.cache_result(cache_key, value, ex=600)
+        first = cache.get_cached(cache_key)
+        first["data"] = "mutated"
+        self.assertEqual(cache.get_cached(cache_key), value)
+        self.mock_binary_client.pipeline.assert_not_called()
+
+    def test_pack_round_trip_large_payload(self):
+        value = [{"title": f"Result {i}", "content": "搜索结果正文 " * 20} for i in range(20)]
+        packed = cache._pack(value)
+        if cache._zstd is not None:
+            self.assertEqual(packed[:4], cache._ZSTD_MAGIC)
+        self.assertEqual(cache._unpack(packed), value)
 
     def test_get_cached_not_exists(self):
         cache_key = "my_cache_key_3"
-        self.mock_redis_client.get.return_value = None
+        self.mock_binary_pipe.execute.return_value = [None, -2]
         retrieved_value = cache.get_cached(cache_key)
         self.assertIsNone(retrieved_value)
 
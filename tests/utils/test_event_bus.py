@@ -0,0 +1,86 @@
+# tests/utils/test_event_bus.py
+import unittest
+from unittest.mock import MagicMock, call
+
+from src.utils import event_bus
+from src.utils.event_bus import SessionEventBus
+
+
+class TestSessionEventBus(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_client = MagicMock()
+        self.mock_pipe = self.mock_client.pipeline.return_value.__enter__.return_value
+        self.mock_client.pubsub_numsub.return_value = [("ch", 1)]
+        event_bus._numsub_cache.clear()
+
+    def test_flush_publishes_buffer_in_one_pipeline(self):
+        bus = SessionEventBus(self.mock_client, batch_size=16, flush_ms=10_000)
+        bus.publish("channel:session:s1", b"start")
+        bus.publish("channel:session:s1", b"complete")
+        self.mock_client.pipeline.assert_not_called()
+
+        bus.flush()
+
+        self.mock_client.pipeline.assert_called_once_with(transaction=False)
+        self.mock_pipe.publish.assert_has_calls([
+            call("channel:session:s1", b"start"),
+            call("channel:session:s1", b"complete"),
+        ])
+        self.mock_pipe.execute.assert_called_once()
+        self.assertEqual(len(bus), 0)
+
+    def test_publish_flushes_when_batch_is_full(self):
+        bus = SessionEventBus(self.mock_client, batch_size=2, flush_ms=10_000)
+        bus.publish("ch", b"1")
+        bus.publish("ch", b"2")
+
+        self.assertEqual(self.mock_pipe.publish.call_count, 2)
+        self.mock_pipe.execute.assert_called_once()
+
+    def test_flush_onto_external_pipeline_does_not_execute(self):
+        bus = SessionEventBus(self.mock_client, batch_size=16, flush_ms=10_000)
+        external_pipe = MagicMock()
+        bus.publish("ch", b"1")
+
+        bus.flush(external_pipe)
+
+        external_pipe.publish.assert_called_once_with("ch", b"1")
+        external_pipe.execute.assert_not_called()
+        self.mock_client.pipeline.assert_not_called()
+
+    def test_publish_skipped_without_subscribers(self):
+        self.mock_client.pubsub_numsub.return_value = [("ch", 0)]
+        bus = SessionEventBus(self.mock_client, batch_size=1, flush_ms=10_000)
+        bus.publish("ch", b"1")
+        bus.publish("ch", b"2")
+
+        self.assertEqual(len(bus), 0)
+        self.mock_client.pipeline.assert_not_called()
+        # zero-subscriber results are not cached, every publish re-checks
+        self.assertEqual(self.mock_client.pubsub_numsub.call_count, 2)
+
+    def test_late_subscriber_receives_events(self):
+        self.mock_client.pubsub_numsub.return_value = [("ch", 0)]
+        bus = SessionEventBus(self.mock_client, batch_size=1, flush_ms=10_000)
+        bus.publish("ch", b"1")
+        self.mock_client.pubsub_numsub.return_value = [("ch", 1)]
+        bus.publish("ch", b"2")
+
+        self.mock_pipe.publish.assert_called_once_with("ch", b"2")
+
+    def test_positive_numsub_is_cached(self):
+        bus = SessionEventBus(self.mock_client, batch_size=10, flush_ms=10_000)
+        bus.publish("ch", b"1")
+        bus.publish("ch", b"2")
+
+        self.mock_client.pubsub_numsub.assert_called_once_with("ch")
+
+    def test_flush_with_empty_buffer_is_noop(self):
+        bus = SessionEventBus(self.mock_client)
+        bus.flush()
+        self.mock_client.pipeline.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
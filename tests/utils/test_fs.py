@@ -0,0 +1,32 @@
+# tests/utils/test_fs.py
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.utils import fs
+
+
+class TestEnsureDir(unittest.TestCase):
+
+    def setUp(self):
+        fs._ENSURED_DIRS.clear()
+
+    def test_creates_directory_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            target = os.path.join(tmp, "outputs")
+            with patch("src.utils.fs.os.makedirs", wraps=os.makedirs) as makedirs:
+                fs.ensure_dir(target)
+                fs.ensure_dir(target + os.sep)
+            self.assertTrue(os.path.isdir(target))
+            makedirs.assert_called_once()
+
+    def test_failure_is_not_cached(self):
+        with patch("src.utils.fs.os.makedirs", side_effect=OSError("denied")):
+            with self.assertRaises(OSError):
+                fs.ensure_dir("outputs")
+        self.assertNotIn("outputs", fs._ENSURED_DIRS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,13 +2,14 @@
 # -*- coding: utf-8 -*-
 """
 Node Failure Rate Monitor 单元测试：模拟任务结果记录与告警逻辑
-测试点包括 record_task_result、get_failure_rate、alert_if_failure_rate_exceeded、monitor_failure_rate_loop 等。
+测试点包括 record_task_result、get_failure_rate、send_failure_alert、monitor_failure_rate_loop 等。
 """
 
 import pytest
 import asyncio
 from unittest.mock import MagicMock
 
+import src.adapters.alert_batcher as batcher_mod
 import src.workers.alert as alert_mod
 
 
@@ -58,21 +59,41 @@ def test_sliding_window_behavior():
 
 
 # -------------------------
-# 测试 alert_if_failure_rate_exceeded 告警逻辑
+# 固件：替换 Redis 告警状态读写，初始状态为 NORMAL
 # -------------------------
 @pytest.fixture
-def mock_alert_adapters(monkeypatch):
-    mock_local = MagicMock()
-    mock_cloud = MagicMock()
-    monkeypatch.setattr(alert_mod.LocalAlertAdapter, "notify", mock_local)
-    monkeypatch.setattr(alert_mod.CloudAlertAdapter, "notify", mock_cloud)
-    return mock_local, mock_cloud
+def mock_alert_state(monkeypatch):
+    mock_set = MagicMock()
+    monkeypatch.setattr(alert_mod, "get_alert_state", lambda alert_type: None)
+    monkeypatch.setattr(alert_mod, "set_alert_state", mock_set)
+    return mock_set
 
 
-def test_alert_if_exceeded_triggers_local(mock_alert_adapters, monkeypatch):
-    mock_local, mock_cloud = mock_alert_adapters
+# -------------------------
+# 测试 send_failure_alert 通过 submit_alert 发送
+# -------------------------
+def test_send_failure_alert_uses_submit_alert(monkeypatch):
+    mock_submit = MagicMock()
+    monkeypatch.setattr(alert_mod, "submit_alert", mock_submit)
+
+    alert_mod.send_failure_alert(is_recovery=False, rate=0.5)
+
+    mock_submit.assert_called_once()
+    subject, body, dingtalk_msg = mock_submit.call_args[0]
+    assert subject.startswith("[告警] 节点故障率过高")
+    assert "50.00%" in body
+    assert dingtalk_msg.startswith("【节点告警】")
+
+
+# -------------------------
+# 测试监控循环在事件循环中经 AlertBatcher 批量发送告警
+# -------------------------
+@pytest.mark.asyncio
+async def test_monitor_loop_alerts_through_batcher(mock_alert_state, monkeypatch):
+    mock_send_alerts = MagicMock()
+    monkeypatch.setattr(batcher_mod, "send_alerts", mock_send_alerts)
     monkeypatch.setattr(alert_mod, "FAILURE_RATE_THRESHOLD", 0.4)
-    monkeypatch.setenv("ALERT_PROVIDER", "local")
+    monkeypatch.setattr(alert_mod, "JOB_INTERVAL_SECONDS", 60)
 
     # 失败率 50% > 40%
     for _ in range(5):
@@ -80,19 +101,31 @@ def test_alert_if_exceeded_triggers_local(mock_alert_adapters, monkeypatch):
     for _ in range(5):
         alert_mod.record_task_result(True)
 
-    alert_mod.alert_if_failure_rate_exceeded()
+    task = asyncio.create_task(alert_mod.monitor_failure_rate_loop())
+    await asyncio.sleep(0.7)  # 等待一个 500ms 合并窗口
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    batcher_mod.get_alert_batcher()._task.cancel()
 
-    mock_local.assert_called_once()
-    mock_cloud.assert_not_called()
+    mock_send_alerts.assert_called_once()
+    (items,), _ = mock_send_alerts.call_args
+    assert len(items) == 1
+    assert items[0][0].startswith("[告警] 节点故障率过高")
+    mock_alert_state.assert_called_once_with(
+        alert_mod.ALERT_TYPE, "ALERTING", ex=alert_mod.ALERT_STATE_EXPIRY_SECONDS)
 
 
 # -------------------------
 # 测试 monitor_failure_rate_loop 执行一次后正常退出
 # -------------------------
 @pytest.mark.asyncio
-async def test_monitor_failure_rate_loop_once(monkeypatch):
-    # 替换告警逻辑，避免真实发送
-    monkeypatch.setattr(alert_mod, "alert_if_failure_rate_exceeded", lambda: None)
+async def test_monitor_failure_rate_loop_once(mock_alert_state, monkeypatch):
+    # 失败率为 0，不会触发告警
+    mock_submit = MagicMock()
+    monkeypatch.setattr(alert_mod, "submit_alert", mock_submit)
 
     # 启动协程并在短时间后取消
     task = asyncio.create_task(alert_mod.monitor_failure_rate_loop())
@@ -101,4 +134,7 @@ async def test_monitor_failure_rate_loop_once(monkeypatch):
     try:
         await task
     except asyncio.CancelledError:
-        pass
\ No newline at end of file
+        pass
+
+    mock_submit.assert_not_called()
+    mock_alert_state.assert_not_called()
@@ -1,11 +1,12 @@
 # tests/workers/test_session_worker.py
 # -*- coding: utf-8 -*-
+import asyncio
 import pytest
 import fakeredis
 import threading
 import time
 import json
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock
 
 import src.workers.session_worker as worker_mod
 import src.utils.cache as cache_mod # Import for monkeypatching
@@ -15,7 +16,7 @@ def fake_redis_and_run(monkeypatch):
     fake_r = fakeredis.FakeRedis(decode_responses=True)
     monkeypatch.setattr(worker_mod, "_redis", fake_r)
 
-    mocked_run_langgraph = MagicMock()
+    mocked_run_langgraph = AsyncMock()
 
     def fake_run_langgraph_impl(payload, session_id=None, use_sharded=True):
         current_topic = payload.get("topic")
@@ -39,7 +40,7 @@ def fake_redis_and_run(monkeypatch):
         return success_state_to_save
 
     mocked_run_langgraph.side_effect = fake_run_langgraph_impl
-    monkeypatch.setattr(worker_mod, "run_langgraph", mocked_run_langgraph)
+    monkeypatch.setattr(worker_mod, "arun_langgraph", mocked_run_langgraph)
 
     # Monkeypatch src.utils.cache to use the same fakeredis instance
     # The cache module uses a module-level _redis_client that is initialized to None,
@@ -73,7 +74,7 @@ def test_worker_success_and_skip(fake_redis_and_run):
 
     # Simulate run_langgraph call (as worker_loop would do)
     # Our mocked run_langgraph (fake_run_langgraph_impl) will save state.
-    result = worker_mod.run_langgraph(payload={"topic": "normal_topic"}, session_id="sessA", use_sharded=True)
+    result = asyncio.run(worker_mod.arun_langgraph(payload={"topic": "normal_topic"}, session_id="sessA", use_sharded=True))
     assert "report_paths" in result, "Mocked run_langgraph should return report_paths"
 
     # After run_langgraph, has_completed should be True
@@ -98,7 +99,7 @@ def test_worker_error_handling(fake_redis_and_run):
     assert task == {"session_id": "sessErr", "topic": "error_topic"}
 
     # Simulate worker calling run_langgraph
-    result = worker_mod.run_langgraph(payload={"topic": "error_topic"}, session_id="sessErr", use_sharded=True)
+    result = asyncio.run(worker_mod.arun_langgraph(payload={"topic": "error_topic"}, session_id="sessErr", use_sharded=True))
     assert "error" in result and "模拟错误" in result["error"]
 
     # has_completed should also return True because an error state was saved by the mock